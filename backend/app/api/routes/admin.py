@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.core.security import require_role
 from app.db import SessionLocal
@@ -12,11 +12,11 @@ from app.models.child import Child
 from app.models.notifications import Notification
 from app.models.activities import Activity
 from app.models.system_setting import SystemSetting
-from app.models.appointment import Appointment
-from app.models.time_slot import TimeSlot
-from app.models.doctor_schedule import DoctorSchedule
 from app.schemas.system_setting import SystemSettingUpdate, SystemSettingOut
+from app.services import report_counters
 from app.utils.audit import log_activity
+from app.utils.pagination import PageParams, apply_filters, page_params, paginate
+from app.utils.serialization import columns_for
 from datetime import datetime
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -30,10 +30,24 @@ def get_db():
         db.close()
 
 
+USER_SORT_KEYS = {"created_at": User.created_at, "email": User.email, "full_name": User.full_name}
+DOCTOR_SORT_KEYS = {"created_at": DoctorProfile.created_at, "full_name": DoctorProfile.full_name}
+ASSIGNMENT_SORT_KEYS = {"created_at": DoctorAssignment.created_at}
+
+
 @router.get("/users", response_model=list[ProfileOut])
-def list_users(db: Session = Depends(get_db), user=Depends(require_role("admin"))):
-    rows = db.query(User).all()
-    return [ProfileOut(**r.__dict__) for r in rows]
+def list_users(
+    response: Response,
+    role: str | None = None,
+    status: str | None = None,
+    email: str | None = None,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    user=Depends(require_role("admin")),
+):
+    q = db.query(*columns_for(User, ProfileOut, *USER_SORT_KEYS.values()))
+    q = apply_filters(q, {User.role: role, User.status: status, User.email: email})
+    return paginate(q, response, page, USER_SORT_KEYS, User.id, "created_at", "desc")
 
 
 @router.patch("/users/{user_id}/role")
@@ -74,11 +88,11 @@ def create_doctor(payload: DoctorCreate, db: Session = Depends(get_db), admin=De
     if not user:
         # Tạo user với role doctor và mật khẩu tạm thời (admin sẽ gửi link đặt mật khẩu)
         temp_pass = "Temp@12345"
-        from app.utils.password import hash_password
+        from app.services.password_hasher import hash_sync_or_429
         user = User(
             email=payload.email,
             full_name=payload.full_name,
-            password_hash=hash_password(temp_pass),
+            password_hash=hash_sync_or_429(temp_pass),
             role="doctor",
             status="active",
         )
@@ -129,15 +143,25 @@ def create_doctor(payload: DoctorCreate, db: Session = Depends(get_db), admin=De
 
 
 @router.get("/doctors", response_model=list[DoctorOut])
-def list_doctors(db: Session = Depends(get_db), admin=Depends(require_role("admin"))):
-    rows = db.query(DoctorProfile).all()
-    return [DoctorOut(**r.__dict__) for r in rows]
+def list_doctors(
+    response: Response,
+    status: str | None = None,
+    specialty: str | None = None,
+    verified: bool | None = None,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    admin=Depends(require_role("admin")),
+):
+    q = apply_filters(
+        db.query(*columns_for(DoctorProfile, DoctorOut, *DOCTOR_SORT_KEYS.values())),
+        {DoctorProfile.status: status, DoctorProfile.specialty: specialty, DoctorProfile.verified: verified},
+    )
+    return paginate(q, response, page, DOCTOR_SORT_KEYS, DoctorProfile.id, "created_at", "desc")
 
 
 @router.get("/doctors/pending", response_model=list[DoctorOut])
 def pending_doctors(db: Session = Depends(get_db), admin=Depends(require_role("admin"))):
-    rows = db.query(DoctorProfile).filter(DoctorProfile.verified == False).all()
-    return [DoctorOut(**r.__dict__) for r in rows]
+    return db.query(*columns_for(DoctorProfile, DoctorOut)).filter(DoctorProfile.verified == False).all()
 
 
 @router.patch("/doctors/{doctor_id}/approve", response_model=DoctorOut)
@@ -156,14 +180,19 @@ def approve_doctor(doctor_id: str, db: Session = Depends(get_db), admin=Depends(
 
 
 @router.get("/assignments", response_model=list[DoctorAssignmentOut])
-def list_assignments(doctor_id: str | None = None, child_id: str | None = None, db: Session = Depends(get_db), admin=Depends(require_role("admin"))):
-    q = db.query(DoctorAssignment)
-    if doctor_id:
-        q = q.filter(DoctorAssignment.doctor_id == doctor_id)
-    if child_id:
-        q = q.filter(DoctorAssignment.child_id == child_id)
-    rows = q.all()
-    return [DoctorAssignmentOut(**r.__dict__) for r in rows]
+def list_assignments(
+    response: Response,
+    doctor_id: str | None = None,
+    child_id: str | None = None,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    admin=Depends(require_role("admin")),
+):
+    q = apply_filters(
+        db.query(*columns_for(DoctorAssignment, DoctorAssignmentOut)),
+        {DoctorAssignment.doctor_id: doctor_id, DoctorAssignment.child_id: child_id},
+    )
+    return paginate(q, response, page, ASSIGNMENT_SORT_KEYS, DoctorAssignment.id, "created_at", "desc")
 
 
 @router.post("/assignments", response_model=DoctorAssignmentOut)
@@ -235,42 +264,13 @@ def broadcast_notification(
 
 
 @router.get("/reports/summary")
-def reports_summary(admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
-    users_total = db.query(User).count()
-    doctors_total = db.query(User).filter(User.role == "doctor").count()
-    users_total_by_role = {
-        "admin": db.query(User).filter(User.role == "admin").count(),
-        "doctor": doctors_total,
-        "user": db.query(User).filter(User.role == "user").count(),
-    }
-    doctor_status = {
-        "approved": db.query(DoctorProfile).filter(DoctorProfile.status == "approved").count(),
-        "pending": db.query(DoctorProfile).filter(DoctorProfile.status == "pending").count(),
-        "rejected": db.query(DoctorProfile).filter(DoctorProfile.status == "rejected").count(),
-    }
-    appt_status = {
-        "pending": db.query(Appointment).filter(Appointment.status == "pending").count(),
-        "confirmed": db.query(Appointment).filter(Appointment.status == "confirmed").count(),
-        "completed": db.query(Appointment).filter(Appointment.status == "completed").count(),
-        "cancelled": db.query(Appointment).filter(Appointment.status == "cancelled").count(),
-        "no_show": db.query(Appointment).filter(Appointment.status == "no-show").count(),
-    }
-    slots_total = db.query(TimeSlot).count()
-    schedules_total = db.query(DoctorSchedule).count()
-    return {
-        "users_total": users_total,
-        "users_by_role": users_total_by_role,
-        "doctor_status": doctor_status,
-        "appointments": appt_status,
-        "slots_total": slots_total,
-        "schedules_total": schedules_total,
-    }
+def reports_summary(refresh: bool = False, admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
+    return report_counters.reports_summary(db, refresh=refresh)
 
 
 @router.get("/settings", response_model=list[SystemSettingOut])
 def list_system_settings(admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
-    rows = db.query(SystemSetting).all()
-    return [SystemSettingOut(**r.__dict__) for r in rows]
+    return db.query(*columns_for(SystemSetting, SystemSettingOut)).all()
 
 
 @router.put("/settings/{key}", response_model=SystemSettingOut)
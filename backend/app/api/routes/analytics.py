@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.core.security import require_role
+from app.db import SessionLocal
+from app.services import analytics
+from app.utils.pagination import parse_datetime
+
+router = APIRouter(prefix="/admin/analytics", tags=["analytics"])
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@router.get("/{metric}")
+def metric_series(
+    metric: str,
+    bucket: str = "day",
+    date_from: str | None = None,
+    date_to: str | None = None,
+    admin=Depends(require_role("admin")),
+    db: Session = Depends(get_db),
+):
+    end = parse_datetime(date_to) or datetime.utcnow()
+    start = parse_datetime(date_from) or end - timedelta(days=30)
+    try:
+        points = analytics.series(db, metric, bucket, start, end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    refresher = analytics.refresher
+    return {
+        "metric": metric,
+        "bucket": bucket,
+        "date_from": start.isoformat(),
+        "date_to": end.isoformat(),
+        "refreshed_at": refresher.last_run.isoformat() if refresher.last_run else None,
+        "series": points,
+    }
+
+
+@router.post("/refresh")
+def refresh_rollups(full: bool = False, admin=Depends(require_role("admin"))):
+    return {"status": "refreshed", "rows": analytics.refresher.run_once(full=full)}
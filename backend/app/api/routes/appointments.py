@@ -1,65 +1,44 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.security import get_current_user, require_role
-from app.db import SessionLocal
+from app.db import get_async_db
 from app.models.appointment import Appointment
 from app.models.user import User
 from app.models.child import Child
 from app.models.doctor_assignment import DoctorAssignment
 from app.models.time_slot import TimeSlot
-from app.models.doctor_schedule import DoctorSchedule
-from app.models.booking_lock import BookingLock
 from app.models.notifications import Notification
+from app.services.availability import availability
+from app.services.booking import BookingConflict, book_slot, claim_schedule, release_schedule
 from app.utils.audit import log_activity
 from app.schemas.appointment import AppointmentCreate, AppointmentOut
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_after, parse_datetime
+from app.utils.serialization import columns_for
 
-router = APIRouter(prefix="/appointments", tags=["appointments"])
-
+APPOINTMENTS_PAGE_SIZE = int(os.getenv("APPOINTMENTS_PAGE_SIZE", "100"))
+APPOINTMENTS_MAX_PAGE_SIZE = int(os.getenv("APPOINTMENTS_MAX_PAGE_SIZE", "500"))
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(prefix="/appointments", tags=["appointments"])
 
 
 @router.post("", response_model=AppointmentOut)
-def create_appointment(payload: AppointmentCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_appointment(payload: AppointmentCreate, user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     if user.get("role") not in ("user",):
         raise HTTPException(status_code=403, detail="Only user can book")
-    doc = db.query(User).filter(User.id == payload.doctor_id, User.role == "doctor").first()
+    doc = await db.scalar(select(User).where(User.id == payload.doctor_id, User.role == "doctor").limit(1))
     if not doc:
         raise HTTPException(status_code=404, detail="Doctor not found")
-    child = db.query(Child).filter(Child.id == payload.child_id, Child.user_id == user.get("sub")).first()
+    child = await db.scalar(select(Child).where(Child.id == payload.child_id, Child.user_id == user.get("sub")).limit(1))
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
-    slot = None
     if payload.slot_id:
-        slot = db.query(TimeSlot).filter(TimeSlot.id == payload.slot_id, TimeSlot.is_active == True).first()
+        slot = await db.scalar(select(TimeSlot).where(TimeSlot.id == payload.slot_id, TimeSlot.is_active == True).limit(1))
         if not slot:
             raise HTTPException(status_code=404, detail="Slot not found")
-        schedule = db.query(DoctorSchedule).filter(
-            DoctorSchedule.doctor_id == payload.doctor_id,
-            DoctorSchedule.slot_id == payload.slot_id,
-        ).first()
-        if not schedule or schedule.status != "available":
-            raise HTTPException(status_code=409, detail="Slot not available")
-        # prevent double booking
-        existing = db.query(Appointment).filter(
-            Appointment.slot_id == payload.slot_id,
-        ).first()
-        if existing:
-            raise HTTPException(status_code=409, detail="Slot already booked")
-        # check booking lock
-        now = datetime.utcnow()
-        lock = db.query(BookingLock).filter(
-            BookingLock.slot_id == payload.slot_id,
-            BookingLock.expires_at > now,
-        ).first()
-        if lock and lock.locked_by_user != user.get("sub"):
-            raise HTTPException(status_code=409, detail="Slot locked by another user")
         when = slot.start_time
     else:
         if not payload.scheduled_at:
@@ -78,16 +57,14 @@ def create_appointment(payload: AppointmentCreate, user=Depends(get_current_user
         note=payload.note,
         status="pending",
     )
-    db.add(appt)
     if payload.slot_id:
-        db.query(DoctorSchedule).filter(
-            DoctorSchedule.doctor_id == payload.doctor_id,
-            DoctorSchedule.slot_id == payload.slot_id,
-        ).update({"status": "booked"})
-        db.query(BookingLock).filter(
-            BookingLock.slot_id == payload.slot_id,
-            BookingLock.locked_by_user == user.get("sub"),
-        ).delete()
+        # schedule check, lock check and insert in one transaction (see services.booking)
+        try:
+            await book_slot(db, appt, user["sub"])
+        except BookingConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+    else:
+        db.add(appt)
     db.add(Notification(
         user_id=payload.doctor_id,
         type="booking",
@@ -96,50 +73,82 @@ def create_appointment(payload: AppointmentCreate, user=Depends(get_current_user
         sent_at=datetime.utcnow(),
     ))
     log_activity(db, user["sub"], "appointment_created", f"appointment_id={appt.id}")
-    db.commit()
-    db.refresh(appt)
+    await db.commit()
+    if appt.slot_id:
+        availability.discard(appt.doctor_id, appt.slot_id)
+    await db.refresh(appt)
     return AppointmentOut(**{**appt.__dict__, "doctor_phone": doc.phone})
 
 
+def _page(q, limit: int, cursor: str | None, date_from: str | None, date_to: str | None):
+    """Newest first, keyset-paginated on (scheduled_at, id), bounded by an optional date range."""
+    start, end = parse_datetime(date_from), parse_datetime(date_to)
+    if start:
+        q = q.where(Appointment.scheduled_at >= start)
+    if end:
+        q = q.where(Appointment.scheduled_at < end)
+    if cursor:
+        at, last_id = decode_cursor(cursor, 2)
+        q = q.where(keyset_after([Appointment.scheduled_at, Appointment.id], [parse_datetime(at), last_id], True))
+    return q.order_by(Appointment.scheduled_at.desc(), Appointment.id.desc()).limit(limit + 1)
+
+
+def _trim_page(response: Response, rows: list, limit: int):
+    # one extra row was fetched to learn whether another page exists
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([last.scheduled_at, last.id])
+    return rows[:limit]
+
+
 @router.get("/my", response_model=list[AppointmentOut])
-def my_appointments(child_id: str | None = None, user=Depends(get_current_user), db: Session = Depends(get_db)):
-    q = db.query(Appointment).filter(Appointment.patient_id == user["sub"])
+async def my_appointments(
+    response: Response,
+    child_id: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(APPOINTMENTS_PAGE_SIZE, ge=1, le=APPOINTMENTS_MAX_PAGE_SIZE),
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # doctor phone comes from the same query instead of one lookup per row
+    q = (
+        select(*columns_for(Appointment, AppointmentOut), User.phone.label("doctor_phone"))
+        .outerjoin(User, User.id == Appointment.doctor_id)
+        .where(Appointment.patient_id == user["sub"])
+    )
     if child_id:
-        q = q.filter(Appointment.child_id == child_id)
-    rows = q.order_by(Appointment.scheduled_at.desc()).all()
-    result = []
-    for r in rows:
-        doctor = db.query(User).filter(User.id == r.doctor_id).first()
-        result.append(AppointmentOut(**{**r.__dict__, "doctor_phone": doctor.phone if doctor else None}))
-    return result
+        q = q.where(Appointment.child_id == child_id)
+    rows = (await db.execute(_page(q, limit, cursor, date_from, date_to))).all()
+    return _trim_page(response, rows, limit)
 
 
 @router.get("/doctor", response_model=list[AppointmentOut])
-def doctor_appointments(user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def doctor_appointments(
+    response: Response,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(APPOINTMENTS_PAGE_SIZE, ge=1, le=APPOINTMENTS_MAX_PAGE_SIZE),
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
     role = user.get("role")
     if role not in ("doctor", "admin"):
         raise HTTPException(status_code=403, detail="Forbidden")
-    if role == "admin":
-        rows = db.query(Appointment).order_by(Appointment.scheduled_at.desc()).all()
-        return [AppointmentOut(**r.__dict__) for r in rows]
-    # doctor: only appointments for assigned children
-    assigned_child_ids = [
-        r.child_id for r in db.query(DoctorAssignment).filter(DoctorAssignment.doctor_id == user.get("sub")).all()
-    ]
-    if not assigned_child_ids:
-        return []
-    rows = (
-        db.query(Appointment)
-        .filter(Appointment.doctor_id == user.get("sub"), Appointment.child_id.in_(assigned_child_ids))
-        .order_by(Appointment.scheduled_at.desc())
-        .all()
-    )
-    return [AppointmentOut(**r.__dict__) for r in rows]
+    q = select(*columns_for(Appointment, AppointmentOut))
+    if role != "admin":
+        # doctor: only appointments for assigned children, filtered in SQL
+        assigned = select(DoctorAssignment.child_id).where(DoctorAssignment.doctor_id == user.get("sub"))
+        q = q.where(Appointment.doctor_id == user.get("sub"), Appointment.child_id.in_(assigned))
+    rows = (await db.execute(_page(q, limit, cursor, date_from, date_to))).all()
+    return _trim_page(response, rows, limit)
 
 
 @router.patch("/{appointment_id}/status")
-def update_status(appointment_id: str, status: str, user=Depends(get_current_user), db: Session = Depends(get_db)):
-    appt = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+async def update_status(appointment_id: str, status: str, user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    appt = await db.get(Appointment, appointment_id)
     if not appt:
         raise HTTPException(status_code=404, detail="Not found")
     if user.get("role") == "doctor":
@@ -149,13 +158,24 @@ def update_status(appointment_id: str, status: str, user=Depends(get_current_use
         raise HTTPException(status_code=403, detail="Forbidden")
     if status not in ("pending", "confirmed", "completed", "cancelled", "no-show", "canceled"):
         raise HTTPException(status_code=400, detail="Bad status")
+    previous = appt.status
     appt.status = "cancelled" if status == "canceled" else status
-    if appt.slot_id and appt.status in ("cancelled",):
-        db.query(DoctorSchedule).filter(
-            DoctorSchedule.doctor_id == appt.doctor_id,
-            DoctorSchedule.slot_id == appt.slot_id,
-        ).update({"status": "available"})
+    if appt.slot_id and appt.status == "cancelled" and previous != "cancelled":
+        await release_schedule(db, appt.doctor_id, appt.slot_id)
+    elif appt.slot_id and previous == "cancelled" and appt.status != "cancelled":
+        # reviving a cancelled booking needs the slot back
+        if not await claim_schedule(db, appt.doctor_id, appt.slot_id):
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="Slot not available")
     if user.get("role") == "admin":
         log_activity(db, user["sub"], "appointment_status_updated", f"appointment_id={appointment_id},status={appt.status}")
-    db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Slot already booked")
+    if appt.slot_id and appt.status == "cancelled" and previous != "cancelled":
+        availability.invalidate(appt.doctor_id)
+    elif appt.slot_id and previous == "cancelled" and appt.status != "cancelled":
+        availability.discard(appt.doctor_id, appt.slot_id)
     return {"status": status}
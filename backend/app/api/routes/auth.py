@@ -2,6 +2,7 @@ import os
 import uuid
 import requests
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from app.schemas.auth import (
     SignupRequest,
     LoginRequest,
@@ -11,6 +12,7 @@ from app.schemas.auth import (
     TwoFAVerifyRequest,
     RefreshRequest,
     OAuthLoginRequest,
+    LogoutRequest,
 )
 from app.core.security import (
     create_access_token,
@@ -18,11 +20,16 @@ from app.core.security import (
     get_current_user,
     require_role,
     decode_token,
+    revoke_token,
+    bearer_scheme,
 )
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db import SessionLocal
+from app.db import SessionLocal, get_async_db
 from app.models.user import User
-from app.utils.password import hash_password, verify_password
+from app.services.password_hasher import HashQueueFull, hash_or_429, hash_sync_or_429, hasher, verify_or_429
+from app.utils.password import needs_rehash
 
 try:
     import pyotp
@@ -43,26 +50,26 @@ def get_db():
         db.close()
 
 @router.post("/signup", response_model=UserOut)
-def signup(payload: SignupRequest, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == payload.email).first()
+async def signup(payload: SignupRequest, db: AsyncSession = Depends(get_async_db)):
+    existing = await db.scalar(select(User.id).where(User.email == payload.email).limit(1))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     user = User(
         email=payload.email,
         full_name=payload.full_name,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_or_429(payload.password),
         role="user",
         status="active",
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return UserOut(**user.__dict__)
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == payload.email).limit(1))
     if not user:
         demo_auto = os.getenv("DEMO_AUTO_CREATE", "1" if os.getenv("ENV", "dev") == "dev" else "0") == "1"
         if demo_auto:
@@ -77,14 +84,14 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
                     user = User(
                         email=payload.email,
                         full_name=name,
-                        password_hash=hash_password(pwd),
+                        password_hash=await hash_or_429(pwd),
                         role=role,
                         status="active",
                     )
                     db.add(user)
-                    db.commit()
-                    db.refresh(user)
-    if not user or not verify_password(payload.password, user.password_hash):
+                    await db.commit()
+                    await db.refresh(user)
+    if not user or not await verify_or_429(payload.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     if user.status and user.status != "active":
         raise HTTPException(status_code=403, detail="User inactive")
@@ -98,6 +105,14 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
         if not totp.verify(payload.code):
             raise HTTPException(status_code=401, detail="Invalid 2FA code")
 
+    if needs_rehash(user.password_hash):
+        # upgrade to the configured parameters while the plaintext is at hand
+        try:
+            user.password_hash = await hasher.hash(payload.password)
+            await db.commit()
+        except HashQueueFull:
+            pass  # the old hash still works; upgrade on a later login
+
     claims = {"sub": user.id, "email": user.email, "role": user.role}
     access = create_access_token(claims)
     refresh = create_refresh_token(claims)
@@ -112,7 +127,7 @@ def _get_or_create_oauth_user(db: Session, email: str, full_name: str | None = N
     user = User(
         email=email,
         full_name=full_name or email.split("@")[0],
-        password_hash=hash_password(temp_password),
+        password_hash=hash_sync_or_429(temp_password),
         role="user",
         status="active",
     )
@@ -231,6 +246,18 @@ def refresh(payload: RefreshRequest):
     return TokenResponse(access_token=access, refresh_token=new_refresh)
 
 
+@router.post("/logout")
+def logout(
+    payload: LogoutRequest | None = None,
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    user=Depends(get_current_user),
+):
+    revoke_token(credentials.credentials)
+    if payload and payload.refresh_token:
+        revoke_token(payload.refresh_token)
+    return {"status": "logged_out"}
+
+
 @router.get("/admin/guarded")
 def admin_guarded(user=Depends(require_role("admin"))):
     return {"status": "ok", "role": user["role"]}
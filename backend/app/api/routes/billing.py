@@ -6,6 +6,7 @@ from app.db import SessionLocal
 from app.models.plan import Plan
 from app.models.subscription import Subscription
 from app.models.invoice import Invoice
+from app.utils.serialization import row_dict
 
 router = APIRouter(prefix="/billing", tags=["billing"])
 
@@ -33,7 +34,7 @@ def seed_plans(db: Session):
 def list_plans(db: Session = Depends(get_db)):
     seed_plans(db)
     rows = db.query(Plan).all()
-    return [r.__dict__ for r in rows]
+    return [row_dict(r) for r in rows]
 
 
 @router.get("/subscription")
@@ -76,4 +77,4 @@ def list_invoices(user=Depends(get_current_user), db: Session = Depends(get_db))
         .limit(50)
         .all()
     )
-    return [r.__dict__ for r in rows]
+    return [row_dict(r) for r in rows]
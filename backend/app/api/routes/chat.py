@@ -1,12 +1,17 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+import json
+import logging
 import os
 
 from app.schemas.chat import ChatRequest, ChatResponse, ChatMessageOut
 from app.services.rag_service import rag_service
+from app.utils.serialization import columns_for
 from app.core.security import get_current_user
-from app.db import SessionLocal
+from app.db import AsyncSessionLocal, get_async_db
 from app.models.chat_message import ChatMessage
 from app.models.child import Child
 from app.models.doctor_assignment import DoctorAssignment
@@ -15,25 +20,22 @@ router = APIRouter()
 
 AI_MODE = os.getenv("AI_MODE", "mock").lower()
 
+logger = logging.getLogger("backend.chat")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
-
-def _can_access_child(db: Session, child: Child, user: dict) -> bool:
+async def _can_access_child(db: AsyncSession, child: Child, user: dict) -> bool:
     if user.get("role") == "admin":
         return True
     if child.user_id == user.get("sub"):
         return True
     if user.get("role") == "doctor":
-        return db.query(DoctorAssignment).filter(
-            DoctorAssignment.doctor_id == user.get("sub"),
-            DoctorAssignment.child_id == child.id,
-        ).first() is not None
+        result = await db.execute(
+            select(DoctorAssignment.id).where(
+                DoctorAssignment.doctor_id == user.get("sub"),
+                DoctorAssignment.child_id == child.id,
+            ).limit(1)
+        )
+        return result.first() is not None
     return False
 
 
@@ -44,19 +46,28 @@ def _mock_answer(message: str, child: Child | None) -> str:
         f"thời gian xuất hiện, và các yếu tố liên quan để bác sĩ tư vấn chính xác hơn."
     )
 
+async def _load_child(db: AsyncSession, req: ChatRequest, user: dict) -> Child | None:
+    if not req.child_id:
+        return None
+    child = await db.get(Child, req.child_id)
+    if not child:
+        raise HTTPException(status_code=404, detail="Child not found")
+    if not await _can_access_child(db, child, user):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return child
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.post("")
-async def chat(req: ChatRequest, user=Depends(get_current_user), db: Session = Depends(get_db)) -> ChatResponse:
-    child = None
-    if req.child_id:
-        child = db.query(Child).filter(Child.id == req.child_id).first()
-        if not child:
-            raise HTTPException(status_code=404, detail="Child not found")
-        if not _can_access_child(db, child, user):
-            raise HTTPException(status_code=403, detail="Forbidden")
+async def chat(req: ChatRequest, user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)) -> ChatResponse:
+    child = await _load_child(db, req, user)
 
     if req.child_id:
         db.add(ChatMessage(child_id=req.child_id, role="user", content=req.message))
-        db.commit()
+        await db.commit()
 
     if AI_MODE == "mock" or not rag_service.ready:
         answer = _mock_answer(req.message, child)
@@ -65,22 +76,64 @@ async def chat(req: ChatRequest, user=Depends(get_current_user), db: Session = D
 
     if req.child_id:
         db.add(ChatMessage(child_id=req.child_id, role="assistant", content=answer))
-        db.commit()
+        await db.commit()
 
     return ChatResponse(answer=answer)
 
 
+@router.post("/stream")
+async def chat_stream(req: ChatRequest, user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    child = await _load_child(db, req, user)
+
+    if req.child_id:
+        db.add(ChatMessage(child_id=req.child_id, role="user", content=req.message))
+        await db.commit()
+
+    mock_answer = None
+    if AI_MODE == "mock" or not rag_service.ready:
+        mock_answer = _mock_answer(req.message, child)
+
+    async def events():
+        if mock_answer is not None:
+            answer = mock_answer
+            yield _sse("delta", {"text": answer})
+        else:
+            parts: list[str] = []
+            try:
+                async for chunk in rag_service.ask_stream(req.message, req.history):
+                    parts.append(chunk)
+                    yield _sse("delta", {"text": chunk})
+            except Exception as exc:
+                logger.error("Chat stream failed: %s", exc)
+                yield _sse("error", {"detail": "Stream interrupted"})
+                return
+            answer = "".join(parts)
+
+        # persist only once the full answer is known
+        if req.child_id:
+            async with AsyncSessionLocal() as session:
+                session.add(ChatMessage(child_id=req.child_id, role="assistant", content=answer))
+                await session.commit()
+        yield _sse("done", {"answer": answer})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/children/{child_id}/messages", response_model=list[ChatMessageOut])
-def list_messages(child_id: str, user=Depends(get_current_user), db: Session = Depends(get_db)):
-    child = db.query(Child).filter(Child.id == child_id).first()
+async def list_messages(child_id: str, user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    child = await db.get(Child, child_id)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
-    if not _can_access_child(db, child, user):
+    if not await _can_access_child(db, child, user):
         raise HTTPException(status_code=403, detail="Forbidden")
-    rows = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.child_id == child_id)
-        .order_by(ChatMessage.created_at.asc())
-        .all()
-    )
-    return [ChatMessageOut(**r.__dict__) for r in rows]
+    return (
+        await db.execute(
+            select(*columns_for(ChatMessage, ChatMessageOut))
+            .where(ChatMessage.child_id == child_id)
+            .order_by(ChatMessage.created_at.asc())
+        )
+    ).all()
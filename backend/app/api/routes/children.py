@@ -9,6 +9,7 @@ from app.models.intake import Intake
 from app.models.doctor_assignment import DoctorAssignment
 from app.schemas.child import ChildCreate, ChildUpdate, ChildOut
 from app.schemas.intake import IntakeUpsert, IntakeOut
+from app.utils.serialization import columns_for
 
 router = APIRouter(prefix="/children", tags=["children"])
 
@@ -37,16 +38,13 @@ def _can_access_child(db: Session, child: Child, user: dict) -> bool:
 @router.get("", response_model=list[ChildOut])
 def list_children(user_id: str | None = None, user=Depends(get_current_user), db: Session = Depends(get_db)):
     role = user.get("role")
+    q = db.query(*columns_for(Child, ChildOut))
     if role == "admin" and user_id:
-        rows = db.query(Child).filter(Child.user_id == user_id).all()
-    elif role == "doctor":
-        child_ids = [r.child_id for r in db.query(DoctorAssignment).filter(DoctorAssignment.doctor_id == user.get("sub")).all()]
-        if not child_ids:
-            return []
-        rows = db.query(Child).filter(Child.id.in_(child_ids)).all()
-    else:
-        rows = db.query(Child).filter(Child.user_id == user.get("sub")).all()
-    return [ChildOut(**r.__dict__) for r in rows]
+        return q.filter(Child.user_id == user_id).all()
+    if role == "doctor":
+        assigned = db.query(DoctorAssignment.child_id).filter(DoctorAssignment.doctor_id == user.get("sub"))
+        return q.filter(Child.id.in_(assigned.scalar_subquery())).all()
+    return q.filter(Child.user_id == user.get("sub")).all()
 
 
 @router.post("", response_model=ChildOut)
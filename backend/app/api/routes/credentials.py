@@ -1,10 +1,12 @@
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.core.security import get_current_user, require_role
 from app.db import SessionLocal
 from app.models.doctor_credential import DoctorCredential
 from app.schemas.credential import DoctorCredentialCreate, DoctorCredentialOut, DoctorCredentialVerify
+from app.utils.pagination import PageParams, apply_filters, page_params, paginate
+from app.utils.serialization import columns_for
 
 router = APIRouter(prefix="/credentials", tags=["credentials"])
 
@@ -50,14 +52,31 @@ def create_credential(payload: DoctorCredentialCreate, user=Depends(get_current_
 def my_credentials(user=Depends(get_current_user), db: Session = Depends(get_db)):
     if user.get("role") not in ("doctor", "admin"):
         raise HTTPException(status_code=403, detail="Forbidden")
-    rows = db.query(DoctorCredential).filter(DoctorCredential.doctor_id == user.get("sub")).all()
-    return [DoctorCredentialOut(**r.__dict__) for r in rows]
+    return db.query(*columns_for(DoctorCredential, DoctorCredentialOut)).filter(DoctorCredential.doctor_id == user.get("sub")).all()
+
+
+CREDENTIAL_SORT_KEYS = {"created_at": DoctorCredential.created_at, "title": DoctorCredential.title}
 
 
 @router.get("", response_model=list[DoctorCredentialOut])
-def list_credentials(admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
-    rows = db.query(DoctorCredential).all()
-    return [DoctorCredentialOut(**r.__dict__) for r in rows]
+def list_credentials(
+    response: Response,
+    doctor_id: str | None = None,
+    type: str | None = None,
+    verification_status: str | None = None,
+    page: PageParams = Depends(page_params),
+    admin=Depends(require_role("admin")),
+    db: Session = Depends(get_db),
+):
+    q = apply_filters(
+        db.query(*columns_for(DoctorCredential, DoctorCredentialOut)),
+        {
+            DoctorCredential.doctor_id: doctor_id,
+            DoctorCredential.type: type,
+            DoctorCredential.verification_status: verification_status,
+        },
+    )
+    return paginate(q, response, page, CREDENTIAL_SORT_KEYS, DoctorCredential.id, "created_at", "desc")
 
 
 @router.patch("/{credential_id}/verify", response_model=DoctorCredentialOut)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from app.models.doctor import DoctorProfile
 from app.schemas.doctor import DoctorOut
+from app.utils.serialization import columns_for
 from app.core.security import get_current_user
 
 router = APIRouter(prefix="/doctors", tags=["doctors"])
@@ -18,8 +19,7 @@ def get_db():
 
 @router.get("", response_model=list[DoctorOut])
 def list_doctors(user=Depends(get_current_user), db: Session = Depends(get_db)):
-    rows = db.query(DoctorProfile).filter(
+    return db.query(*columns_for(DoctorProfile, DoctorOut)).filter(
         DoctorProfile.verified == True,
         (DoctorProfile.status == "approved") | (DoctorProfile.status == None),
     ).all()
-    return [DoctorOut(**r.__dict__) for r in rows]
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app.core.security import get_current_user
 from app.db import SessionLocal
 from app.models.doc_file import DoctorDocument
+from app.utils.serialization import row_dict
 
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(os.path.dirname(__file__), "..", "..", "..", "uploads"))
 
@@ -40,4 +41,4 @@ def list_docs(user=Depends(get_current_user), db: Session = Depends(get_db)):
     if user.get("role") not in ("doctor", "admin"):
         raise HTTPException(status_code=403, detail="Forbidden")
     rows = db.query(DoctorDocument).filter(DoctorDocument.doctor_id == user["sub"]).all()
-    return [r.__dict__ for r in rows]
+    return [row_dict(r) for r in rows]
@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.core.security import require_role
+from app.db import db_stats
+from app.services.rag_service import rag_service
 
 router = APIRouter()
 
@@ -6,3 +10,13 @@ router = APIRouter()
 @router.get("")
 async def health():
     return {"status": "ok"}
+
+
+@router.get("/rag")
+async def rag_health():
+    return await rag_service.stats()
+
+
+@router.get("/db")
+async def db_health(user=Depends(require_role("admin"))):
+    return db_stats()
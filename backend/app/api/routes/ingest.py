@@ -1,15 +1,86 @@
-from fastapi import APIRouter, HTTPException
+import os
 
-from app.schemas.ingest import IngestRequest, IngestResponse
+from fastapi import APIRouter, File, HTTPException, UploadFile
+
+from app.schemas.ingest import IngestBatchRequest, IngestBatchResponse, IngestRequest, IngestResponse
+from app.services.ingest_queue import PRIORITY_BULK, PRIORITY_INTERACTIVE, IngestQueueFull
 from app.services.rag_service import rag_service
 
+INGEST_BATCH_MAX_DOCS = int(os.getenv("INGEST_BATCH_MAX_DOCS", "1000"))
+INGEST_UPLOAD_MAX_MB = float(os.getenv("INGEST_UPLOAD_MAX_MB", "50"))
+
 router = APIRouter()
 
 
-@router.post("")
-async def ingest(req: IngestRequest) -> IngestResponse:
+def _require_ready():
     if not rag_service.ready:
         raise HTTPException(status_code=503, detail="RAG not ready")
 
-    await rag_service.enqueue_ingest(req.text)
-    return IngestResponse(status="queued")
+
+async def _submit(texts, ids=None, file_paths=None, priority=PRIORITY_INTERACTIVE) -> str:
+    try:
+        return await rag_service.enqueue_ingest(texts, ids=ids, file_paths=file_paths, priority=priority)
+    except IngestQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "30"})
+
+
+@router.post("")
+async def ingest(req: IngestRequest) -> IngestResponse:
+    _require_ready()
+    job_id = await _submit(req.text)
+    return IngestResponse(status="queued", job_id=job_id)
+
+
+@router.post("/batch")
+async def ingest_batch(req: IngestBatchRequest) -> IngestBatchResponse:
+    _require_ready()
+    docs = [d for d in req.documents if d.text.strip()]
+    if not docs:
+        raise HTTPException(status_code=400, detail="No documents")
+    if len(docs) > INGEST_BATCH_MAX_DOCS:
+        raise HTTPException(status_code=413, detail=f"At most {INGEST_BATCH_MAX_DOCS} documents per batch")
+    with_ids = sum(1 for d in docs if d.id)
+    if with_ids not in (0, len(docs)):
+        raise HTTPException(status_code=400, detail="Either every document or none must have an id")
+
+    ids = [d.id for d in docs] if with_ids else None
+    file_paths = [d.file_path or "unknown_source" for d in docs]
+    job_id = await _submit([d.text for d in docs], ids, file_paths, PRIORITY_BULK)
+    return IngestBatchResponse(status="queued", job_id=job_id, documents=len(docs))
+
+
+@router.post("/files")
+async def ingest_files(files: list[UploadFile] = File(...)) -> IngestBatchResponse:
+    _require_ready()
+    if len(files) > INGEST_BATCH_MAX_DOCS:
+        raise HTTPException(status_code=413, detail=f"At most {INGEST_BATCH_MAX_DOCS} files per batch")
+
+    budget = int(INGEST_UPLOAD_MAX_MB * 1024 * 1024)
+    texts: list[str] = []
+    file_paths: list[str] = []
+    for upload in files:
+        if not (upload.filename or "").lower().endswith(".txt"):
+            raise HTTPException(status_code=400, detail=f"Only .txt files are accepted: {upload.filename}")
+        parts: list[bytes] = []
+        while chunk := await upload.read(1024 * 1024):
+            budget -= len(chunk)
+            if budget < 0:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {INGEST_UPLOAD_MAX_MB:g} MB")
+            parts.append(chunk)
+        text = b"".join(parts).decode("utf-8", errors="ignore").strip()
+        if text:
+            texts.append(text)
+            file_paths.append(upload.filename)
+    if not texts:
+        raise HTTPException(status_code=400, detail="No documents")
+
+    job_id = await _submit(texts, None, file_paths, PRIORITY_BULK)
+    return IngestBatchResponse(status="queued", job_id=job_id, documents=len(texts))
+
+
+@router.get("/jobs/{job_id}")
+async def ingest_job(job_id: str):
+    job = await rag_service.ingest_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
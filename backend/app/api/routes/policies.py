@@ -4,6 +4,7 @@ from app.core.security import require_role
 from app.db import SessionLocal
 from app.models.cancellation_policy import CancellationPolicy
 from app.schemas.policy import CancellationPolicyCreate, CancellationPolicyOut
+from app.utils.serialization import columns_for
 
 router = APIRouter(prefix="/policies", tags=["policies"])
 
@@ -18,8 +19,7 @@ def get_db():
 
 @router.get("", response_model=list[CancellationPolicyOut])
 def list_policies(db: Session = Depends(get_db)):
-    rows = db.query(CancellationPolicy).all()
-    return [CancellationPolicyOut(**r.__dict__) for r in rows]
+    return db.query(*columns_for(CancellationPolicy, CancellationPolicyOut)).all()
 
 
 @router.post("", response_model=CancellationPolicyOut)
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.core.security import get_current_user, require_role
 from app.db import SessionLocal
 from app.models.doctor_rank import DoctorRank
 from app.models.rank_rule import RankRule
 from app.schemas.rank import DoctorRankOut, DoctorRankUpsert, RankRuleCreate, RankRuleOut
+from app.utils.pagination import PageParams, apply_filters, page_params, paginate
+from app.utils.serialization import columns_for
 
 router = APIRouter(prefix="/ranks", tags=["ranks"])
 
@@ -17,10 +19,19 @@ def get_db():
         db.close()
 
 
+RANK_SORT_KEYS = {"updated_at": DoctorRank.updated_at, "level": DoctorRank.level}
+
+
 @router.get("", response_model=list[DoctorRankOut])
-def list_ranks(admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
-    rows = db.query(DoctorRank).all()
-    return [DoctorRankOut(**r.__dict__) for r in rows]
+def list_ranks(
+    response: Response,
+    level: str | None = None,
+    page: PageParams = Depends(page_params),
+    admin=Depends(require_role("admin")),
+    db: Session = Depends(get_db),
+):
+    q = apply_filters(db.query(*columns_for(DoctorRank, DoctorRankOut)), {DoctorRank.level: level})
+    return paginate(q, response, page, RANK_SORT_KEYS, DoctorRank.id, "updated_at", "desc")
 
 
 @router.get("/doctor/{doctor_id}", response_model=DoctorRankOut)
@@ -53,8 +64,7 @@ def upsert_rank(payload: DoctorRankUpsert, admin=Depends(require_role("admin")),
 
 @router.get("/rules", response_model=list[RankRuleOut])
 def list_rules(admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
-    rows = db.query(RankRule).all()
-    return [RankRuleOut(**r.__dict__) for r in rows]
+    return db.query(*columns_for(RankRule, RankRuleOut)).all()
 
 
 @router.post("/rules", response_model=RankRuleOut)
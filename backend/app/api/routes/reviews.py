@@ -6,6 +6,7 @@ from app.models.admin_review import AdminReview
 from app.models.doctor import DoctorProfile
 from app.schemas.review import AdminReviewCreate, AdminReviewOut
 from app.utils.audit import log_activity
+from app.utils.serialization import columns_for
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
@@ -20,11 +21,10 @@ def get_db():
 
 @router.get("", response_model=list[AdminReviewOut])
 def list_reviews(doctor_id: str | None = None, admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
-    q = db.query(AdminReview)
+    q = db.query(*columns_for(AdminReview, AdminReviewOut))
     if doctor_id:
         q = q.filter(AdminReview.doctor_id == doctor_id)
-    rows = q.order_by(AdminReview.created_at.desc()).all()
-    return [AdminReviewOut(**r.__dict__) for r in rows]
+    return q.order_by(AdminReview.created_at.desc()).all()
 
 
 @router.post("", response_model=AdminReviewOut)
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.core.security import get_current_user, require_role
 from app.db import SessionLocal
 from app.models.doctor_schedule import DoctorSchedule
 from app.models.time_slot import TimeSlot
-from app.schemas.schedule import DoctorScheduleCreate, DoctorScheduleUpdate, DoctorScheduleOut
-from app.schemas.slot import TimeSlotOut
+from app.schemas.schedule import DoctorScheduleBulkCreate, DoctorScheduleCreate, DoctorScheduleUpdate, DoctorScheduleOut
+from app.services import slot_bulk
+from app.services.availability import availability
 from app.utils.audit import log_activity
+from app.utils.pagination import PageParams, apply_filters, page_params, paginate, parse_datetime
+from app.utils.serialization import columns_for
 
 router = APIRouter(prefix="/schedules", tags=["schedules"])
 
@@ -19,38 +22,49 @@ def get_db():
         db.close()
 
 
+SCHEDULE_SORT_KEYS = {"created_at": DoctorSchedule.created_at}
+
+
 @router.get("", response_model=list[DoctorScheduleOut])
-def list_all(admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
-    rows = db.query(DoctorSchedule).all()
-    return [DoctorScheduleOut(**r.__dict__) for r in rows]
+def list_all(
+    response: Response,
+    doctor_id: str | None = None,
+    slot_id: str | None = None,
+    status: str | None = None,
+    page: PageParams = Depends(page_params),
+    admin=Depends(require_role("admin")),
+    db: Session = Depends(get_db),
+):
+    q = apply_filters(
+        db.query(*columns_for(DoctorSchedule, DoctorScheduleOut)),
+        {DoctorSchedule.doctor_id: doctor_id, DoctorSchedule.slot_id: slot_id, DoctorSchedule.status: status},
+    )
+    return paginate(q, response, page, SCHEDULE_SORT_KEYS, DoctorSchedule.id, "created_at", "desc")
 
 
 @router.get("/my", response_model=list[DoctorScheduleOut])
 def my_schedules(user=Depends(get_current_user), db: Session = Depends(get_db)):
     if user.get("role") not in ("doctor", "admin"):
         raise HTTPException(status_code=403, detail="Forbidden")
-    rows = db.query(DoctorSchedule).filter(DoctorSchedule.doctor_id == user.get("sub")).all()
-    return [DoctorScheduleOut(**r.__dict__) for r in rows]
+    return db.query(*columns_for(DoctorSchedule, DoctorScheduleOut)).filter(DoctorSchedule.doctor_id == user.get("sub")).all()
 
 
 @router.get("/doctor/{doctor_id}", response_model=list[DoctorScheduleOut])
-def doctor_availability(doctor_id: str, user=Depends(get_current_user), db: Session = Depends(get_db)):
-    rows = (
-        db.query(DoctorSchedule, TimeSlot)
-        .join(TimeSlot, DoctorSchedule.slot_id == TimeSlot.id)
-        .filter(
-            DoctorSchedule.doctor_id == doctor_id,
-            DoctorSchedule.status == "available",
-            TimeSlot.is_active == True,
-        )
-        .all()
-    )
-    result: list[DoctorScheduleOut] = []
-    for schedule, slot in rows:
-        out = DoctorScheduleOut(**schedule.__dict__)
-        out.slot = TimeSlotOut(**slot.__dict__)
-        result.append(out)
-    return result
+def doctor_availability(
+    doctor_id: str,
+    response: Response,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    items, etag = availability.query(db, doctor_id, parse_datetime(date_from), parse_datetime(date_to))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return items
 
 
 @router.post("", response_model=DoctorScheduleOut)
@@ -75,11 +89,49 @@ def create_schedule(payload: DoctorScheduleCreate, user=Depends(get_current_user
     db.add(schedule)
     db.commit()
     db.refresh(schedule)
+    availability.put(schedule, slot)
     if user.get("role") == "admin":
         log_activity(db, user["sub"], "schedule_created", f"doctor_id={doctor_id},slot_id={payload.slot_id}")
     return DoctorScheduleOut(**schedule.__dict__)
 
 
+@router.post("/bulk")
+def bulk_create_schedules(payload: DoctorScheduleBulkCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    if user.get("role") not in ("doctor", "admin"):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    doctor_ids = list(dict.fromkeys(payload.doctor_ids)) if user.get("role") == "admin" else [user.get("sub")]
+    if not doctor_ids:
+        raise HTTPException(status_code=400, detail="doctor_ids required")
+    missing = slot_bulk.missing_doctors(db, doctor_ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Doctor not found: {missing[0]}")
+    q = db.query(TimeSlot.start_time, TimeSlot.end_time, TimeSlot.id).filter(TimeSlot.is_active == True)
+    if payload.slot_ids:
+        q = q.filter(TimeSlot.id.in_(payload.slot_ids))
+    else:
+        start, end = parse_datetime(payload.date_from), parse_datetime(payload.date_to)
+        if not start or not end:
+            raise HTTPException(status_code=400, detail="slot_ids or date_from and date_to required")
+        q = apply_filters(q.filter(TimeSlot.start_time >= start, TimeSlot.start_time < end), {TimeSlot.slot_type: payload.slot_type})
+    slots = [tuple(row) for row in q.limit(slot_bulk.BULK_SLOTS_MAX + 1)]
+    if len(slots) > slot_bulk.BULK_SLOTS_MAX:
+        raise HTTPException(status_code=400, detail=f"More than {slot_bulk.BULK_SLOTS_MAX} slots selected")
+    if payload.slot_ids and len(slots) != len(set(payload.slot_ids)):
+        raise HTTPException(status_code=404, detail="Slot not found")
+    try:
+        pairs, already, conflicts = slot_bulk.plan_schedules(db, doctor_ids, slots)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if conflicts and not payload.skip_conflicts:
+        raise HTTPException(status_code=409, detail=slot_bulk.conflict_detail("Slots overlap the doctor's schedule", conflicts))
+    created = slot_bulk.insert_schedules(db, pairs, payload.status)
+    log_activity(db, user["sub"], "schedules_bulk_created", f"doctors={len(doctor_ids)},schedules={created}")
+    db.commit()
+    for doctor_id in doctor_ids:
+        availability.invalidate(doctor_id)
+    return {"created": created, "existing": already, "skipped": len(conflicts)}
+
+
 @router.patch("/{schedule_id}/status", response_model=DoctorScheduleOut)
 def update_schedule_status(schedule_id: str, payload: DoctorScheduleUpdate, user=Depends(get_current_user), db: Session = Depends(get_db)):
     schedule = db.query(DoctorSchedule).filter(DoctorSchedule.id == schedule_id).first()
@@ -92,6 +144,7 @@ def update_schedule_status(schedule_id: str, payload: DoctorScheduleUpdate, user
     schedule.status = payload.status
     db.commit()
     db.refresh(schedule)
+    availability.put(schedule, db.get(TimeSlot, schedule.slot_id))
     if user.get("role") == "admin":
         log_activity(db, user["sub"], "schedule_status_updated", f"schedule_id={schedule_id},status={payload.status}")
     return DoctorScheduleOut(**schedule.__dict__)
@@ -1,11 +1,16 @@
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.core.security import get_current_user, require_role
 from app.db import SessionLocal
 from app.models.time_slot import TimeSlot
-from app.schemas.slot import TimeSlotCreate, TimeSlotUpdate, TimeSlotOut
+from app.schemas.slot import TimeSlotBulkCreate, TimeSlotCreate, TimeSlotUpdate, TimeSlotOut
+from app.services import slot_bulk
+from app.services.availability import availability
+from app.services.slot_index import slot_index
 from app.utils.audit import log_activity
+from app.utils.pagination import PageParams, apply_filters, page_params, paginate
+from app.utils.serialization import columns_for
 
 router = APIRouter(prefix="/slots", tags=["slots"])
 
@@ -25,13 +30,38 @@ def _parse_dt(value: str) -> datetime:
         raise HTTPException(status_code=400, detail="Invalid datetime format, use ISO") from exc
 
 
+SLOT_SORT_KEYS = {"start_time": TimeSlot.start_time, "created_at": TimeSlot.created_at}
+
+
 @router.get("", response_model=list[TimeSlotOut])
-def list_slots(active_only: bool = True, user=Depends(get_current_user), db: Session = Depends(get_db)):
-    q = db.query(TimeSlot)
+def list_slots(
+    response: Response,
+    active_only: bool = True,
+    slot_type: str | None = None,
+    page: PageParams = Depends(page_params),
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    q = apply_filters(db.query(*columns_for(TimeSlot, TimeSlotOut)), {TimeSlot.slot_type: slot_type})
     if active_only:
         q = q.filter(TimeSlot.is_active == True)
-    rows = q.order_by(TimeSlot.start_time.asc()).all()
-    return [TimeSlotOut(**r.__dict__) for r in rows]
+    return paginate(q, response, page, SLOT_SORT_KEYS, TimeSlot.id, "start_time")
+
+
+@router.get("/free")
+def free_windows(date_from: str, date_to: str, min_minutes: int = Query(0, ge=0), user=Depends(get_current_user)):
+    """Gaps between active slots in ``[date_from, date_to)``, from the in-memory slot index."""
+    start, end = _parse_dt(date_from), _parse_dt(date_to)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="date_to must be after date_from")
+    windows = slot_index.free_windows(start, end, timedelta(minutes=min_minutes))
+    return [{"start_time": s.isoformat(), "end_time": e.isoformat()} for s, e in windows]
+
+
+def _reject_overlap(start: datetime, end: datetime, slot_id: str | None = None):
+    clash = slot_index.conflicts(start, end, ignore=slot_id)
+    if clash:
+        raise HTTPException(status_code=409, detail=f"Slot overlaps slot {clash[0][2]} ({clash[0][0].isoformat()} - {clash[0][1].isoformat()})")
 
 
 @router.post("", response_model=TimeSlotOut)
@@ -43,21 +73,57 @@ def create_slot(payload: TimeSlotCreate, admin=Depends(require_role("admin")), d
     duration = payload.duration
     if duration is None:
         duration = int((end - start).total_seconds() / 60)
-    slot = TimeSlot(
-        start_time=start,
-        end_time=end,
-        duration=duration,
-        slot_type=payload.slot_type,
-        created_by=admin["sub"],
-        is_active=payload.is_active,
-    )
-    db.add(slot)
-    db.commit()
-    db.refresh(slot)
+    with slot_index.guard:
+        if payload.is_active:
+            _reject_overlap(start, end)
+        slot = TimeSlot(
+            start_time=start,
+            end_time=end,
+            duration=duration,
+            slot_type=payload.slot_type,
+            created_by=admin["sub"],
+            is_active=payload.is_active,
+        )
+        db.add(slot)
+        db.commit()
+        db.refresh(slot)
+        slot_index.sync(slot)
     log_activity(db, admin["sub"], "slot_created", f"slot_id={slot.id}")
     return TimeSlotOut(**slot.__dict__)
 
 
+@router.post("/bulk")
+def bulk_create_slots(payload: TimeSlotBulkCreate, admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
+    rule = payload.recurrence
+    try:
+        intervals = slot_bulk.expand(rule.start_date, rule.end_date, rule.weekdays, rule.day_start, rule.day_end,
+                                     rule.every_minutes, rule.duration)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    doctor_ids = list(dict.fromkeys(payload.doctor_ids))
+    missing = slot_bulk.missing_doctors(db, doctor_ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Doctor not found: {missing[0]}")
+    with slot_index.guard:
+        free, conflicts = slot_bulk.plan_slots(intervals)
+        if conflicts and not payload.skip_conflicts:
+            raise HTTPException(status_code=409, detail=slot_bulk.conflict_detail("Slots overlap existing slots", conflicts))
+        rows = slot_bulk.insert_slots(db, free, payload.slot_type, admin["sub"])
+        try:
+            pairs, _, _ = slot_bulk.plan_schedules(db, doctor_ids, [(r["start_time"], r["end_time"], r["id"]) for r in rows])
+        except ValueError as exc:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(exc))
+        schedules = slot_bulk.insert_schedules(db, pairs, "available")
+        log_activity(db, admin["sub"], "slots_bulk_created", f"slots={len(rows)},schedules={schedules},skipped={len(conflicts)}")
+        db.commit()
+        for row in rows:
+            slot_index.add(row["id"], row["start_time"], row["end_time"])
+    for doctor_id in doctor_ids:
+        availability.invalidate(doctor_id)
+    return {"created": len(rows), "skipped": len(conflicts), "schedules_created": schedules}
+
+
 @router.put("/{slot_id}", response_model=TimeSlotOut)
 def update_slot(slot_id: str, payload: TimeSlotUpdate, admin=Depends(require_role("admin")), db: Session = Depends(get_db)):
     slot = db.query(TimeSlot).filter(TimeSlot.id == slot_id).first()
@@ -68,10 +134,18 @@ def update_slot(slot_id: str, payload: TimeSlotUpdate, admin=Depends(require_rol
         data["start_time"] = _parse_dt(data["start_time"])
     if "end_time" in data:
         data["end_time"] = _parse_dt(data["end_time"])
-    for k, v in data.items():
-        setattr(slot, k, v)
-    db.commit()
-    db.refresh(slot)
+    start, end = data.get("start_time", slot.start_time), data.get("end_time", slot.end_time)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+    with slot_index.guard:
+        if data.get("is_active", slot.is_active):
+            _reject_overlap(start, end, slot.id)
+        for k, v in data.items():
+            setattr(slot, k, v)
+        db.commit()
+        db.refresh(slot)
+        slot_index.sync(slot)
+    availability.invalidate()
     log_activity(db, admin["sub"], "slot_updated", f"slot_id={slot.id}")
     return TimeSlotOut(**slot.__dict__)
 
@@ -83,5 +157,7 @@ def delete_slot(slot_id: str, admin=Depends(require_role("admin")), db: Session
         raise HTTPException(status_code=404, detail="Slot not found")
     slot.is_active = False
     db.commit()
+    slot_index.discard(slot.id)
+    availability.invalidate()
     log_activity(db, admin["sub"], "slot_deactivated", f"slot_id={slot.id}")
     return {"status": "deactivated"}
@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import uuid
 
 from app.core.security import get_current_user
-from app.db import SessionLocal
+from app.db import SessionLocal, get_async_db
 from app.models.user import User
 from app.models.settings import UserSettings
 from app.models.notifications import Notification
 from app.models.activities import Activity
-from app.utils.password import hash_password, verify_password
+from app.services.password_hasher import hash_or_429, verify_or_429
 from app.schemas.user import (
     ProfileOut,
     ProfileUpdate,
@@ -22,6 +24,7 @@ from app.schemas.user import (
 from app.schemas.password import ForgotRequest, ResetRequest
 from app.models.security import PasswordReset
 from app.utils.emailer import send_email
+from app.utils.serialization import columns_for
 from app.models.doctor import DoctorProfile
 from app.schemas.doctor import DoctorOut
 
@@ -70,14 +73,14 @@ def update_profile(payload: ProfileUpdate, user=Depends(get_current_user), db: S
 
 
 @router.put("/password")
-def change_password(payload: PasswordChange, user=Depends(get_current_user), db: Session = Depends(get_db)):
-    u = db.query(User).filter(User.id == user["sub"]).first()
+async def change_password(payload: PasswordChange, user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    u = await db.get(User, user["sub"])
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
-    if not verify_password(payload.current_password, u.password_hash):
+    if not await verify_or_429(payload.current_password, u.password_hash):
         raise HTTPException(status_code=400, detail="Current password incorrect")
-    u.password_hash = hash_password(payload.new_password)
-    db.commit()
+    u.password_hash = await hash_or_429(payload.new_password)
+    await db.commit()
     return {"status": "password_changed"}
 
 
@@ -100,14 +103,13 @@ def update_settings(payload: SettingsUpdate, user=Depends(get_current_user), db:
 
 @router.get("/notifications", response_model=list[NotificationOut])
 def list_notifications(user=Depends(get_current_user), db: Session = Depends(get_db)):
-    rows = (
-        db.query(Notification)
+    return (
+        db.query(*columns_for(Notification, NotificationOut))
         .filter(Notification.user_id == user["sub"])
         .order_by(Notification.created_at.desc())
         .limit(50)
         .all()
     )
-    return [NotificationOut(**r.__dict__) for r in rows]
 
 
 @router.post("/notifications/clear")
@@ -119,14 +121,13 @@ def clear_notifications(user=Depends(get_current_user), db: Session = Depends(ge
 
 @router.get("/activity", response_model=list[ActivityOut])
 def list_activity(user=Depends(get_current_user), db: Session = Depends(get_db)):
-    rows = (
-        db.query(Activity)
+    return (
+        db.query(*columns_for(Activity, ActivityOut))
         .filter(Activity.user_id == user["sub"])
         .order_by(Activity.created_at.desc())
         .limit(50)
         .all()
     )
-    return [ActivityOut(**r.__dict__) for r in rows]
 
 
 @router.get("/doctor", response_model=DoctorOut)
@@ -187,18 +188,16 @@ def forgot_password(payload: ForgotRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/reset")
-def reset_password(payload: ResetRequest, db: Session = Depends(get_db)):
-    rec = (
-        db.query(PasswordReset)
-        .filter(PasswordReset.token == payload.token, PasswordReset.used == False)
-        .first()
+async def reset_password(payload: ResetRequest, db: AsyncSession = Depends(get_async_db)):
+    rec = await db.scalar(
+        select(PasswordReset).where(PasswordReset.token == payload.token, PasswordReset.used == False).limit(1)
     )
     if not rec or rec.expires_at < datetime.utcnow():
         raise HTTPException(status_code=400, detail="Invalid or expired token")
-    user = db.query(User).filter(User.id == rec.user_id).first()
+    user = await db.get(User, rec.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.password_hash = hash_password(payload.new_password)
+    user.password_hash = await hash_or_429(payload.new_password)
     rec.used = True
-    db.commit()
+    await db.commit()
     return {"status": "password_reset"}
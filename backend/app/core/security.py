@@ -1,10 +1,14 @@
+import base64
 import os
+import threading
 import time
+import uuid
 import hmac
 import hashlib
 import json
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional
 from fastapi import Depends, HTTPException, Header
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
@@ -12,47 +16,148 @@ SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_SECONDS = int(os.getenv("JWT_EXPIRE_SECONDS", "3600"))
 REFRESH_TOKEN_EXPIRE_SECONDS = int(os.getenv("JWT_REFRESH_SECONDS", str(7 * 24 * 3600)))
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_CACHE_TTL = float(os.getenv("JWT_CACHE_TTL", "300"))
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
+# keyed once; .copy() per token skips re-deriving the padded key
+_HMAC_KEY = hmac.new(SECRET_KEY.encode(), digestmod=hashlib.sha256)
+
+
+def _hmac(signing_input: bytes) -> bytes:
+    mac = _HMAC_KEY.copy()
+    mac.update(signing_input)
+    return mac.digest()
+
 
 def _b64url(data: bytes) -> str:
-    import base64
     return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
 
 
+def _b64decode(part: str) -> bytes:
+    return base64.urlsafe_b64decode(part + "=" * (-len(part) % 4))
+
+
 def _jwt_sign(header: dict, payload: dict, expires_in: int) -> str:
-    import json as jsonlib
     now = datetime.now(timezone.utc)
     payload = payload.copy()
     payload["iat"] = int(now.timestamp())
     payload["exp"] = int((now + timedelta(seconds=expires_in)).timestamp())
-    header_b64 = _b64url(jsonlib.dumps(header, separators=(",", ":"), sort_keys=True).encode())
-    payload_b64 = _b64url(jsonlib.dumps(payload, separators=(",", ":"), sort_keys=True).encode())
-    signing_input = f"{header_b64}.{payload_b64}".encode()
-    signature = hmac.new(SECRET_KEY.encode(), signing_input, hashlib.sha256).digest()
+    # unique per token, so revoking one login never hits another issued in the same second
+    payload["jti"] = uuid.uuid4().hex
+    header_b64 = _b64url(json.dumps(header, separators=(",", ":"), sort_keys=True).encode())
+    payload_b64 = _b64url(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode())
+    signature = _hmac(f"{header_b64}.{payload_b64}".encode())
     return f"{header_b64}.{payload_b64}.{_b64url(signature)}"
 
 
 def _jwt_decode(token: str) -> dict:
-    import base64
     parts = token.split(".")
     if len(parts) != 3:
         raise HTTPException(status_code=401, detail="Invalid token")
     header_b64, payload_b64, signature_b64 = parts
-    def b64decode(p):
-        padding = "=" * ((4 - len(p) % 4) % 4)
-        return base64.urlsafe_b64decode(p + padding)
-    signing_input = f"{header_b64}.{payload_b64}".encode()
-    expected = hmac.new(SECRET_KEY.encode(), signing_input, hashlib.sha256).digest()
-    if not hmac.compare_digest(expected, b64decode(signature_b64)):
+    expected = _hmac(f"{header_b64}.{payload_b64}".encode())
+    try:
+        signature = _b64decode(signature_b64)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if not hmac.compare_digest(expected, signature):
         raise HTTPException(status_code=401, detail="Invalid token signature")
-    payload = json.loads(b64decode(payload_b64))
+    payload = json.loads(_b64decode(payload_b64))
     if "exp" in payload and time.time() > payload["exp"]:
         raise HTTPException(status_code=401, detail="Token expired")
     return payload
 
 
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class RevocationList:
+    """Revoked token digests, each kept until the token would have expired anyway.
+
+    Local to the process; ``add_hook`` plugs in a shared check (DB, cache
+    server) for multi-worker deployments. A hook gets ``(digest, claims)`` and
+    returns True when the token must be rejected.
+    """
+
+    def __init__(self):
+        self._revoked: dict[bytes, float] = {}
+        self._hooks: list[Callable[[bytes, dict], bool]] = []
+        self._lock = threading.Lock()
+        self._prune_at = 1024
+
+    def add_hook(self, hook: Callable[[bytes, dict], bool]):
+        self._hooks.append(hook)
+
+    def revoke(self, digest: bytes, expires_at: float):
+        now = time.time()
+        with self._lock:
+            if len(self._revoked) >= self._prune_at:
+                self._revoked = {d: exp for d, exp in self._revoked.items() if exp > now}
+                self._prune_at = max(1024, 2 * len(self._revoked))
+            self._revoked[digest] = expires_at
+
+    def is_revoked(self, digest: bytes, claims: dict) -> bool:
+        if digest in self._revoked:
+            return True
+        return any(hook(digest, claims) for hook in self._hooks)
+
+
+class VerifiedTokenCache:
+    """LRU of verified token claims, keyed by token digest.
+
+    Entries live ``JWT_CACHE_TTL`` seconds at most and never past the token's
+    ``exp``; revocation is checked on every hit.
+    """
+
+    def __init__(self, max_size: int = JWT_CACHE_SIZE, ttl: float = JWT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: bytes) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, valid_until = entry
+            if time.time() > valid_until:
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return claims
+
+    def put(self, digest: bytes, claims: dict):
+        valid_until = time.time() + self.ttl
+        if "exp" in claims:
+            valid_until = min(valid_until, claims["exp"])
+        with self._lock:
+            self._entries[digest] = (claims, valid_until)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, digest: bytes):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+revocations = RevocationList()
+token_cache = VerifiedTokenCache()
+
+
 def create_access_token(data: dict) -> str:
     header = {"alg": ALGORITHM, "typ": "JWT"}
     return _jwt_sign(header, data, ACCESS_TOKEN_EXPIRE_SECONDS)
@@ -64,7 +169,27 @@ def create_refresh_token(data: dict) -> str:
 
 
 def decode_token(token: str) -> dict:
-    return _jwt_decode(token)
+    digest = token_digest(token)
+    claims = token_cache.get(digest) if token_cache.max_size > 0 else None
+    if claims is None:
+        claims = _jwt_decode(token)
+        if token_cache.max_size > 0:
+            token_cache.put(digest, claims)
+    if revocations.is_revoked(digest, claims):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    # callers may mutate the claims; the cached copy stays intact
+    return dict(claims)
+
+
+def revoke_token(token: str):
+    """Reject ``token`` from now on (logout). Tokens that fail verification are ignored."""
+    try:
+        claims = _jwt_decode(token)
+    except HTTPException:
+        return
+    digest = token_digest(token)
+    revocations.revoke(digest, claims.get("exp", time.time() + REFRESH_TOKEN_EXPIRE_SECONDS))
+    token_cache.discard(digest)
 
 
 async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
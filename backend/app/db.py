@@ -1,16 +1,135 @@
 import os
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DB_URL = os.getenv("DB_URL", "sqlite:///./app.db")
+DB_PROFILE = os.getenv("DB_PROFILE", "standard")
+
+# legacy: driver defaults. standard: WAL + busy_timeout so concurrent writers wait
+# instead of failing with "database is locked". production: bigger caches and pools.
+_PROFILES = {
+    "legacy": {"pragmas": {}, "pool": {}},
+    "standard": {
+        "pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000},
+        "pool": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_pre_ping": True, "pool_recycle": 1800},
+    },
+    "production": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 15000,
+            "cache_size": -64000,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+        },
+        "pool": {"pool_size": 20, "max_overflow": 20, "pool_timeout": 10, "pool_pre_ping": True, "pool_recycle": 1800},
+    },
+}
+
+_POOL_OVERRIDES = {
+    "pool_size": "DB_POOL_SIZE",
+    "max_overflow": "DB_MAX_OVERFLOW",
+    "pool_timeout": "DB_POOL_TIMEOUT",
+    "pool_recycle": "DB_POOL_RECYCLE",
+}
+
+
+def _profile() -> dict:
+    if DB_PROFILE not in _PROFILES:
+        raise RuntimeError(f"Unknown DB_PROFILE {DB_PROFILE!r}, expected one of {sorted(_PROFILES)}")
+    profile = _PROFILES[DB_PROFILE]
+    pool = dict(profile["pool"])
+    for key, env in _POOL_OVERRIDES.items():
+        if os.getenv(env):
+            pool[key] = int(os.getenv(env))
+    pragmas = dict(profile["pragmas"])
+    if os.getenv("SQLITE_BUSY_TIMEOUT_MS"):
+        pragmas["busy_timeout"] = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS"))
+    return {"pragmas": pragmas, "pool": pool}
+
+
+def _engine_kwargs(url: str) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # in-memory databases use a single-connection pool that takes no sizing
+        return {}
+    return _profile()["pool"]
+
+
+def _install_sqlite_pragmas(sync_engine):
+    pragmas = _profile()["pragmas"]
+    if sync_engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class PoolMetrics:
+    def __init__(self, sync_engine):
+        self.engine = sync_engine
+        self.checkouts = 0
+        self.peak_checked_out = 0
+        event.listen(sync_engine, "checkout", self._on_checkout)
+
+    def _on_checkout(self, *_):
+        self.checkouts += 1
+        checked_out = getattr(self.engine.pool, "checkedout", lambda: 0)()
+        self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def stats(self) -> dict:
+        pool = self.engine.pool
+        stats = {"pool": type(pool).__name__, "checkouts": self.checkouts, "peak_checked_out": self.peak_checked_out}
+        if hasattr(pool, "checkedout"):
+            capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+                capacity=capacity,
+                saturation=round(pool.checkedout() / capacity, 3) if capacity else None,
+            )
+        return stats
+
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    # psycopg 3 (requirements.txt) has a native async mode
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg:" + url[len(prefix):]
+    return url
+
+
+ASYNC_DB_URL = os.getenv("ASYNC_DB_URL") or _async_url(DB_URL)
 
 connect_args = {"check_same_thread": False} if DB_URL.startswith("sqlite") else {}
-engine = create_engine(DB_URL, connect_args=connect_args, future=True)
+engine = create_engine(DB_URL, connect_args=connect_args, future=True, **_engine_kwargs(DB_URL))
+_install_sqlite_pragmas(engine)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
+# Async handlers use this engine so commits never block the event loop;
+# scripts and sync routes keep using SessionLocal.
+async_engine = create_async_engine(ASYNC_DB_URL, **_engine_kwargs(ASYNC_DB_URL))
+_install_sqlite_pragmas(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+pool_metrics = {"sync": PoolMetrics(engine), "async": PoolMetrics(async_engine.sync_engine)}
+
+
+def db_stats() -> dict:
+    return {"profile": DB_PROFILE, "dialect": engine.dialect.name, **{k: m.stats() for k, m in pool_metrics.items()}}
+
 
 def init_db():
     # Import models here so metadata is populated
@@ -38,49 +157,12 @@ def init_db():
     from app.models.rank_rule import RankRule  # noqa
     from app.models.booking_lock import BookingLock  # noqa
     from app.models.cancellation_policy import CancellationPolicy  # noqa
+    from app.models.ingest_job import IngestJob  # noqa
+    from app.models.report_counter import ReportCounter  # noqa
+    from app.models.analytics_rollup import AnalyticsRollup  # noqa
     Base.metadata.create_all(bind=engine)
-    _ensure_columns()
-
-
-def _column_exists_sqlite(conn, table_name: str, column_name: str) -> bool:
-    rows = conn.execute(text(f"PRAGMA table_info({table_name})")).fetchall()
-    return any(r[1] == column_name for r in rows)
-
-
-def _ensure_columns():
-    columns = {
-        "users": [
-            ("phone", "TEXT"),
-            ("status", "TEXT"),
-        ],
-        "doctor_profiles": [
-            ("consultation_fee", "FLOAT"),
-            ("is_clinic", "BOOLEAN"),
-            ("is_online", "BOOLEAN"),
-            ("status", "TEXT"),
-        ],
-        "appointments": [
-            ("slot_id", "TEXT"),
-            ("reason", "TEXT"),
-        ],
-        "notifications": [
-            ("type", "TEXT"),
-            ("payload", "TEXT"),
-            ("read_at", "TIMESTAMP"),
-            ("sent_at", "TIMESTAMP"),
-        ],
-    }
-
-    with engine.begin() as conn:
-        if engine.dialect.name == "sqlite":
-            for table, cols in columns.items():
-                for col, col_type in cols:
-                    if not _column_exists_sqlite(conn, table, col):
-                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}"))
-        elif engine.dialect.name.startswith("postgres"):
-            for table, cols in columns.items():
-                for col, col_type in cols:
-                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {col} {col_type}"))
+    from app.migrations import run_migrations
+    run_migrations(engine)
 
 
 @contextmanager
@@ -90,3 +172,8 @@ def db_session():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
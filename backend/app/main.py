@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -5,11 +7,14 @@ from app.core.config import settings
 from app.core.security import require_api_key
 from app.api.routes import health, chat, ingest, auth
 from app.db import init_db
+from app.services import analytics, booking_locks, report_counters, slot_index
 from app.utils.seed_demo import seed_demo_users
+from app.utils.serialization import DefaultResponse
+from app.workers.ingest_worker import INGEST_SOURCE_DIR, IngestWorker
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(title=settings.app_name, default_response_class=DefaultResponse)
 
     app.add_middleware(
         CORSMiddleware,
@@ -17,6 +22,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
     )
 
     app.include_router(health.router, prefix="/health", tags=["health"])
@@ -37,12 +43,35 @@ def create_app() -> FastAPI:
     app.include_router(ranks.router)
     app.include_router(booking.router)
     app.include_router(policies.router)
-    from app.api.routes import children
+    from app.api.routes import children, analytics as analytics_routes
     app.include_router(children.router)
+    app.include_router(analytics_routes.router)
+
+    @app.on_event("startup")
+    async def start_ingest_worker():
+        if INGEST_SOURCE_DIR:
+            app.state.ingest_task = asyncio.create_task(IngestWorker(INGEST_SOURCE_DIR).run())
+
+    @app.on_event("startup")
+    async def start_analytics_refresher():
+        if analytics.ANALYTICS_REFRESH_SECONDS > 0:
+            app.state.analytics_task = asyncio.create_task(analytics.refresher.run())
+
+    @app.on_event("startup")
+    async def start_slot_index_refresher():
+        if slot_index.SLOT_INDEX_REFRESH_SECONDS > 0:
+            app.state.slot_index_task = asyncio.create_task(slot_index.refresher.run())
+
+    @app.on_event("startup")
+    async def start_lock_sweeper():
+        if booking_locks.BOOKING_LOCK_SWEEP_SECONDS > 0:
+            app.state.lock_sweeper_task = asyncio.create_task(booking_locks.sweeper.run())
 
     return app
 
 
 init_db()
 seed_demo_users()
+report_counters.install()
+slot_index.slot_index.rebuild()
 app = create_app()
@@ -0,0 +1,154 @@
+"""Versioned schema migrations.
+
+``Base.metadata.create_all`` creates missing tables (with their indexes) on a fresh
+database; migrations bring databases created by older code up to date. Each one
+runs once, in its own transaction, and is recorded in ``schema_version`` so a
+normal boot only reads the current version.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger("backend.migrations")
+
+
+def _add_legacy_columns(conn):
+    # columns added after the first release; create_all never alters existing tables
+    columns = {
+        "users": [("phone", "TEXT"), ("status", "TEXT")],
+        "doctor_profiles": [
+            ("consultation_fee", "FLOAT"),
+            ("is_clinic", "BOOLEAN"),
+            ("is_online", "BOOLEAN"),
+            ("status", "TEXT"),
+        ],
+        "appointments": [("slot_id", "TEXT"), ("reason", "TEXT")],
+        "notifications": [
+            ("type", "TEXT"),
+            ("payload", "TEXT"),
+            ("read_at", "TIMESTAMP"),
+            ("sent_at", "TIMESTAMP"),
+        ],
+    }
+    inspector = inspect(conn)
+    for table, cols in columns.items():
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        for col, col_type in cols:
+            if col not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}"))
+
+
+def _unique_active_slot(conn):
+    # refuse to guess which of two live bookings for one slot should win
+    duplicates = conn.execute(text(
+        "SELECT doctor_id, slot_id, COUNT(*) FROM appointments "
+        "WHERE slot_id IS NOT NULL AND status != 'cancelled' "
+        "GROUP BY doctor_id, slot_id HAVING COUNT(*) > 1"
+    )).all()
+    if duplicates:
+        raise RuntimeError(
+            f"Cannot add uq_appointments_active_slot: {len(duplicates)} doctor slots are double-booked "
+            f"(first: doctor_id={duplicates[0][0]}, slot_id={duplicates[0][1]}); cancel the extra appointments first"
+        )
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_appointments_active_slot ON appointments (doctor_id, slot_id) "
+        "WHERE slot_id IS NOT NULL AND status != 'cancelled'"
+    ))
+
+
+def _unique_slot_lock(conn):
+    # locks are short-lived, so dropping expired, doctorless and superseded rows loses nothing
+    conn.execute(text("DELETE FROM booking_locks WHERE expires_at <= :now OR doctor_id IS NULL"), {"now": datetime.utcnow()})
+    conn.execute(text(
+        "DELETE FROM booking_locks WHERE EXISTS (SELECT 1 FROM booking_locks b "
+        "WHERE b.doctor_id = booking_locks.doctor_id AND b.slot_id = booking_locks.slot_id "
+        "AND (b.expires_at > booking_locks.expires_at "
+        "OR (b.expires_at = booking_locks.expires_at AND b.id > booking_locks.id)))"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_booking_locks_doctor_slot ON booking_locks (doctor_id, slot_id)"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_booking_locks_expires ON booking_locks (expires_at)"))
+
+
+def _row_change_times(conn):
+    # analytics re-aggregates old buckets whose rows changed status; existing rows count as unchanged
+    inspector = inspect(conn)
+    for table in ("appointments", "doctor_schedules"):
+        if "updated_at" not in {c["name"] for c in inspector.get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP"))
+        conn.execute(text(f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated ON {table} (updated_at)"))
+
+
+def _create_indexes(*indexes: tuple[str, str, tuple[str, ...]]):
+    def migrate(conn):
+        for name, table, cols in indexes:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(cols)})"))
+    return migrate
+
+
+MIGRATIONS = [
+    (1, "legacy columns", _add_legacy_columns),
+    (2, "composite indexes for hot filters", _create_indexes(
+        ("ix_doctor_schedules_doctor_slot", "doctor_schedules", ("doctor_id", "slot_id")),
+        ("ix_booking_locks_slot_expires", "booking_locks", ("slot_id", "expires_at")),
+        ("ix_notifications_user_created", "notifications", ("user_id", "created_at")),
+        ("ix_activities_user_created", "activities", ("user_id", "created_at")),
+        ("ix_chat_messages_child_created", "chat_messages", ("child_id", "created_at")),
+        ("ix_appointments_status", "appointments", ("status",)),
+    )),
+    (3, "appointment keyset pagination", _create_indexes(
+        ("ix_appointments_patient_scheduled", "appointments", ("patient_id", "scheduled_at", "id")),
+        ("ix_appointments_doctor_scheduled", "appointments", ("doctor_id", "scheduled_at", "id")),
+    )),
+    (4, "admin list sort keys", _create_indexes(
+        ("ix_users_created", "users", ("created_at", "id")),
+        ("ix_doctor_profiles_created", "doctor_profiles", ("created_at", "id")),
+        ("ix_doctor_assignments_created", "doctor_assignments", ("created_at", "id")),
+        ("ix_doctor_schedules_created", "doctor_schedules", ("created_at", "id")),
+        ("ix_doctor_credentials_created", "doctor_credentials", ("created_at", "id")),
+        ("ix_doctor_ranks_updated", "doctor_ranks", ("updated_at", "id")),
+        ("ix_time_slots_active_start", "time_slots", ("is_active", "start_time", "id")),
+    )),
+    (5, "analytics rollup scans", _create_indexes(
+        ("ix_appointments_created", "appointments", ("created_at",)),
+        ("ix_chat_messages_created", "chat_messages", ("created_at",)),
+        ("ix_time_slots_start", "time_slots", ("start_time",)),
+    )),
+    (6, "one active appointment per doctor slot", _unique_active_slot),
+    (7, "one booking lock per doctor slot", _unique_slot_lock),
+    (8, "row change times for analytics", _row_change_times),
+]
+
+
+def current_version(engine) -> int:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+        return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def run_migrations(engine) -> list[int]:
+    version = current_version(engine)
+    applied = []
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        try:
+            with engine.begin() as conn:
+                migrate(conn)
+                conn.execute(
+                    text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+                    {"v": number, "d": description, "t": datetime.utcnow()},
+                )
+        except IntegrityError:
+            # another worker booting at the same time recorded it first
+            continue
+        logger.info("Applied migration %d: %s", number, description)
+        applied.append(number)
+    return applied
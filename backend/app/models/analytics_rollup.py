@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from app.db import Base
+
+
+class AnalyticsRollup(Base):
+    __tablename__ = "analytics_rollups"
+    metric = Column(String, primary_key=True)  # appointments|chat_messages|new_users|doctor_utilization
+    key = Column(String, primary_key=True, default="")  # status for appointments/utilization, "" otherwise
+    bucket_start = Column(DateTime, primary_key=True)  # hour, UTC
+    value = Column(Integer, nullable=False, default=0)
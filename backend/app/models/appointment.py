@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index, text
 from app.db import Base
 
 
@@ -10,13 +10,26 @@ def gen_uuid() -> str:
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        Index("ix_appointments_patient_scheduled", "patient_id", "scheduled_at", "id"),
+        Index("ix_appointments_doctor_scheduled", "doctor_id", "scheduled_at", "id"),
+        Index("ix_appointments_created", "created_at"),
+        Index("ix_appointments_updated", "updated_at"),
+        # one live booking per doctor slot; cancelled ones free it again
+        Index(
+            "uq_appointments_active_slot", "doctor_id", "slot_id", unique=True,
+            sqlite_where=text("slot_id IS NOT NULL AND status != 'cancelled'"),
+            postgresql_where=text("slot_id IS NOT NULL AND status != 'cancelled'"),
+        ),
+    )
     id = Column(String, primary_key=True, default=gen_uuid)
     patient_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     child_id = Column(String, ForeignKey("children.id", ondelete="CASCADE"), index=True, nullable=True)
     doctor_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     slot_id = Column(String, ForeignKey("time_slots.id", ondelete="SET NULL"), index=True, nullable=True)
     scheduled_at = Column(DateTime, nullable=False)
-    status = Column(String, default="pending")  # pending|confirmed|cancelled|completed|no-show
+    status = Column(String, default="pending", index=True)  # pending|confirmed|cancelled|completed|no-show
     reason = Column(Text, nullable=True)
     note = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from app.db import Base
 
 
@@ -10,6 +10,12 @@ def gen_uuid() -> str:
 
 class BookingLock(Base):
     __tablename__ = "booking_locks"
+    __table_args__ = (
+        Index("ix_booking_locks_slot_expires", "slot_id", "expires_at"),
+        # one row per doctor slot; an expired row is taken over by the next lock
+        Index("uq_booking_locks_doctor_slot", "doctor_id", "slot_id", unique=True),
+        Index("ix_booking_locks_expires", "expires_at"),
+    )
     id = Column(String, primary_key=True, default=gen_uuid)
     slot_id = Column(String, ForeignKey("time_slots.id", ondelete="CASCADE"), index=True, nullable=False)
     doctor_id = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from app.db import Base
 
 
@@ -10,6 +10,10 @@ def gen_uuid() -> str:
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_child_created", "child_id", "created_at"),
+        Index("ix_chat_messages_created", "created_at"),
+    )
     id = Column(String, primary_key=True, default=gen_uuid)
     child_id = Column(String, ForeignKey("children.id", ondelete="CASCADE"), index=True, nullable=False)
     role = Column(String, nullable=False)  # user|assistant
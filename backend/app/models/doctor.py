@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Float, Index
 from app.db import Base
 
 
@@ -10,6 +10,7 @@ def gen_uuid() -> str:
 
 class DoctorProfile(Base):
     __tablename__ = "doctor_profiles"
+    __table_args__ = (Index("ix_doctor_profiles_created", "created_at", "id"),)
     id = Column(String, primary_key=True, default=gen_uuid)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
     full_name = Column(String, nullable=False)
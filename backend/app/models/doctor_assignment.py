@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint, Index
 from app.db import Base
 
 
@@ -10,7 +10,10 @@ def gen_uuid() -> str:
 
 class DoctorAssignment(Base):
     __tablename__ = "doctor_assignments"
-    __table_args__ = (UniqueConstraint("doctor_id", "child_id", name="uq_doctor_child"),)
+    __table_args__ = (
+        UniqueConstraint("doctor_id", "child_id", name="uq_doctor_child"),
+        Index("ix_doctor_assignments_created", "created_at", "id"),
+    )
     id = Column(String, primary_key=True, default=gen_uuid)
     doctor_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     child_id = Column(String, ForeignKey("children.id", ondelete="CASCADE"), index=True, nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime, date
 import uuid
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Index
 from app.db import Base
 
 
@@ -10,6 +10,7 @@ def gen_uuid() -> str:
 
 class DoctorCredential(Base):
     __tablename__ = "doctor_credentials"
+    __table_args__ = (Index("ix_doctor_credentials_created", "created_at", "id"),)
     id = Column(String, primary_key=True, default=gen_uuid)
     doctor_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     type = Column(String, nullable=False)  # degree|license|cert
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Index
 from app.db import Base
 
 
@@ -10,6 +10,7 @@ def gen_uuid() -> str:
 
 class DoctorRank(Base):
     __tablename__ = "doctor_ranks"
+    __table_args__ = (Index("ix_doctor_ranks_updated", "updated_at", "id"),)
     id = Column(String, primary_key=True, default=gen_uuid)
     doctor_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
     level = Column(String, nullable=False)  # A/B/C or 1/2/3
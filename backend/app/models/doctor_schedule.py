@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from app.db import Base
 
 
@@ -10,8 +10,14 @@ def gen_uuid() -> str:
 
 class DoctorSchedule(Base):
     __tablename__ = "doctor_schedules"
+    __table_args__ = (
+        Index("ix_doctor_schedules_doctor_slot", "doctor_id", "slot_id"),
+        Index("ix_doctor_schedules_created", "created_at", "id"),
+        Index("ix_doctor_schedules_updated", "updated_at"),
+    )
     id = Column(String, primary_key=True, default=gen_uuid)
     doctor_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     slot_id = Column(String, ForeignKey("time_slots.id", ondelete="CASCADE"), index=True, nullable=False)
     status = Column(String, default="available")  # available|booked|blocked
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,23 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, DateTime, Integer, Text, Index
+from app.db import Base
+
+
+def gen_uuid() -> str:
+    return str(uuid.uuid4())
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+    __table_args__ = (Index("ix_ingest_jobs_claim", "status", "priority", "available_at"),)
+    id = Column(String, primary_key=True, default=gen_uuid)
+    kind = Column(String, nullable=False)  # insert|delete
+    payload = Column(Text, nullable=True)  # JSON, cleared once the job is done
+    priority = Column(Integer, nullable=False, default=0)  # lower runs first
+    status = Column(String, nullable=False, default="queued")  # queued|running|done|failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
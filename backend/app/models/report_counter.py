@@ -0,0 +1,11 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer
+from app.db import Base
+
+
+class ReportCounter(Base):
+    __tablename__ = "report_counters"
+    metric = Column(String, primary_key=True)  # users_by_role|doctor_status|appointments|slots_total|schedules_total
+    key = Column(String, primary_key=True, default="")  # grouped value, "" for plain totals
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
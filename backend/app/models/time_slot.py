@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey, Index
 from app.db import Base
 
 
@@ -10,6 +10,10 @@ def gen_uuid() -> str:
 
 class TimeSlot(Base):
     __tablename__ = "time_slots"
+    __table_args__ = (
+        Index("ix_time_slots_active_start", "is_active", "start_time", "id"),
+        Index("ix_time_slots_start", "start_time"),
+    )
     id = Column(String, primary_key=True, default=gen_uuid)
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, nullable=False)
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class AppointmentCreate(BaseModel):
@@ -10,15 +11,15 @@ class AppointmentCreate(BaseModel):
     note: str | None = None
 
 
-class AppointmentOut(BaseModel):
+class AppointmentOut(ORMModel):
     id: str
     patient_id: str
     doctor_id: str
     child_id: str | None = None
     slot_id: str | None = None
-    scheduled_at: str
+    scheduled_at: IsoStr
     status: str
     reason: str | None = None
     note: str | None = None
-    created_at: str | None = None
+    created_at: IsoStr | None = None
     doctor_phone: str | None = None
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class DoctorAssignmentCreate(BaseModel):
@@ -6,9 +7,9 @@ class DoctorAssignmentCreate(BaseModel):
     child_id: str
 
 
-class DoctorAssignmentOut(BaseModel):
+class DoctorAssignmentOut(ORMModel):
     id: str
     doctor_id: str
     child_id: str
     assigned_by: str | None = None
-    created_at: str | None = None
+    created_at: IsoStr | None = None
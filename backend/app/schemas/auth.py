@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
+from app.schemas.common import ORMModel
 
 
 class SignupRequest(BaseModel):
@@ -19,7 +20,7 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
 
 
-class UserOut(BaseModel):
+class UserOut(ORMModel):
     id: str
     email: EmailStr
     full_name: str
@@ -42,6 +43,10 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
+
+
 class OAuthLoginRequest(BaseModel):
     id_token: str | None = None  # Google
     access_token: str | None = None  # Facebook
@@ -1,16 +1,21 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.schemas.common import IsoStr, ORMModel
 
 
 class BookingLockCreate(BaseModel):
     slot_id: str
-    doctor_id: str | None = None
-    expires_in_minutes: int = 5
+    doctor_id: str
+    expires_in_minutes: int = Field(5, ge=1, le=60)
+
+
+class BookingLockRenew(BaseModel):
+    expires_in_minutes: int = Field(5, ge=1, le=60)
 
 
-class BookingLockOut(BaseModel):
+class BookingLockOut(ORMModel):
     id: str
     slot_id: str
     doctor_id: str | None = None
     locked_by_user: str
-    expires_at: str
-    created_at: str | None = None
+    expires_at: IsoStr
+    created_at: IsoStr | None = None
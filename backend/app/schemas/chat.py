@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class ChatRequest(BaseModel):
@@ -11,9 +12,9 @@ class ChatResponse(BaseModel):
     answer: str
 
 
-class ChatMessageOut(BaseModel):
+class ChatMessageOut(ORMModel):
     id: str
     child_id: str
     role: str
     content: str
-    created_at: str | None = None
+    created_at: IsoStr | None = None
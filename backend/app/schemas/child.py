@@ -1,5 +1,6 @@
 from datetime import date
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class ChildCreate(BaseModel):
@@ -16,12 +17,12 @@ class ChildUpdate(BaseModel):
     address: str | None = None
 
 
-class ChildOut(BaseModel):
+class ChildOut(ORMModel):
     id: str
     user_id: str
     full_name: str
     birth_date: date | None = None
     gender: str | None = None
     address: str | None = None
-    created_at: str | None = None
-    updated_at: str | None = None
+    created_at: IsoStr | None = None
+    updated_at: IsoStr | None = None
@@ -0,0 +1,18 @@
+from datetime import date, datetime
+from typing import Annotated
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+# DB datetimes/dates rendered as the ISO strings the API has always returned
+IsoStr = Annotated[str, BeforeValidator(_isoformat)]
+
+
+class ORMModel(BaseModel):
+    """Response schema that validates straight from ORM objects or projected rows."""
+
+    model_config = ConfigDict(from_attributes=True)
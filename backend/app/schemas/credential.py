@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class DoctorCredentialCreate(BaseModel):
@@ -10,17 +11,17 @@ class DoctorCredentialCreate(BaseModel):
     doc_url: str | None = None
 
 
-class DoctorCredentialOut(BaseModel):
+class DoctorCredentialOut(ORMModel):
     id: str
     doctor_id: str
     type: str
     title: str
     issuer: str | None = None
-    issue_date: str | None = None
-    expiry_date: str | None = None
+    issue_date: IsoStr | None = None
+    expiry_date: IsoStr | None = None
     doc_url: str | None = None
     verification_status: str
-    created_at: str | None = None
+    created_at: IsoStr | None = None
 
 
 class DoctorCredentialVerify(BaseModel):
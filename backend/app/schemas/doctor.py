@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class DoctorCreate(BaseModel):
@@ -13,7 +14,7 @@ class DoctorCreate(BaseModel):
     is_online: bool | None = None
 
 
-class DoctorOut(BaseModel):
+class DoctorOut(ORMModel):
     id: str
     user_id: str
     full_name: str
@@ -27,4 +28,4 @@ class DoctorOut(BaseModel):
     status: str | None = None
     verified: bool | None = None
     approved_by: str | None = None
-    approved_at: str | None = None
+    approved_at: IsoStr | None = None
@@ -7,3 +7,20 @@ class IngestRequest(BaseModel):
 
 class IngestResponse(BaseModel):
     status: str
+    job_id: str | None = None
+
+
+class IngestDocument(BaseModel):
+    text: str
+    id: str | None = None
+    file_path: str | None = None
+
+
+class IngestBatchRequest(BaseModel):
+    documents: list[IngestDocument]
+
+
+class IngestBatchResponse(BaseModel):
+    status: str
+    job_id: str
+    documents: int
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class IntakeUpsert(BaseModel):
@@ -16,8 +17,8 @@ class IntakeUpsert(BaseModel):
     general_exam: str | None = None
 
 
-class IntakeOut(IntakeUpsert):
+class IntakeOut(IntakeUpsert, ORMModel):
     id: str
     child_id: str
-    created_at: str | None = None
-    updated_at: str | None = None
+    created_at: IsoStr | None = None
+    updated_at: IsoStr | None = None
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class CancellationPolicyCreate(BaseModel):
@@ -7,9 +8,9 @@ class CancellationPolicyCreate(BaseModel):
     applies_to: str
 
 
-class CancellationPolicyOut(BaseModel):
+class CancellationPolicyOut(ORMModel):
     id: str
     min_hours_before: int
     fee_percent: float
     applies_to: str
-    created_at: str | None = None
+    created_at: IsoStr | None = None
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class DoctorRankUpsert(BaseModel):
@@ -8,13 +9,13 @@ class DoctorRankUpsert(BaseModel):
     computed_from: str | None = None
 
 
-class DoctorRankOut(BaseModel):
+class DoctorRankOut(ORMModel):
     id: str
     doctor_id: str
     level: str
     score: float | None = None
     computed_from: str | None = None
-    updated_at: str | None = None
+    updated_at: IsoStr | None = None
 
 
 class RankRuleCreate(BaseModel):
@@ -24,10 +25,10 @@ class RankRuleCreate(BaseModel):
     is_active: bool = True
 
 
-class RankRuleOut(BaseModel):
+class RankRuleOut(ORMModel):
     id: str
     name: str
     weight: float
     condition_json: str | None = None
     is_active: bool
-    created_at: str | None = None
+    created_at: IsoStr | None = None
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class AdminReviewCreate(BaseModel):
@@ -7,10 +8,10 @@ class AdminReviewCreate(BaseModel):
     note: str | None = None
 
 
-class AdminReviewOut(BaseModel):
+class AdminReviewOut(ORMModel):
     id: str
     doctor_id: str
     admin_id: str | None = None
     decision: str
     note: str | None = None
-    created_at: str | None = None
+    created_at: IsoStr | None = None
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from app.schemas.slot import TimeSlotOut
+from app.schemas.common import IsoStr, ORMModel
 
 
 class DoctorScheduleCreate(BaseModel):
@@ -12,10 +13,20 @@ class DoctorScheduleUpdate(BaseModel):
     status: str
 
 
-class DoctorScheduleOut(BaseModel):
+class DoctorScheduleBulkCreate(BaseModel):
+    doctor_ids: list[str] = []
+    slot_ids: list[str] = []
+    date_from: str | None = None
+    date_to: str | None = None
+    slot_type: str | None = "working"
+    status: str = "available"
+    skip_conflicts: bool = False
+
+
+class DoctorScheduleOut(ORMModel):
     id: str
     doctor_id: str
     slot_id: str
     status: str
-    created_at: str | None = None
+    created_at: IsoStr | None = None
     slot: TimeSlotOut | None = None
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import date, time
+from pydantic import BaseModel, Field
+from app.schemas.common import IsoStr, ORMModel
 
 
 class TimeSlotCreate(BaseModel):
@@ -17,12 +19,29 @@ class TimeSlotUpdate(BaseModel):
     is_active: bool | None = None
 
 
-class TimeSlotOut(BaseModel):
+class SlotRecurrence(BaseModel):
+    start_date: date
+    end_date: date
+    weekdays: list[int] = Field(default_factory=lambda: [0, 1, 2, 3, 4])  # Monday=0
+    day_start: time
+    day_end: time
+    every_minutes: int = Field(ge=5, le=1440)
+    duration: int | None = Field(default=None, ge=1, le=1440)  # defaults to every_minutes
+
+
+class TimeSlotBulkCreate(BaseModel):
+    recurrence: SlotRecurrence
+    slot_type: str = "working"
+    skip_conflicts: bool = False
+    doctor_ids: list[str] = []
+
+
+class TimeSlotOut(ORMModel):
     id: str
-    start_time: str
-    end_time: str
+    start_time: IsoStr
+    end_time: IsoStr
     duration: int | None = None
     slot_type: str
     created_by: str | None = None
     is_active: bool
-    created_at: str | None = None
+    created_at: IsoStr | None = None
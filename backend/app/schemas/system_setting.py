@@ -1,12 +1,13 @@
 from pydantic import BaseModel
+from app.schemas.common import IsoStr, ORMModel
 
 
 class SystemSettingUpdate(BaseModel):
     value: str | None = None
 
 
-class SystemSettingOut(BaseModel):
+class SystemSettingOut(ORMModel):
     id: str
     key: str
     value: str | None = None
-    updated_at: str | None = None
+    updated_at: IsoStr | None = None
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, EmailStr, Field
+from app.schemas.common import IsoStr, ORMModel
 
 
-class ProfileOut(BaseModel):
+class ProfileOut(ORMModel):
     id: str
     email: EmailStr
     full_name: str
@@ -21,7 +22,7 @@ class PasswordChange(BaseModel):
     new_password: str = Field(min_length=6)
 
 
-class SettingsOut(BaseModel):
+class SettingsOut(ORMModel):
     notify_email: bool
     notify_push: bool
     language: str
@@ -35,20 +36,20 @@ class SettingsUpdate(BaseModel):
     privacy_level: str | None = None
 
 
-class NotificationOut(BaseModel):
+class NotificationOut(ORMModel):
     id: str
     type: str | None = None
     title: str
     body: str | None = None
     payload: str | None = None
     read: bool
-    read_at: str | None = None
-    sent_at: str | None = None
-    created_at: str
+    read_at: IsoStr | None = None
+    sent_at: IsoStr | None = None
+    created_at: IsoStr
 
 
-class ActivityOut(BaseModel):
+class ActivityOut(ORMModel):
     id: str
     action: str
     meta: str | None = None
-    created_at: str
+    created_at: IsoStr
@@ -0,0 +1,188 @@
+"""Hourly rollups behind the admin analytics API.
+
+A background refresher re-aggregates the recent part of each metric (from its
+newest bucket minus ``ANALYTICS_LOOKBACK_HOURS``) into ``analytics_rollups``,
+plus any older hour holding a row whose status changed within the lookback;
+requests only ever read the rollups and fold hours into days or weeks.
+"""
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, literal, select
+
+from app.db import db_session
+from app.models.analytics_rollup import AnalyticsRollup
+from app.models.appointment import Appointment
+from app.models.chat_message import ChatMessage
+from app.models.doctor_schedule import DoctorSchedule
+from app.models.time_slot import TimeSlot
+from app.models.user import User
+
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "300"))
+ANALYTICS_LOOKBACK_HOURS = int(os.getenv("ANALYTICS_LOOKBACK_HOURS", "48"))
+ANALYTICS_MAX_POINTS = int(os.getenv("ANALYTICS_MAX_POINTS", "2000"))
+
+BUCKETS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+logger = logging.getLogger("backend.analytics")
+
+
+def _hour(column, dialect: str):
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+    return func.date_trunc("hour", column)
+
+
+# metric -> (model, time column, key column or None, optional (join target, onclause),
+#            change time column or None when the key never changes after insert)
+METRICS = {
+    "appointments": (Appointment, Appointment.created_at, Appointment.status, None, Appointment.updated_at),
+    "chat_messages": (ChatMessage, ChatMessage.created_at, None, None, None),
+    "new_users": (User, User.created_at, None, None, None),
+    # bucketed by when the slot happens, so future capacity is visible too
+    "doctor_utilization": (
+        DoctorSchedule, TimeSlot.start_time, DoctorSchedule.status, (TimeSlot, DoctorSchedule.slot_id == TimeSlot.id),
+        DoctorSchedule.updated_at,
+    ),
+}
+
+
+def _bucket(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _scope(db, metric: str, *columns):
+    model, time_col, _, join, _ = METRICS[metric]
+    q = select(*columns).select_from(model)
+    if join is not None:
+        q = q.join(*join)
+    return q.where(time_col.isnot(None))
+
+
+def _changed_hours(db, metric: str, before: datetime, changed_since: datetime) -> list:
+    """Hours before ``before`` holding a row changed since ``changed_since``, as ``_hour`` returns them."""
+    _, time_col, _, _, changed_col = METRICS[metric]
+    if changed_col is None:
+        return []
+    hour = _hour(time_col, db.bind.dialect.name)
+    q = _scope(db, metric, hour).where(time_col < before, changed_col >= changed_since).distinct()
+    return list(db.scalars(q))
+
+
+def _aggregate(db, metric: str, since: datetime | None, hours: list | None = None) -> list[dict]:
+    _, time_col, key_col, _, _ = METRICS[metric]
+    hour_expr = _hour(time_col, db.bind.dialect.name)
+    hour = hour_expr.label("hour")
+    key = (func.coalesce(key_col, "") if key_col is not None else literal("")).label("key")
+    q = _scope(db, metric, hour, key, func.count().label("value"))
+    if since is not None:
+        q = q.where(time_col >= since)
+    if hours is not None:
+        q = q.where(hour_expr.in_(hours))
+    rows = db.execute(q.group_by(hour, key)).all()
+    return [{"metric": metric, "key": r.key, "bucket_start": _bucket(r.hour), "value": r.value} for r in rows]
+
+
+def refresh(db, now: datetime | None = None, full: bool = False) -> dict[str, int]:
+    """Recompute the trailing window of every metric; ``full`` rebuilds all history."""
+    now = now or datetime.utcnow()
+    written = {}
+    for metric in METRICS:
+        since = None
+        if not full:
+            newest = db.scalar(select(func.max(AnalyticsRollup.bucket_start)).where(AnalyticsRollup.metric == metric))
+            if newest is not None:
+                since = min(newest, now).replace(minute=0, second=0, microsecond=0) - timedelta(hours=ANALYTICS_LOOKBACK_HOURS)
+        rows = _aggregate(db, metric, since)
+        stale = delete(AnalyticsRollup).where(AnalyticsRollup.metric == metric)
+        if since is not None:
+            stale = stale.where(AnalyticsRollup.bucket_start >= since)
+        db.execute(stale)
+        if since is not None:
+            # rows are keyed by status, so a status change in an hour before the window moves counts there too
+            changed_since = now - timedelta(hours=ANALYTICS_LOOKBACK_HOURS)
+            hours = _changed_hours(db, metric, since, changed_since)
+            if hours:
+                rows += _aggregate(db, metric, None, hours)
+                db.execute(delete(AnalyticsRollup).where(
+                    AnalyticsRollup.metric == metric,
+                    AnalyticsRollup.bucket_start.in_([_bucket(h) for h in hours]),
+                ))
+        if rows:
+            db.execute(insert(AnalyticsRollup), rows)
+        written[metric] = len(rows)
+    db.commit()
+    return written
+
+
+def _floor(ts: datetime, bucket: str) -> datetime:
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    if bucket == "hour":
+        return ts
+    ts = ts.replace(hour=0)
+    if bucket == "week":
+        ts -= timedelta(days=ts.weekday())  # weeks start on Monday
+    return ts
+
+
+def series(db, metric: str, bucket: str, start: datetime, end: datetime) -> list[dict]:
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {sorted(METRICS)}")
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket {bucket!r}, expected one of {sorted(BUCKETS)}")
+    if end <= start:
+        raise ValueError("date_to must be after date_from")
+    if (end - start) / BUCKETS[bucket] > ANALYTICS_MAX_POINTS:
+        raise ValueError(f"Range too large for {bucket} buckets (max {ANALYTICS_MAX_POINTS} points)")
+
+    rows = db.execute(
+        select(AnalyticsRollup.bucket_start, AnalyticsRollup.key, AnalyticsRollup.value).where(
+            AnalyticsRollup.metric == metric,
+            AnalyticsRollup.bucket_start >= _floor(start, "hour"),
+            AnalyticsRollup.bucket_start < end,
+        )
+    ).all()
+    folded: dict[datetime, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for bucket_start, key, value in rows:
+        folded[_floor(bucket_start, bucket)][key or "count"] += value
+
+    points = []
+    for bucket_start in sorted(folded):
+        values = dict(folded[bucket_start])
+        point = {"bucket_start": bucket_start.isoformat(), "values": values}
+        if metric == "doctor_utilization":
+            offered = values.get("booked", 0) + values.get("available", 0)
+            point["utilization"] = round(values.get("booked", 0) / offered, 4) if offered else None
+        points.append(point)
+    return points
+
+
+class AnalyticsRefresher:
+    def __init__(self, interval: float = ANALYTICS_REFRESH_SECONDS):
+        self.interval = interval
+        self.last_run: datetime | None = None
+        self.last_error: str | None = None
+
+    def run_once(self, full: bool = False) -> dict[str, int]:
+        with db_session() as db:
+            written = refresh(db, full=full)
+        self.last_run = datetime.utcnow()
+        return written
+
+    async def run(self):
+        while True:
+            try:
+                # off the event loop: the aggregation scans the trailing window
+                written = await asyncio.to_thread(self.run_once)
+                self.last_error = None
+                logger.debug("Analytics rollups refreshed: %s", written)
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.error("Analytics refresh failed: %s", exc)
+            await asyncio.sleep(self.interval)
+
+
+refresher = AnalyticsRefresher()
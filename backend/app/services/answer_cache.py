@@ -0,0 +1,130 @@
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    text = unicodedata.normalize("NFC", prompt).lower()
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+@dataclass
+class _Entry:
+    answer: str
+    vector: np.ndarray | None
+    created_at: float
+    cost_seconds: float
+
+
+class AnswerCache:
+    """LRU + TTL cache of RAG answers, matched by normalized prompt or embedding similarity."""
+
+    def __init__(
+        self,
+        ttl: float = ANSWER_CACHE_TTL,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.seconds_saved = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self.ttl > 0 and now - entry.created_at > self.ttl
+
+    def _purge_expired(self, now: float):
+        for key in [k for k, e in self._entries.items() if self._expired(e, now)]:
+            del self._entries[key]
+            self.expirations += 1
+
+    def _hit(self, key: str, entry: _Entry) -> str:
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.seconds_saved += entry.cost_seconds
+        return entry.answer
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry, time.monotonic()):
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        return self._hit(key, entry)
+
+    def get_similar(self, vector: np.ndarray) -> str | None:
+        self._purge_expired(time.monotonic())
+        keys = [k for k, e in self._entries.items() if e.vector is not None]
+        if not keys:
+            return None
+        matrix = np.stack([self._entries[k].vector for k in keys])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        self.semantic_hits += 1
+        return self._hit(keys[best], self._entries[keys[best]])
+
+    def miss(self):
+        self.misses += 1
+
+    def put(self, key: str, answer: str, vector: np.ndarray | None, cost_seconds: float):
+        if key in self._entries:
+            del self._entries[key]
+        self._entries[key] = _Entry(answer, vector, time.monotonic(), cost_seconds)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "seconds_saved": round(self.seconds_saved, 3),
+        }
+
+
+def unit_vector(vector) -> np.ndarray | None:
+    arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(arr))
+    if not norm:
+        return None
+    return arr / norm
@@ -0,0 +1,140 @@
+"""Per-doctor cache of bookable schedules, sorted by slot start time.
+
+Entries load lazily from the DB and are patched by the write paths
+(booking, cancelling, schedule create/status, slot edits) after they commit.
+Each process keeps its own cache, so writes made by other workers show up once
+an entry is older than ``AVAILABILITY_CACHE_TTL`` and gets reloaded. The ETag
+only changes when a doctor's availability actually does.
+"""
+import bisect
+import hashlib
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from app.models.doctor_schedule import DoctorSchedule
+from app.models.time_slot import TimeSlot
+from app.utils.serialization import row_dict
+
+AVAILABILITY_CACHE_TTL = float(os.getenv("AVAILABILITY_CACHE_TTL", "30"))
+AVAILABILITY_CACHE_MAX_DOCTORS = int(os.getenv("AVAILABILITY_CACHE_MAX_DOCTORS", "10000"))
+
+
+class _Entry:
+    def __init__(self, items: list[dict], loaded_at: float):
+        self.items = items  # DoctorScheduleOut-shaped dicts, sorted by slot start_time
+        self.starts = [item["slot"]["start_time"] for item in items]
+        self.loaded_at = loaded_at
+        self.version = -1
+
+    def same_as(self, items: list[dict]) -> bool:
+        return [(i["id"], i["slot"]) for i in items] == [(i["id"], i["slot"]) for i in self.items]
+
+
+def _item(schedule, slot) -> dict:
+    return {**row_dict(schedule), "slot": row_dict(slot)}
+
+
+class AvailabilityIndex:
+    def __init__(self, ttl: float = AVAILABILITY_CACHE_TTL, max_doctors: int = AVAILABILITY_CACHE_MAX_DOCTORS):
+        self.ttl = ttl
+        self.max_doctors = max_doctors
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        # keeps ETags from different processes or restarts from ever matching
+        self._token = uuid.uuid4().hex[:8]
+        # global, so an evicted and reloaded doctor never reuses an old version
+        self._versions = itertools.count()
+        self.hits = 0
+        self.loads = 0
+
+    def _load(self, db, doctor_id: str) -> list[dict]:
+        rows = (
+            db.query(DoctorSchedule, TimeSlot)
+            .join(TimeSlot, DoctorSchedule.slot_id == TimeSlot.id)
+            .filter(
+                DoctorSchedule.doctor_id == doctor_id,
+                DoctorSchedule.status == "available",
+                TimeSlot.is_active == True,
+            )
+            .order_by(TimeSlot.start_time, DoctorSchedule.id)
+            .all()
+        )
+        return [_item(schedule, slot) for schedule, slot in rows]
+
+    def _entry(self, db, doctor_id: str) -> _Entry:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(doctor_id)
+            if entry is not None and now - entry.loaded_at < self.ttl:
+                self._entries.move_to_end(doctor_id)
+                self.hits += 1
+                return entry
+        items = self._load(db, doctor_id)
+        with self._lock:
+            self.loads += 1
+            current = self._entries.get(doctor_id)
+            if current is not None and current.same_as(items):
+                current.loaded_at = now
+                return current
+            entry = _Entry(items, now)
+            entry.version = next(self._versions)
+            self._entries[doctor_id] = entry
+            self._entries.move_to_end(doctor_id)
+            while len(self._entries) > self.max_doctors:
+                self._entries.popitem(last=False)
+            return entry
+
+    def query(self, db, doctor_id: str, start: datetime | None = None, end: datetime | None = None) -> tuple[list[dict], str]:
+        """Available schedules with ``start <= slot.start_time < end``, and their ETag."""
+        entry = self._entry(db, doctor_id)
+        lo = bisect.bisect_left(entry.starts, start) if start else 0
+        hi = bisect.bisect_left(entry.starts, end) if end else len(entry.starts)
+        raw = f"{self._token}:{doctor_id}:{entry.version}:{start}:{end}"
+        return entry.items[lo:hi], f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+    def _replace(self, doctor_id: str, items: list[dict]):
+        entry = self._entries[doctor_id]
+        fresh = _Entry(items, entry.loaded_at)
+        fresh.version = next(self._versions)
+        self._entries[doctor_id] = fresh
+
+    def put(self, schedule, slot):
+        """A schedule became (or stays) bookable."""
+        with self._lock:
+            entry = self._entries.get(schedule.doctor_id)
+            if entry is None:
+                return  # loads fresh on the next read
+            items = [i for i in entry.items if i["id"] != schedule.id]
+            if schedule.status == "available" and slot.is_active:
+                item = _item(schedule, slot)
+                keys = [(i["slot"]["start_time"], i["id"]) for i in items]
+                items.insert(bisect.bisect_left(keys, (item["slot"]["start_time"], item["id"])), item)
+            self._replace(schedule.doctor_id, items)
+
+    def discard(self, doctor_id: str, slot_id: str):
+        """The doctor's schedule for ``slot_id`` is no longer bookable."""
+        with self._lock:
+            entry = self._entries.get(doctor_id)
+            if entry is not None:
+                self._replace(doctor_id, [i for i in entry.items if i["slot_id"] != slot_id])
+
+    def invalidate(self, doctor_id: str | None = None):
+        """Drop one doctor (or everyone, e.g. after a slot edit); reloaded on the next read."""
+        with self._lock:
+            targets = [doctor_id] if doctor_id else list(self._entries)
+            for key in targets:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.loaded_at = float("-inf")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"doctors": len(self._entries), "hits": self.hits, "loads": self.loads}
+
+
+availability = AvailabilityIndex()
@@ -0,0 +1,68 @@
+"""Race-free slot booking.
+
+Two guards, so concurrent requests for the same doctor slot cannot both win:
+
+* a compare-and-swap ``UPDATE doctor_schedules SET status='booked' WHERE
+  status='available'``, which the database serializes with a row lock
+  (Postgres) or the write lock (SQLite); the loser sees 0 rows updated;
+* the ``uq_appointments_active_slot`` partial unique index, one non-cancelled
+  appointment per (doctor, slot), which also covers writers that bypass the CAS.
+
+Booking locks held by other users are checked through ``services.booking_locks``.
+
+Both run in the caller's transaction, so a conflict rolls everything back.
+"""
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.appointment import Appointment
+from app.models.doctor_schedule import DoctorSchedule
+from app.services.booking_locks import locks
+
+
+class BookingConflict(RuntimeError):
+    pass
+
+
+async def claim_schedule(db: AsyncSession, doctor_id: str, slot_id: str) -> bool:
+    """Flip the doctor's schedule for ``slot_id`` from available to booked; False if someone else has it."""
+    result = await db.execute(
+        update(DoctorSchedule)
+        .where(
+            DoctorSchedule.doctor_id == doctor_id,
+            DoctorSchedule.slot_id == slot_id,
+            DoctorSchedule.status == "available",
+        )
+        .values(status="booked")
+    )
+    return result.rowcount == 1
+
+
+async def release_schedule(db: AsyncSession, doctor_id: str, slot_id: str):
+    await db.execute(
+        update(DoctorSchedule)
+        .where(DoctorSchedule.doctor_id == doctor_id, DoctorSchedule.slot_id == slot_id)
+        .values(status="available")
+    )
+
+
+async def book_slot(db: AsyncSession, appt: Appointment, user_id: str) -> Appointment:
+    """Claim ``appt.slot_id`` for ``appt`` and flush it; raises BookingConflict and
+    rolls back when the slot is taken or held by another user's booking lock."""
+    # the write comes first: on SQLite it opens the write transaction before any read
+    if not await claim_schedule(db, appt.doctor_id, appt.slot_id):
+        await db.rollback()
+        raise BookingConflict("Slot not available")
+    lock_holder = await locks.holder(db, appt.doctor_id, appt.slot_id)
+    if lock_holder and lock_holder != user_id:
+        await db.rollback()
+        raise BookingConflict("Slot locked by another user")
+    db.add(appt)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise BookingConflict("Slot already booked")
+    await locks.release_slot(db, appt.doctor_id, appt.slot_id, user_id)
+    return appt
@@ -0,0 +1,233 @@
+"""Short-lived slot holds taken while a user fills in the booking form.
+
+At most one live lock per (doctor, slot): slots are shared across doctors, so
+holding one doctor's slot leaves the others bookable. Two backends behind the same interface:
+
+* ``db`` (default): rows in ``booking_locks``, one per (doctor, slot) thanks to
+  the ``uq_booking_locks_doctor_slot`` unique index, so every uvicorn worker sees the same
+  state. An expired row is taken over in place by the next acquirer; nothing is
+  swept on the request path.
+* ``memory``: dicts keyed by (doctor, slot) and lock id plus an expiry heap, no database
+  writes at all. Only correct with a single worker process.
+
+Expired rows or entries are removed by ``LockSweeper`` every
+``BOOKING_LOCK_SWEEP_SECONDS``; until then they are simply ignored.
+"""
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import AsyncSessionLocal
+from app.models.booking_lock import BookingLock
+
+BOOKING_LOCK_BACKEND = os.getenv("BOOKING_LOCK_BACKEND", "db")
+BOOKING_LOCK_SWEEP_SECONDS = float(os.getenv("BOOKING_LOCK_SWEEP_SECONDS", "60"))
+
+logger = logging.getLogger("backend.booking_locks")
+
+
+class LockHeld(RuntimeError):
+    pass
+
+
+@dataclass
+class LockRecord:
+    doctor_id: str
+    slot_id: str
+    locked_by_user: str
+    expires_at: datetime
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class DbLockBackend:
+    async def acquire(self, db: AsyncSession, doctor_id: str, slot_id: str, user_id: str, ttl: timedelta):
+        now = datetime.utcnow()
+        current = await db.scalar(
+            select(BookingLock).where(BookingLock.doctor_id == doctor_id, BookingLock.slot_id == slot_id).limit(1)
+        )
+        if current is not None and current.expires_at > now:
+            if current.locked_by_user != user_id:
+                raise LockHeld("Slot already locked")
+            return current
+        if current is not None:
+            # take over the expired row; the CAS loses if another worker got there first
+            new_id = str(uuid.uuid4())
+            result = await db.execute(
+                update(BookingLock)
+                .where(BookingLock.id == current.id, BookingLock.expires_at <= now)
+                .values(id=new_id, locked_by_user=user_id, expires_at=now + ttl, created_at=now)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                raise LockHeld("Slot already locked")
+            await db.commit()
+            return await db.get(BookingLock, new_id, populate_existing=True)
+        lock = BookingLock(slot_id=slot_id, doctor_id=doctor_id, locked_by_user=user_id, expires_at=now + ttl)
+        db.add(lock)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise LockHeld("Slot already locked")
+        return lock
+
+    async def get(self, db: AsyncSession, lock_id: str):
+        return await db.get(BookingLock, lock_id)
+
+    async def renew(self, db: AsyncSession, lock_id: str, ttl: timedelta):
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(BookingLock)
+            .where(BookingLock.id == lock_id, BookingLock.expires_at > now)
+            .values(expires_at=now + ttl)
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            return None
+        return await db.get(BookingLock, lock_id, populate_existing=True)
+
+    async def release(self, db: AsyncSession, lock_id: str):
+        await db.execute(delete(BookingLock).where(BookingLock.id == lock_id))
+        await db.commit()
+
+    async def holder(self, db: AsyncSession, doctor_id: str, slot_id: str) -> str | None:
+        return await db.scalar(
+            select(BookingLock.locked_by_user).where(
+                BookingLock.doctor_id == doctor_id,
+                BookingLock.slot_id == slot_id,
+                BookingLock.expires_at > datetime.utcnow(),
+            ).limit(1)
+        )
+
+    async def release_slot(self, db: AsyncSession, doctor_id: str, slot_id: str, user_id: str):
+        # no commit: runs inside the caller's booking transaction
+        await db.execute(delete(BookingLock).where(
+            BookingLock.doctor_id == doctor_id, BookingLock.slot_id == slot_id, BookingLock.locked_by_user == user_id
+        ))
+
+    async def sweep(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(BookingLock).where(BookingLock.expires_at <= datetime.utcnow()))
+            await db.commit()
+            return result.rowcount
+
+
+class MemoryLockBackend:
+    def __init__(self):
+        self._by_slot: dict[tuple[str, str], LockRecord] = {}  # (doctor_id, slot_id)
+        self._by_id: dict[str, LockRecord] = {}
+        # (expires_at, lock_id); renewals push a new entry and the stale one is skipped
+        self._expiry: list[tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+
+    def _live(self, lock: LockRecord | None, now: datetime) -> LockRecord | None:
+        return lock if lock is not None and lock.expires_at > now else None
+
+    def _drop(self, lock: LockRecord):
+        self._by_id.pop(lock.id, None)
+        key = (lock.doctor_id, lock.slot_id)
+        if self._by_slot.get(key) is lock:
+            del self._by_slot[key]
+
+    async def acquire(self, db, doctor_id: str, slot_id: str, user_id: str, ttl: timedelta):
+        now = datetime.utcnow()
+        key = (doctor_id, slot_id)
+        with self._lock:
+            current = self._live(self._by_slot.get(key), now)
+            if current is not None:
+                if current.locked_by_user != user_id:
+                    raise LockHeld("Slot already locked")
+                return current
+            stale = self._by_slot.get(key)
+            if stale is not None:
+                self._drop(stale)
+            lock = LockRecord(doctor_id=doctor_id, slot_id=slot_id, locked_by_user=user_id, expires_at=now + ttl)
+            self._by_slot[key] = self._by_id[lock.id] = lock
+            heapq.heappush(self._expiry, (lock.expires_at, lock.id))
+            return lock
+
+    async def get(self, db, lock_id: str):
+        with self._lock:
+            return self._live(self._by_id.get(lock_id), datetime.utcnow())
+
+    async def renew(self, db, lock_id: str, ttl: timedelta):
+        now = datetime.utcnow()
+        with self._lock:
+            lock = self._live(self._by_id.get(lock_id), now)
+            if lock is None:
+                return None
+            lock.expires_at = now + ttl
+            heapq.heappush(self._expiry, (lock.expires_at, lock.id))
+            return lock
+
+    async def release(self, db, lock_id: str):
+        with self._lock:
+            lock = self._by_id.get(lock_id)
+            if lock is not None:
+                self._drop(lock)
+
+    async def holder(self, db, doctor_id: str, slot_id: str) -> str | None:
+        with self._lock:
+            lock = self._live(self._by_slot.get((doctor_id, slot_id)), datetime.utcnow())
+            return lock.locked_by_user if lock else None
+
+    async def release_slot(self, db, doctor_id: str, slot_id: str, user_id: str):
+        with self._lock:
+            lock = self._by_slot.get((doctor_id, slot_id))
+            if lock is not None and lock.locked_by_user == user_id:
+                self._drop(lock)
+
+    async def sweep(self) -> int:
+        now = datetime.utcnow()
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, lock_id = heapq.heappop(self._expiry)
+                lock = self._by_id.get(lock_id)
+                if lock is not None and lock.expires_at == expires_at:
+                    self._drop(lock)
+                    removed += 1
+        return removed
+
+
+BACKENDS = {"db": DbLockBackend, "memory": MemoryLockBackend}
+
+
+def _backend(name: str):
+    if name not in BACKENDS:
+        raise RuntimeError(f"Unknown BOOKING_LOCK_BACKEND {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+locks = _backend(BOOKING_LOCK_BACKEND)
+
+
+class LockSweeper:
+    def __init__(self, interval: float = BOOKING_LOCK_SWEEP_SECONDS):
+        self.interval = interval
+        self.last_removed = 0
+        self.last_error: str | None = None
+
+    async def run(self):
+        while True:
+            try:
+                self.last_removed = await locks.sweep()
+                self.last_error = None
+                logger.debug("Swept %d expired booking locks", self.last_removed)
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.error("Booking lock sweep failed: %s", exc)
+            await asyncio.sleep(self.interval)
+
+
+sweeper = LockSweeper()
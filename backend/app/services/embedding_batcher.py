@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "20000"))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _to_array(result) -> np.ndarray:
+    if isinstance(result, dict) and "embedding" in result:
+        result = result["embedding"]
+    elif hasattr(result, "embedding"):
+        result = result.embedding
+    return np.asarray(result, dtype=np.float32)
+
+
+class EmbeddingBatcher:
+    """Splits embedding requests into fixed-size batches, runs them with bounded
+    concurrency and never sends the same text to the provider twice."""
+
+    def __init__(
+        self,
+        embed_fn,
+        embedding_dim: int,
+        max_batch_size: int = EMBED_BATCH_SIZE,
+        max_concurrency: int = EMBED_CONCURRENCY,
+        cache_size: int = EMBED_CACHE_SIZE,
+        store=None,
+    ):
+        self.embed_fn = embed_fn
+        self.embedding_dim = embedding_dim
+        self.max_batch_size = max(1, max_batch_size)
+        self.cache_size = cache_size
+        self.store = store
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.requested = 0
+        self.cache_hits = 0
+        self.provider_calls = 0
+        self.provider_texts = 0
+
+    def _cache_get(self, key: str) -> np.ndarray | None:
+        vector = self._cache.get(key)
+        if vector is not None:
+            self._cache.move_to_end(key)
+        return vector
+
+    def _cache_put(self, key: str, vector: np.ndarray):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _embed_batch(self, texts: list[str], **kwargs) -> np.ndarray:
+        async with self._semaphore:
+            result = await self.embed_fn(texts, **kwargs)
+        self.provider_calls += 1
+        self.provider_texts += len(texts)
+        vectors = _to_array(result)
+        if vectors.ndim == 1 and len(texts) == 1:
+            vectors = vectors.reshape(1, -1)
+        expected = (len(texts), self.embedding_dim)
+        if vectors.shape != expected:
+            raise ValueError(f"Embedding provider returned shape {vectors.shape}, expected {expected}")
+        return vectors
+
+    async def embed(self, texts: list[str], persist: bool = True, **kwargs) -> np.ndarray:
+        """``persist=False`` still reads the store but never writes to it, for one-off texts like prompts."""
+        self.requested += len(texts)
+        keys = [content_hash(t) for t in texts]
+        found: dict[str, np.ndarray] = {}
+        pending: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in pending:
+                continue
+            vector = self._cache_get(key)
+            if vector is not None:
+                found[key] = vector
+                self.cache_hits += 1
+            else:
+                pending[key] = text
+
+        if pending and self.store is not None:
+            for key, vector in self.store.get_many(list(pending)).items():
+                found[key] = vector
+                self._cache_put(key, vector)
+                del pending[key]
+
+        if pending:
+            pending_keys = list(pending)
+            batches = [
+                pending_keys[i:i + self.max_batch_size]
+                for i in range(0, len(pending_keys), self.max_batch_size)
+            ]
+            results = await asyncio.gather(
+                *(self._embed_batch([pending[k] for k in batch], **kwargs) for batch in batches)
+            )
+            for batch, vectors in zip(batches, results):
+                for key, vector in zip(batch, vectors):
+                    found[key] = vector
+                    self._cache_put(key, vector)
+            if persist and self.store is not None:
+                self.store.put_many({k: found[k] for k in pending_keys})
+
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        return np.stack([found[k] for k in keys])
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "cache_hits": self.cache_hits,
+            "cached": len(self._cache),
+            "provider_calls": self.provider_calls,
+            "provider_texts": self.provider_texts,
+            "store": self.store.stats() if self.store is not None else None,
+        }
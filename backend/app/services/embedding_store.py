@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # no advisory locks (Windows): only one process may open a store
+    fcntl = None
+
+EMBED_STORE_ENABLED = os.getenv("EMBED_STORE_ENABLED", "1") == "1"
+EMBED_STORE_MAX_MB = float(os.getenv("EMBED_STORE_MAX_MB", "512"))
+
+logger = logging.getLogger("backend.embedding_store")
+
+_DATA_FILE = "vectors.bin"
+_META_FILE = "meta.json"
+_LOCK_FILE = "store.lock"
+_FORMAT = 2
+
+_MAGIC = b"EMBS"
+_HEADER = np.dtype([("magic", "S4"), ("format", "<u4"), ("generation", "<u8")])
+
+
+def _digests(keys: np.ndarray) -> list[bytes]:
+    raw = np.ascontiguousarray(keys).tobytes()
+    return [raw[i:i + 32] for i in range(0, len(raw), 32)]
+
+
+def _header(generation: int) -> bytes:
+    return np.array([(_MAGIC, _FORMAT, generation)], dtype=_HEADER).tobytes()
+
+
+class EmbeddingStore:
+    """Content-addressed embedding cache: an append-only, memory-mapped file of
+    (sha256 digest, float32 vector) records whose hash -> row index is rebuilt on open.
+
+    The directory may be shared by several processes (uvicorn workers, the
+    preprocess server). Appends and compaction hold an exclusive ``flock`` on
+    ``store.lock``, reads a shared one. Compaction bumps the generation in the file
+    header, and every read or append first re-checks it: a process that sees a new
+    generation re-indexes the file, and one that sees extra rows indexes the tail.
+    """
+
+    def __init__(self, directory: str, dim: int, model: str, max_mb: float = EMBED_STORE_MAX_MB):
+        self.directory = directory
+        self.dim = dim
+        self.model = model
+        self.dtype = np.dtype([("key", "u1", (32,)), ("vec", "<f4", (dim,))])
+        self.max_rows = max(1, int(max_mb * 1024 * 1024 // self.dtype.itemsize))
+        self.data_path = os.path.join(directory, _DATA_FILE)
+        self._rows: dict[bytes, int] = {}
+        self._last_used: dict[bytes, int] = {}
+        self._tick = 0
+        self._file_rows = 0
+        self._generation: int | None = None
+        self._mmap: np.memmap | None = None
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compactions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = os.open(os.path.join(directory, _LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        self._open()
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        with self._guard:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _open(self):
+        meta_path = os.path.join(self.directory, _META_FILE)
+        meta = {"dim": self.dim, "model": self.model, "format": _FORMAT}
+        with self._locked(exclusive=True):
+            try:
+                with open(meta_path, "r") as f:
+                    stored = json.load(f)
+            except (FileNotFoundError, ValueError):
+                stored = None
+            if stored != meta:
+                if stored is not None:
+                    logger.warning("Embedding store %s was built for %s, resetting", self.directory, stored)
+                if os.path.exists(self.data_path):
+                    os.remove(self.data_path)
+                with open(meta_path, "w") as f:
+                    json.dump(meta, f)
+            if not os.path.exists(self.data_path):
+                with open(self.data_path, "wb") as f:
+                    f.write(_header(0))
+            self._sync()
+
+    def _sync(self):
+        """Catch up with compactions and appends by other processes; call with the lock held."""
+        with open(self.data_path, "rb") as f:
+            header = np.frombuffer(f.read(_HEADER.itemsize), dtype=_HEADER)
+            size = os.fstat(f.fileno()).st_size
+        if len(header) != 1 or header[0]["magic"] != _MAGIC:
+            raise RuntimeError(f"Embedding store {self.data_path} has no valid header")
+        generation = int(header[0]["generation"])
+        # a torn trailing record from an interrupted append is ignored and overwritten by the next one
+        rows = (size - _HEADER.itemsize) // self.dtype.itemsize
+        if generation != self._generation:
+            self._rows, self._last_used = {}, {}
+            self._tick = self._file_rows = 0
+            self._generation = generation
+            self._mmap = None
+        if rows > self._file_rows:
+            keys = np.memmap(self.data_path, dtype=self.dtype, mode="r", offset=_HEADER.itemsize, shape=(rows,))["key"]
+            for row, key in enumerate(_digests(keys[self._file_rows:]), start=self._file_rows):
+                self._rows[key] = row
+                self._touch(key)
+            self._file_rows = rows
+            self._mmap = None
+
+    def _records(self) -> np.memmap | None:
+        if self._mmap is None and self._file_rows:
+            self._mmap = np.memmap(
+                self.data_path, dtype=self.dtype, mode="r", offset=_HEADER.itemsize, shape=(self._file_rows,)
+            )
+        return self._mmap
+
+    def _touch(self, key: bytes):
+        self._last_used[key] = self._tick
+        self._tick += 1
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_many(self, hashes: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        with self._locked(exclusive=False):
+            self._sync()
+            records = self._records()
+            for h in hashes:
+                key = bytes.fromhex(h)
+                row = self._rows.get(key)
+                if row is None or records is None:
+                    self.misses += 1
+                    continue
+                found[h] = np.array(records[row]["vec"])
+                self._touch(key)
+                self.hits += 1
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._locked(exclusive=True):
+            self._sync()
+            # another process may have stored some of these since our caller missed them
+            items = {h: v for h, v in items.items() if bytes.fromhex(h) not in self._rows}
+            if not items:
+                return
+            batch = np.zeros(len(items), dtype=self.dtype)
+            for i, (h, vector) in enumerate(items.items()):
+                batch[i]["key"] = np.frombuffer(bytes.fromhex(h), dtype=np.uint8)
+                batch[i]["vec"] = vector
+            with open(self.data_path, "r+b") as f:
+                f.seek(_HEADER.itemsize + self._file_rows * self.dtype.itemsize)
+                f.write(batch.tobytes())
+                f.truncate()
+            for i, key in enumerate(_digests(batch["key"])):
+                self._rows[key] = self._file_rows + i
+                self._touch(key)
+            self._file_rows += len(batch)
+            self._mmap = None
+            if len(self._rows) > self.max_rows or self._dead_rows() > max(1024, len(self._rows) // 4):
+                self._compact()
+
+    def discard(self, hashes: list[str]):
+        for h in hashes:
+            key = bytes.fromhex(h)
+            self._rows.pop(key, None)
+            self._last_used.pop(key, None)
+
+    def _dead_rows(self) -> int:
+        return self._file_rows - len(self._rows)
+
+    def compact(self):
+        with self._locked(exclusive=True):
+            self._sync()
+            self._compact()
+
+    def _compact(self):
+        # rows are rewritten oldest-first so file order keeps tracking recency
+        records = self._records()
+        keep = sorted(self._rows, key=self._last_used.__getitem__)
+        limit = int(self.max_rows * 0.9)
+        if len(keep) > limit:
+            evicted = keep[:len(keep) - limit]
+            keep = keep[len(keep) - limit:]
+            self.evictions += len(evicted)
+            for key in evicted:
+                self._last_used.pop(key, None)
+
+        rows = np.zeros(len(keep), dtype=self.dtype)
+        if keep and records is not None:
+            rows[:] = records[[self._rows[k] for k in keep]]
+        records = None
+        generation = self._generation + 1
+        tmp_path = self.data_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_header(generation))
+            f.write(rows.tobytes())
+        self._mmap = None
+        os.replace(tmp_path, self.data_path)
+
+        self._rows = {key: row for row, key in enumerate(keep)}
+        self._last_used = {key: row for row, key in enumerate(keep)}
+        self._tick = len(keep)
+        self._file_rows = len(keep)
+        self._generation = generation
+        self.compactions += 1
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self._rows),
+            "file_rows": self._file_rows,
+            "max_rows": self.max_rows,
+            "generation": self._generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "compactions": self.compactions,
+        }
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+
+from app.db import AsyncSessionLocal
+from app.models.ingest_job import IngestJob
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_QUEUE_MAX = int(os.getenv("INGEST_QUEUE_MAX", "1000"))
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "5"))
+INGEST_RETRY_BASE_SECONDS = float(os.getenv("INGEST_RETRY_BASE_SECONDS", "2"))
+INGEST_RETRY_MAX_SECONDS = float(os.getenv("INGEST_RETRY_MAX_SECONDS", "300"))
+INGEST_JOB_RETENTION_DAYS = int(os.getenv("INGEST_JOB_RETENTION_DAYS", "7"))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+logger = logging.getLogger("backend.ingest_queue")
+
+
+class IngestQueueFull(RuntimeError):
+    pass
+
+
+def _job_out(job: IngestJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class IngestQueue:
+    """Durable priority queue for RAG ingest jobs, stored in the ``ingest_jobs`` table.
+
+    Jobs survive restarts (anything left ``running`` is requeued on start), failures
+    are retried with exponential backoff, and bulk jobs never occupy every worker so
+    interactive submissions always have one free.
+    """
+
+    def __init__(
+        self,
+        workers: int = INGEST_WORKERS,
+        max_queued: int = INGEST_QUEUE_MAX,
+        max_attempts: int = INGEST_MAX_ATTEMPTS,
+    ):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self._handler = None
+        self._tasks: list[asyncio.Task] = []
+        self._wake: asyncio.Event | None = None
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+        self._running_bulk = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+
+    async def start(self, handler):
+        """``handler(kind, payload)`` is awaited for each job; raising schedules a retry."""
+        self._handler = handler
+        self._wake = asyncio.Event()
+        async with AsyncSessionLocal() as db:
+            requeued = (await db.execute(
+                update(IngestJob).where(IngestJob.status == "running").values(status="queued")
+            )).rowcount
+            cutoff = datetime.utcnow() - timedelta(days=INGEST_JOB_RETENTION_DAYS)
+            await db.execute(delete(IngestJob).where(
+                IngestJob.status.in_(("done", "failed")), IngestJob.finished_at < cutoff
+            ))
+            await db.commit()
+        if requeued:
+            logger.info("Requeued %d ingest jobs interrupted by a restart", requeued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, kind: str, payload: dict, priority: int = PRIORITY_INTERACTIVE) -> str:
+        async with AsyncSessionLocal() as db:
+            queued = await db.scalar(select(func.count(IngestJob.id)).where(IngestJob.status == "queued"))
+            if queued >= self.max_queued:
+                raise IngestQueueFull(f"Ingest queue is full ({queued} jobs)")
+            job = IngestJob(kind=kind, payload=json.dumps(payload, ensure_ascii=False), priority=priority)
+            db.add(job)
+            await db.commit()
+            job_id = job.id
+        if self._wake is not None:
+            self._wake.set()
+        return job_id
+
+    async def get(self, job_id: str) -> dict | None:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(IngestJob, job_id)
+            return _job_out(job) if job else None
+
+    async def wait(self, job_id: str) -> dict:
+        """Resolve once the job is done or has permanently failed."""
+        # register before reading so a _finish that lands during the read still resolves us
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job_id, []).append(future)
+        job = await self.get(job_id)
+        if job is None or job["status"] in ("done", "failed"):
+            waiters = self._waiters.get(job_id, [])
+            if future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[job_id]
+            return future.result() if future.done() else job
+        return await future
+
+    async def _claim(self) -> tuple[IngestJob | None, float | None]:
+        """Atomically take the next runnable job; otherwise return seconds until one is due."""
+        now = datetime.utcnow()
+        bulk_allowed = self.workers == 1 or self._running_bulk < self.workers - 1
+        conditions = [IngestJob.status == "queued"]
+        if not bulk_allowed:
+            conditions.append(IngestJob.priority <= PRIORITY_INTERACTIVE)
+        async with AsyncSessionLocal() as db:
+            candidates = (await db.scalars(
+                select(IngestJob)
+                .where(*conditions, IngestJob.available_at <= now)
+                .order_by(IngestJob.priority, IngestJob.created_at)
+                .limit(self.workers * 2)
+            )).all()
+            for job in candidates:
+                claimed = (await db.execute(
+                    update(IngestJob)
+                    .where(IngestJob.id == job.id, IngestJob.status == "queued")
+                    .values(status="running", attempts=IngestJob.attempts + 1)
+                )).rowcount
+                await db.commit()
+                if claimed:
+                    await db.refresh(job)
+                    db.expunge(job)
+                    return job, None
+            next_at = await db.scalar(select(func.min(IngestJob.available_at)).where(*conditions))
+        return None, (max(0.0, (next_at - now).total_seconds()) if next_at else None)
+
+    async def _finish(self, job: IngestJob, error: str | None):
+        values = {"last_error": error}
+        if error is None:
+            values.update(status="done", payload=None, finished_at=datetime.utcnow())
+            self.completed += 1
+        elif job.attempts >= self.max_attempts:
+            values.update(status="failed", finished_at=datetime.utcnow())
+            self.failed += 1
+        else:
+            delay = min(INGEST_RETRY_MAX_SECONDS, INGEST_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+            values.update(status="queued", available_at=datetime.utcnow() + timedelta(seconds=delay))
+            self.retried += 1
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(IngestJob).where(IngestJob.id == job.id).values(**values))
+            await db.commit()
+            result = _job_out(await db.get(IngestJob, job.id))
+        if values["status"] in ("done", "failed"):
+            for future in self._waiters.pop(job.id, []):
+                if not future.done():
+                    future.set_result(result)
+        self._wake.set()
+
+    async def _worker(self):
+        while True:
+            job, wait_for = await self._claim()
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait_for)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            bulk = job.priority > PRIORITY_INTERACTIVE
+            if bulk:
+                self._running_bulk += 1
+            try:
+                await self._handler(job.kind, json.loads(job.payload))
+                error = None
+            except Exception as exc:
+                logger.error("Ingest job %s failed (attempt %d): %s", job.id, job.attempts, exc)
+                error = str(exc) or exc.__class__.__name__
+            finally:
+                if bulk:
+                    self._running_bulk -= 1
+            await self._finish(job, error)
+
+    async def stats(self) -> dict:
+        async with AsyncSessionLocal() as db:
+            counts = dict((await db.execute(
+                select(IngestJob.status, func.count(IngestJob.id)).group_by(IngestJob.status)
+            )).all())
+        return {
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "running_bulk": self._running_bulk,
+            "jobs": counts,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+
+IVF_NLIST = int(os.getenv("IVF_NLIST", "0"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+IVF_MIN_ROWS = int(os.getenv("IVF_MIN_ROWS", "2048"))
+IVF_TRAIN_ITERS = int(os.getenv("IVF_TRAIN_ITERS", "8"))
+
+_ASSIGN_BATCH = 8192
+
+
+class IVFIndex:
+    """Inverted-file ANN index over unit vectors.
+
+    Rows are bucketed under the nearest of ``nlist`` k-means centroids; a query
+    only scores the rows in its ``nprobe`` closest buckets. Raising ``nprobe``
+    trades latency for recall. Below ``min_rows`` the index stays untrained and
+    callers fall back to an exact scan.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        nlist: int = IVF_NLIST,
+        nprobe: int = IVF_NPROBE,
+        min_rows: int = IVF_MIN_ROWS,
+        train_iters: int = IVF_TRAIN_ITERS,
+    ):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_rows = min_rows
+        self.train_iters = train_iters
+        self.centroids: np.ndarray | None = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_rows = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def reset(self, n_rows: int = 0):
+        self.centroids = None
+        self.assignments = np.full(n_rows, -1, dtype=np.int32)
+        self.trained_rows = 0
+
+    def needs_training(self, live_rows: int) -> bool:
+        if live_rows < self.min_rows:
+            return False
+        return not self.trained or live_rows > 4 * self.trained_rows
+
+    def _assign(self, centroids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _ASSIGN_BATCH):
+            block = np.asarray(vectors[start:start + _ASSIGN_BATCH], dtype=np.float32)
+            out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return out
+
+    def fit(self, matrix: np.ndarray, alive: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Spherical k-means on a sample of live rows; returns (centroids, assignments)."""
+        live = np.flatnonzero(alive)
+        nlist = self.nlist or max(1, int(np.sqrt(len(live))))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(live, size=min(len(live), nlist * 64), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=min(nlist, len(sample)), replace=False)].copy()
+        for _ in range(self.train_iters):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = sample[labels == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    if norm:
+                        centroids[c] = centroid / norm
+        return centroids, self._assign(centroids, matrix)
+
+    def install(self, centroids: np.ndarray, assignments: np.ndarray, live_rows: int):
+        self.centroids = centroids
+        self.assignments = assignments
+        self.trained_rows = live_rows
+
+    def add(self, vectors: np.ndarray):
+        if self.trained:
+            labels = self._assign(self.centroids, vectors)
+        else:
+            labels = np.full(len(vectors), -1, dtype=np.int32)
+        self.assignments = np.concatenate([self.assignments, labels])
+
+    def candidates(self, query: np.ndarray) -> np.ndarray | None:
+        if not self.trained:
+            return None
+        nprobe = min(self.nprobe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        # unassigned rows (-1) are always scanned so nothing is ever unreachable
+        return np.flatnonzero(np.isin(self.assignments, probe) | (self.assignments < 0))
+
+    def save(self, path: str, generation: int):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                generation=generation,
+                trained_rows=self.trained_rows,
+                centroids=self.centroids if self.trained else np.zeros((0, self.dim), dtype=np.float32),
+                assignments=self.assignments,
+            )
+        os.replace(tmp_path, path)
+
+    def load(self, path: str, generation: int) -> bool:
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            if int(data["generation"]) != generation or not len(data["centroids"]):
+                return False
+            self.install(data["centroids"], data["assignments"], int(data["trained_rows"]))
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "trained": self.trained,
+            "nlist": len(self.centroids) if self.trained else 0,
+            "nprobe": self.nprobe,
+            "trained_rows": self.trained_rows,
+        }
@@ -0,0 +1,428 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from lightrag.base import BaseVectorStorage
+from lightrag.utils import compute_mdhash_id
+
+from app.services.ivf_index import IVFIndex
+
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float32")
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "ivf")
+
+logger = logging.getLogger("backend.vector_store")
+
+_FORMAT_VERSION = 1
+
+
+def register():
+    """Make MmapVectorDBStorage selectable through LightRAG(vector_storage=...)."""
+    from lightrag.kg import STORAGE_IMPLEMENTATIONS, STORAGES
+
+    STORAGES["MmapVectorDBStorage"] = "app.services.mmap_vector_storage"
+    implementations = STORAGE_IMPLEMENTATIONS["VECTOR_STORAGE"]["implementations"]
+    if "MmapVectorDBStorage" not in implementations:
+        implementations.append("MmapVectorDBStorage")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@dataclass
+class MmapVectorDBStorage(BaseVectorStorage):
+    """Vector storage backed by a raw, append-only matrix file plus a JSONL id index.
+
+    ``vdb_<namespace>.<generation>.vec`` holds unit-normalised vectors row by row and
+    is memory-mapped on first use. ``vdb_<namespace>.index.jsonl`` starts with a
+    header line (dim, dtype, generation) followed by one line per upsert or delete,
+    so writes only ever append. Compaction writes the next generation and switches
+    to it by atomically replacing the index file.
+
+    With ``VECTOR_INDEX=ivf`` queries go through an IVF index persisted next to the
+    matrix as ``vdb_<namespace>.ivf.npz``; ``VECTOR_INDEX=flat`` always scans.
+    """
+
+    def __post_init__(self):
+        self._validate_embedding_func()
+        kwargs = self.global_config.get("vector_db_storage_cls_kwargs", {})
+        threshold = kwargs.get("cosine_better_than_threshold")
+        if threshold is None:
+            raise ValueError("cosine_better_than_threshold must be specified in vector_db_storage_cls_kwargs")
+        self.cosine_better_than_threshold = threshold
+
+        working_dir = self.global_config["working_dir"]
+        self._dir = os.path.join(working_dir, self.workspace) if self.workspace else working_dir
+        os.makedirs(self._dir, exist_ok=True)
+        self._index_path = os.path.join(self._dir, f"vdb_{self.namespace}.index.jsonl")
+        self._legacy_path = os.path.join(self._dir, f"vdb_{self.namespace}.json")
+        self._max_batch_size = self.global_config.get("embedding_batch_num", 32)
+        self.dim = self.embedding_func.embedding_dim
+        self.dtype = np.dtype(VECTOR_STORE_DTYPE)
+        self.generation = 0
+        self._ann = IVFIndex(self.dim) if VECTOR_INDEX == "ivf" else None
+        self._ann_path = os.path.join(self._dir, f"vdb_{self.namespace}.ivf.npz")
+
+        self._loaded = False
+        self._records: dict[str, dict[str, Any]] = {}
+        self._rows: dict[str, int] = {}
+        self._row_ids: list[str | None] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._mmap: np.memmap | None = None
+        self._lock = asyncio.Lock()
+
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self._dir, f"vdb_{self.namespace}.{generation}.vec")
+
+    # -- loading -----------------------------------------------------------
+
+    def _header(self) -> dict:
+        return {"format": _FORMAT_VERSION, "dim": self.dim, "dtype": self.dtype.name, "generation": self.generation}
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self._index_path):
+            if os.path.exists(self._legacy_path):
+                self._migrate_legacy()
+            else:
+                self._write_generation([], np.zeros((0, self.dim), dtype=np.float32), 1)
+            return
+
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("dim") != self.dim:
+                raise ValueError(
+                    f"Vector store {self._index_path} has dim {header.get('dim')}, embedding_func has {self.dim}"
+                )
+            self.dtype = np.dtype(header["dtype"])
+            self.generation = header["generation"]
+            file_rows = self._truncate_torn_row(self._vectors_path(self.generation))
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn trailing line from an interrupted append
+                    break
+                doc_id = entry["__id__"]
+                row = entry.pop("__row__", None)
+                if row is None:
+                    self._records.pop(doc_id, None)
+                    self._rows.pop(doc_id, None)
+                elif row < file_rows:
+                    self._records[doc_id] = entry
+                    self._rows[doc_id] = row
+
+        self._row_ids = [None] * file_rows
+        self._alive = np.zeros(file_rows, dtype=bool)
+        for doc_id, row in self._rows.items():
+            self._row_ids[row] = doc_id
+            self._alive[row] = True
+        self._remove_stale_generations()
+        self._load_ann()
+
+    def _load_ann(self):
+        if self._ann is None:
+            return
+        try:
+            loaded = self._ann.load(self._ann_path, self.generation)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring unreadable ANN index %s: %s", self._ann_path, exc)
+            loaded = False
+        if not loaded:
+            self._ann.reset(len(self._row_ids))
+            return
+        # rows appended after the last save are assigned here; rows lost to a torn write are dropped
+        known = len(self._ann.assignments)
+        if known > len(self._row_ids):
+            self._ann.assignments = self._ann.assignments[:len(self._row_ids)]
+        elif known < len(self._row_ids):
+            tail = np.asarray(self._matrix()[known:], dtype=np.float32)
+            self._ann.assignments = self._ann.assignments[:known]
+            self._ann.add(tail)
+
+    def _truncate_torn_row(self, path: str) -> int:
+        if not os.path.exists(path):
+            open(path, "wb").close()
+            return 0
+        row_bytes = self.dim * self.dtype.itemsize
+        size = os.path.getsize(path)
+        if size % row_bytes:
+            with open(path, "r+b") as f:
+                f.truncate(size - size % row_bytes)
+        return size // row_bytes
+
+    def _migrate_legacy(self):
+        with open(self._legacy_path, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        matrix = np.frombuffer(base64.b64decode(legacy["matrix"]), dtype=np.float32)
+        matrix = matrix.reshape(-1, legacy["embedding_dim"])
+        records = [{k: v for k, v in dp.items() if k != "vector"} for dp in legacy["data"]]
+        self._write_generation(records, _normalize(matrix), 1)
+        logger.info("Migrated %d vectors from %s", len(records), self._legacy_path)
+
+    def _remove_stale_generations(self):
+        prefix = f"vdb_{self.namespace}."
+        current = os.path.basename(self._vectors_path(self.generation))
+        for name in os.listdir(self._dir):
+            if name.startswith(prefix) and name.endswith(".vec") and name != current:
+                os.remove(os.path.join(self._dir, name))
+
+    # -- writing -----------------------------------------------------------
+
+    def _matrix(self) -> np.ndarray | None:
+        if not self._row_ids:
+            return None
+        if self._mmap is None:
+            self._mmap = np.memmap(
+                self._vectors_path(self.generation),
+                dtype=self.dtype,
+                mode="r",
+                shape=(len(self._row_ids), self.dim),
+            )
+        return self._mmap
+
+    def _write_generation(
+        self,
+        records: list[dict],
+        vectors: np.ndarray,
+        generation: int,
+        assignments: np.ndarray | None = None,
+    ):
+        # the index replace is the commit point; the old matrix is only removed afterwards
+        with open(self._vectors_path(generation), "wb") as f:
+            f.write(vectors.astype(self.dtype).tobytes())
+        self.generation = generation
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self._header()) + "\n")
+            for row, record in enumerate(records):
+                f.write(json.dumps({**record, "__row__": row}, ensure_ascii=False) + "\n")
+        self._mmap = None
+        os.replace(tmp_path, self._index_path)
+
+        self._records = {r["__id__"]: r for r in records}
+        self._rows = {r["__id__"]: row for row, r in enumerate(records)}
+        self._row_ids = [r["__id__"] for r in records]
+        self._alive = np.ones(len(records), dtype=bool)
+        self._remove_stale_generations()
+        if self._ann is not None:
+            if assignments is not None and self._ann.trained:
+                self._ann.install(self._ann.centroids, assignments, self._ann.trained_rows)
+            else:
+                self._ann.reset(len(records))
+
+    def _append(self, records: list[dict], vectors: np.ndarray):
+        start = len(self._row_ids)
+        with open(self._vectors_path(self.generation), "ab") as f:
+            f.write(vectors.astype(self.dtype).tobytes())
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            for i, record in enumerate(records):
+                f.write(json.dumps({**record, "__row__": start + i}, ensure_ascii=False) + "\n")
+        if self._ann is not None:
+            self._ann.add(vectors)
+
+        self._alive = np.concatenate([self._alive, np.ones(len(records), dtype=bool)])
+        self._row_ids.extend(r["__id__"] for r in records)
+        for i, record in enumerate(records):
+            doc_id = record["__id__"]
+            old = self._rows.get(doc_id)
+            if old is not None:
+                self._alive[old] = False
+                self._row_ids[old] = None
+            self._records[doc_id] = record
+            self._rows[doc_id] = start + i
+        self._mmap = None
+
+    def _remove(self, ids: list[str]):
+        removed = [doc_id for doc_id in ids if doc_id in self._rows]
+        if not removed:
+            return
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            for doc_id in removed:
+                f.write(json.dumps({"__id__": doc_id}) + "\n")
+        for doc_id in removed:
+            row = self._rows.pop(doc_id)
+            self._records.pop(doc_id, None)
+            self._alive[row] = False
+            self._row_ids[row] = None
+
+    def _compact(self):
+        matrix = self._matrix()
+        live = sorted(self._rows.items(), key=lambda item: item[1])
+        records = [self._records[doc_id] for doc_id, _ in live]
+        if matrix is not None and live:
+            vectors = np.asarray(matrix[[row for _, row in live]])
+        else:
+            vectors = np.zeros((0, self.dim), dtype=self.dtype)
+        matrix = None
+        assignments = None
+        if self._ann is not None and self._ann.trained:
+            assignments = self._ann.assignments[[row for _, row in live]]
+        self._write_generation(records, vectors, self.generation + 1, assignments)
+
+    # -- BaseVectorStorage ---------------------------------------------------
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        if not data:
+            return
+        now = int(time.time())
+        records = [
+            {"__id__": k, "__created_at__": now, **{f: v for f, v in d.items() if f in self.meta_fields}}
+            for k, d in data.items()
+        ]
+        contents = [d["content"] for d in data.values()]
+        batches = [contents[i:i + self._max_batch_size] for i in range(0, len(contents), self._max_batch_size)]
+        embeddings = await asyncio.gather(*(self.embedding_func(batch) for batch in batches))
+        vectors = _normalize(np.concatenate(embeddings))
+        if vectors.shape != (len(records), self.dim):
+            raise ValueError(f"Embedding shape {vectors.shape} does not match {len(records)} records")
+
+        async with self._lock:
+            self._ensure_loaded()
+            self._append(records, vectors)
+
+    async def query(self, query: str, top_k: int, query_embedding: list[float] = None) -> list[dict[str, Any]]:
+        if query_embedding is None:
+            query_embedding = (await self.embedding_func([query]))[0]
+        q = _normalize(query_embedding).reshape(-1)
+
+        async with self._lock:
+            self._ensure_loaded()
+            matrix = self._matrix()
+            if matrix is None or not self._rows:
+                return []
+            candidates = self._ann.candidates(q) if self._ann is not None else None
+            if candidates is None:
+                candidates = np.flatnonzero(self._alive)
+            else:
+                candidates = candidates[self._alive[candidates]]
+            if not len(candidates):
+                return []
+            scores = np.asarray(matrix[candidates] @ q, dtype=np.float32)
+            k = min(top_k, len(candidates))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = []
+            for i in top:
+                row = candidates[i]
+                score = float(scores[i])
+                if score < self.cosine_better_than_threshold:
+                    break
+                record = self._records[self._row_ids[row]]
+                results.append({**record, "id": record["__id__"], "distance": score, "created_at": record["__created_at__"]})
+            return results
+
+    async def delete(self, ids: list[str]):
+        async with self._lock:
+            self._ensure_loaded()
+            self._remove(ids)
+
+    async def delete_entity(self, entity_name: str) -> None:
+        await self.delete([compute_mdhash_id(entity_name, prefix="ent-")])
+
+    async def delete_entity_relation(self, entity_name: str) -> None:
+        async with self._lock:
+            self._ensure_loaded()
+            ids = [
+                doc_id
+                for doc_id, record in self._records.items()
+                if record.get("src_id") == entity_name or record.get("tgt_id") == entity_name
+            ]
+            self._remove(ids)
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        async with self._lock:
+            self._ensure_loaded()
+            record = self._records.get(id)
+        if record is None:
+            return None
+        return {**record, "id": record["__id__"], "created_at": record["__created_at__"]}
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        results = []
+        for doc_id in ids:
+            record = await self.get_by_id(doc_id)
+            if record is not None:
+                results.append(record)
+        return results
+
+    async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
+        async with self._lock:
+            self._ensure_loaded()
+            matrix = self._matrix()
+            if matrix is None:
+                return {}
+            return {
+                doc_id: np.asarray(matrix[self._rows[doc_id]], dtype=np.float32).tolist()
+                for doc_id in ids
+                if doc_id in self._rows
+            }
+
+    async def index_done_callback(self) -> None:
+        async with self._lock:
+            if not self._loaded:
+                return
+            dead = len(self._row_ids) - len(self._rows)
+            if dead > 1024 and dead > len(self._rows):
+                self._compact()
+            if self._ann is None:
+                return
+            train = self._ann.needs_training(len(self._rows))
+            if train:
+                matrix = self._matrix()
+                alive = self._alive.copy()
+                generation = self.generation
+                live_rows = len(self._rows)
+
+        if train:
+            # k-means runs off the event loop and without the lock; rows appended
+            # meanwhile are assigned once the result is installed
+            started = time.perf_counter()
+            centroids, assignments = await asyncio.to_thread(self._ann.fit, matrix, alive)
+            logger.info(
+                "Trained IVF index for %s: %d lists over %d rows in %.1fs",
+                self.namespace, len(centroids), live_rows, time.perf_counter() - started,
+            )
+
+        async with self._lock:
+            if train and generation == self.generation:
+                known = len(assignments)
+                self._ann.install(centroids, assignments, live_rows)
+                if known < len(self._row_ids):
+                    self._ann.add(np.asarray(self._matrix()[known:], dtype=np.float32))
+            self._ann.save(self._ann_path, self.generation)
+
+    async def drop(self) -> dict[str, str]:
+        try:
+            async with self._lock:
+                self._loaded = True
+                self._write_generation([], np.zeros((0, self.dim), dtype=np.float32), self.generation + 1)
+            return {"status": "success", "message": "data dropped"}
+        except Exception as exc:
+            logger.error("Error dropping %s: %s", self.namespace, exc)
+            return {"status": "error", "message": str(exc)}
+
+    def stats(self) -> dict:
+        return {
+            "namespace": self.namespace,
+            "loaded": self._loaded,
+            "rows": len(self._rows),
+            "file_rows": len(self._row_ids),
+            "dtype": self.dtype.name,
+            "generation": self.generation,
+            "ann": self._ann.stats() if self._ann is not None else None,
+        }
@@ -0,0 +1,106 @@
+"""PBKDF2 hashing on a bounded worker pool (``PASSWORD_HASH_POOL`` thread or process).
+
+Past ``PASSWORD_HASH_QUEUE_MAX`` waiting calls ``HashQueueFull`` is raised; routes answer 429.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.utils.password import hash_password, verify_password
+
+PASSWORD_HASH_POOL = os.getenv("PASSWORD_HASH_POOL", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_MAX = int(os.getenv("PASSWORD_HASH_QUEUE_MAX", "64"))
+
+
+class HashQueueFull(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, kind: str = PASSWORD_HASH_POOL, workers: int = PASSWORD_HASH_WORKERS,
+                 queue_max: int = PASSWORD_HASH_QUEUE_MAX):
+        if kind not in ("thread", "process"):
+            raise RuntimeError(f"Unknown PASSWORD_HASH_POOL {kind!r}, expected 'thread' or 'process'")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.queue_max = queue_max
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    def _pool(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    def _done(self, _future):
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.workers + self.queue_max:
+                self.rejected += 1
+                raise HashQueueFull(f"Password hashing is saturated ({self.pending} calls pending)")
+            self.pending += 1
+            try:
+                future = self._pool().submit(fn, *args)
+            except Exception:
+                self.pending -= 1
+                raise
+        future.add_done_callback(self._done)
+        return future
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(hash_password, password))
+
+    async def verify(self, password: str, stored: str) -> bool:
+        return await asyncio.wrap_future(self.submit(verify_password, password, stored))
+
+    def hash_sync(self, password: str) -> str:
+        """For sync routes and startup code: blocks the caller, but still counts against the pool."""
+        return self.submit(hash_password, password).result()
+
+    def verify_sync(self, password: str, stored: str) -> bool:
+        return self.submit(verify_password, password, stored).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"kind": self.kind, "workers": self.workers, "pending": self.pending, "rejected": self.rejected}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hasher = PasswordHasher()
+
+
+async def hash_or_429(password: str) -> str:
+    try:
+        return await hasher.hash(password)
+    except HashQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"})
+
+
+def hash_sync_or_429(password: str) -> str:
+    try:
+        return hasher.hash_sync(password)
+    except HashQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"})
+
+
+async def verify_or_429(password: str, stored: str) -> bool:
+    try:
+        return await hasher.verify(password, stored)
+    except HashQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"})
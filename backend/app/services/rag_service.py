@@ -1,7 +1,11 @@
 import os
 import asyncio
 import logging
-import numpy as np
+import time
+from app.services.answer_cache import ANSWER_CACHE_ENABLED, AnswerCache, normalize_prompt, unit_vector
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_store import EMBED_STORE_ENABLED, EmbeddingStore
+from app.services.ingest_queue import PRIORITY_INTERACTIVE, IngestQueue
 
 try:
     from lightrag import LightRAG, QueryParam
@@ -18,12 +22,18 @@ except Exception:
 WORKING_DIR = os.getenv("RAG_WORKDIR", "./rag_storage")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-004")
+EMBED_DIM = int(os.getenv("EMBED_DIM", "768"))
+VECTOR_STORAGE = os.getenv("RAG_VECTOR_STORAGE", "MmapVectorDBStorage")
+EMBED_STORE_DIR = os.getenv("EMBED_STORE_DIR", os.path.join(WORKING_DIR, "embedding_cache"))
 
 if setup_logger:
     setup_logger("lightrag", level="INFO")
 
 logger = logging.getLogger("backend.rag")
 
+QUOTA_MESSAGE = "He thong dang het han muc (quota). Vui long thu lai sau."
+RAW_CONTEXT_ERROR = "Khong the truy xuat raw context. Vui long kiem tra embedding."
+
 
 def build_prompt(message: str, history: list[dict] | None) -> str:
     if not history:
@@ -44,10 +54,11 @@ class RagService:
         self.rag = None
         self.ready = False
         self._init_task = None
-        self._ingest_queue: asyncio.Queue[str] | None = None
-        self._ingest_task: asyncio.Task | None = None
+        self.ingest_queue = IngestQueue()
         self.force_bypass = False
         self.raw_only = False
+        self.embedder: EmbeddingBatcher | None = None
+        self.answer_cache = AnswerCache() if ANSWER_CACHE_ENABLED else None
 
     async def init(self):
         if not LightRAG:
@@ -91,11 +102,17 @@ class RagService:
                             delay *= 2
                             continue
                         logger.error("LLM quota exceeded. Returning fallback response.")
-                        return "He thong dang het han muc (quota). Vui long thu lai sau."
+                        return QUOTA_MESSAGE
                     raise
 
+        async def provider_embed(texts: list[str], **kwargs):
+            return await gemini_embed.func(texts, api_key=api_key, model=EMBED_MODEL, **kwargs)
+
+        store = EmbeddingStore(EMBED_STORE_DIR, EMBED_DIM, EMBED_MODEL) if EMBED_STORE_ENABLED else None
+        self.embedder = EmbeddingBatcher(provider_embed, embedding_dim=EMBED_DIM, store=store)
+
         @wrap_embedding_func_with_attrs(
-            embedding_dim=768,
+            embedding_dim=EMBED_DIM,
             max_token_size=2048,
             model_name=EMBED_MODEL,
             send_dimensions=True,
@@ -105,90 +122,74 @@ class RagService:
             embedding_dim: int | None = None,
             max_token_size: int | None = None,
         ):
-            result = await gemini_embed.func(
+            return await self.embedder.embed(
                 texts,
-                api_key=api_key,
-                model=EMBED_MODEL,
                 embedding_dim=embedding_dim,
                 max_token_size=max_token_size,
             )
 
-            if isinstance(result, dict) and "embedding" in result:
-                vectors = np.array(result["embedding"])
-            elif hasattr(result, "embedding"):
-                vectors = np.array(result.embedding)
-            else:
-                vectors = np.array(result)
-
-            expected_dim = embedding_dim or 768
-
-            if vectors.size == 0:
-                return np.zeros((len(texts), expected_dim))
-
-            if vectors.ndim == 1:
-                # If a flat array contains multiple vectors concatenated, reshape to (n, dim)
-                if vectors.shape[0] % expected_dim == 0 and vectors.shape[0] > expected_dim:
-                    vectors = vectors.reshape(-1, expected_dim)
-                else:
-                    vectors = vectors.reshape(1, -1)
-
-            if vectors.ndim > 2:
-                vectors = vectors.reshape(-1, vectors.shape[-1])
-
-            # If we still don't have the expected embedding dimension, reshape by total size.
-            if vectors.ndim == 2 and vectors.shape[1] != expected_dim:
-                if vectors.size % expected_dim == 0:
-                    vectors = vectors.reshape(-1, expected_dim)
-
-            if len(texts) == 1 and vectors.shape[0] > 1:
-                return np.mean(vectors, axis=0, keepdims=True)
-
-            if vectors.shape[0] != len(texts):
-                if vectors.shape[0] > len(texts):
-                    indices = np.array_split(np.arange(vectors.shape[0]), len(texts))
-                    grouped = [np.mean(vectors[idx], axis=0) for idx in indices]
-                    return np.stack(grouped, axis=0)
-                else:
-                    last_vector = vectors[-1:]
-                    padding = np.repeat(
-                        last_vector, len(texts) - vectors.shape[0], axis=0
-                    )
-                    return np.concatenate([vectors, padding], axis=0)
-
-            return vectors
+        if VECTOR_STORAGE == "MmapVectorDBStorage":
+            from app.services.mmap_vector_storage import register
+            register()
 
         self.rag = LightRAG(
             working_dir=WORKING_DIR,
             llm_model_func=llm_model_func,
             llm_model_name=GEMINI_MODEL,
             embedding_func=embedding_func,
+            vector_storage=VECTOR_STORAGE,
         )
         await self.rag.initialize_storages()
         self.ready = True
 
-        self._ingest_queue = asyncio.Queue()
-        self._ingest_task = asyncio.create_task(self._ingest_loop())
-
-    async def _ingest_loop(self):
-        if not self._ingest_queue:
-            return
-
-        while True:
-            text = await self._ingest_queue.get()
-            try:
-                await self.ingest_text(text)
-            finally:
-                self._ingest_queue.task_done()
-
-    async def enqueue_ingest(self, text: str):
-        if not self._ingest_queue:
-            raise RuntimeError("Ingest queue not initialized")
-        await self._ingest_queue.put(text)
-
-    async def ingest_text(self, text: str) -> bool:
+        await self.ingest_queue.start(self._run_ingest_job)
+
+    async def _run_ingest_job(self, kind: str, payload: dict):
+        if kind == "delete":
+            ok = all([await self.delete_document(doc_id) for doc_id in payload["doc_ids"]])
+        else:
+            ok = await self.ingest_text(payload["text"], payload.get("ids"), payload.get("file_paths"))
+        if not ok:
+            raise RuntimeError(f"RAG {kind} failed")
+
+    async def enqueue_ingest(
+        self,
+        text: str | list[str],
+        ids: list[str] | None = None,
+        file_paths: list[str] | None = None,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> str:
+        """Persist an insert job and return its id; raises IngestQueueFull when saturated."""
+        payload = {"text": text, "ids": ids, "file_paths": file_paths}
+        return await self.ingest_queue.submit("insert", payload, priority)
+
+    async def enqueue_delete(self, doc_ids: list[str], priority: int = PRIORITY_INTERACTIVE) -> str:
+        return await self.ingest_queue.submit("delete", {"doc_ids": doc_ids}, priority)
+
+    async def delete_document(self, doc_id: str) -> bool:
+        if not self.rag:
+            raise RuntimeError("RAG not initialized")
+        result = await self.rag.adelete_by_doc_id(doc_id)
+        if self.answer_cache is not None:
+            self.answer_cache.clear()
+        return getattr(result, "status", "success") in ("success", "not_found")
+
+    async def ingest_text(
+        self,
+        text: str | list[str],
+        ids: list[str] | None = None,
+        file_paths: list[str] | None = None,
+    ) -> bool:
         if not self.rag:
             raise RuntimeError("RAG not initialized")
 
+        if ids is not None or isinstance(text, list):
+            # one call for the whole batch keeps LightRAG's chunking and embedding batches full
+            await self.rag.ainsert(text, ids=ids, file_paths=file_paths)
+            if self.answer_cache is not None:
+                self.answer_cache.clear()
+            return True
+
         for method_name in ("ainsert", "insert", "add", "ingest", "insert_text"):
             method = getattr(self.rag, method_name, None)
             if not method:
@@ -204,17 +205,58 @@ class RagService:
                         method([text])
                     except Exception:
                         method(text)
+                if self.answer_cache is not None:
+                    self.answer_cache.clear()
                 return True
             except Exception:
                 continue
 
         return False
 
+    async def _cache_lookup(self, prompt: str):
+        if self.answer_cache is None:
+            return None, None, None
+        key = normalize_prompt(prompt)
+        answer = self.answer_cache.get(key)
+        if answer is not None:
+            return answer, key, None
+
+        vector = None
+        if self.embedder:
+            try:
+                # prompts are one-off texts: keep them out of the on-disk EmbeddingStore
+                vector = unit_vector((await self.embedder.embed([prompt], persist=False))[0])
+            except Exception as exc:
+                logger.warning("Answer cache embedding failed: %s", exc)
+        if vector is not None:
+            answer = self.answer_cache.get_similar(vector)
+            if answer is not None:
+                return answer, key, vector
+        self.answer_cache.miss()
+        return None, key, vector
+
+    def _cache_store(self, key: str | None, vector, answer: str, cost_seconds: float):
+        if self.answer_cache is None or key is None:
+            return
+        if not answer or answer in (QUOTA_MESSAGE, RAW_CONTEXT_ERROR):
+            return
+        self.answer_cache.put(key, answer, vector, cost_seconds)
+
     async def ask(self, message: str, history: list[dict] | None):
         if not self.rag:
             raise RuntimeError("RAG not initialized")
 
         prompt = build_prompt(message, history)
+        cached, key, vector = await self._cache_lookup(prompt)
+        if cached is not None:
+            return cached
+
+        started = time.monotonic()
+        answer = await self._query(prompt)
+        self._cache_store(key, vector, answer, time.monotonic() - started)
+        return answer
+
+    async def _query(self, prompt: str) -> str:
         if self.raw_only:
             try:
                 result = await self.rag.aquery(
@@ -239,7 +281,7 @@ class RagService:
                 return str(result)
             except Exception as exc:
                 logger.error("Raw-only retrieval failed: %s", exc)
-                return "Khong the truy xuat raw context. Vui long kiem tra embedding."
+                return RAW_CONTEXT_ERROR
         if self.force_bypass:
             answer = await self.rag.aquery(
                 prompt,
@@ -264,6 +306,60 @@ class RagService:
                 return ""
             return answer
 
+    async def ask_stream(self, message: str, history: list[dict] | None):
+        if not self.rag:
+            raise RuntimeError("RAG not initialized")
+
+        if self.raw_only or self.force_bypass:
+            yield await self.ask(message, history)
+            return
+
+        prompt = build_prompt(message, history)
+        cached, key, vector = await self._cache_lookup(prompt)
+        if cached is not None:
+            yield cached
+            return
+
+        started = time.monotonic()
+        try:
+            result = await self.rag.aquery(prompt, param=QueryParam(mode="hybrid", stream=True))
+        except Exception as exc:
+            logger.warning("Hybrid stream failed, falling back to bypass mode: %s", exc)
+            result = await self.rag.aquery(
+                prompt,
+                param=QueryParam(mode="bypass", only_need_prompt=True),
+            )
+
+        if result is None:
+            return
+        if isinstance(result, str):
+            self._cache_store(key, vector, result, time.monotonic() - started)
+            yield result
+            return
+        parts: list[str] = []
+        async for chunk in result:
+            if chunk:
+                parts.append(chunk)
+                yield chunk
+        self._cache_store(key, vector, "".join(parts), time.monotonic() - started)
+
+    async def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "answer_cache": self.answer_cache.stats() if self.answer_cache is not None else None,
+            "embeddings": self.embedder.stats() if self.embedder else None,
+            "ingest_queue": await self.ingest_queue.stats(),
+            "vector_storage": [
+                vdb.stats()
+                for vdb in (
+                    getattr(self.rag, "chunks_vdb", None),
+                    getattr(self.rag, "entities_vdb", None),
+                    getattr(self.rag, "relationships_vdb", None),
+                )
+                if hasattr(vdb, "stats")
+            ],
+        }
+
 
 rag_service = RagService()
 
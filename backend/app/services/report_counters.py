@@ -0,0 +1,224 @@
+"""Counters behind ``GET /admin/reports/summary``.
+
+The counts come from one UNION ALL of GROUP BY queries. With
+``REPORT_COUNTERS_ENABLED`` they are also materialized in ``report_counters``
+so the dashboard reads a handful of rows instead of scanning five tables. An
+``after_flush`` hook collects deltas on the session and ``after_commit`` applies
+them in a separate short transaction, so writers never hold a counter row lock
+(one per status) until they commit. A crash between the two commits, writes that
+bypass the ORM (bulk ``update()``/``delete()``, ``ON DELETE CASCADE``) and
+rolled-back savepoints drift the counters; ``rebuild`` recomputes everything and
+runs at startup and on ``?refresh=true``.
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import delete, event, func, insert, inspect, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.db import db_session
+from app.models.appointment import Appointment
+from app.models.doctor import DoctorProfile
+from app.models.doctor_schedule import DoctorSchedule
+from app.models.report_counter import ReportCounter
+from app.models.time_slot import TimeSlot
+from app.models.user import User
+
+REPORT_COUNTERS_ENABLED = os.getenv("REPORT_COUNTERS_ENABLED", "1") == "1"
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "5"))
+
+logger = logging.getLogger("backend.report_counters")
+
+# metric -> (model, grouping attribute or None for a plain total)
+TRACKED = {
+    "users_by_role": (User, "role"),
+    "doctor_status": (DoctorProfile, "status"),
+    "appointments": (Appointment, "status"),
+    "slots_total": (TimeSlot, None),
+    "schedules_total": (DoctorSchedule, None),
+}
+_BY_MODEL = {model: (metric, attr) for metric, (model, attr) in TRACKED.items()}
+
+# keys the dashboard always expects, reported as 0 when absent
+_KEYS = {
+    "users_by_role": ("admin", "doctor", "user"),
+    "doctor_status": ("approved", "pending", "rejected"),
+    "appointments": ("pending", "confirmed", "completed", "cancelled", "no-show"),
+}
+
+
+def aggregate_counts(db) -> dict[tuple[str, str], int]:
+    """Every tracked count in a single round trip."""
+    parts = []
+    for metric, (model, attr) in TRACKED.items():
+        if attr is None:
+            parts.append(select(literal(metric), literal(""), func.count()).select_from(model))
+        else:
+            column = getattr(model, attr)
+            parts.append(select(literal(metric), func.coalesce(column, ""), func.count()).group_by(column))
+    return {(metric, key): count for metric, key, count in db.execute(union_all(*parts)).all()}
+
+
+def _stored_counts(db) -> dict[tuple[str, str], int]:
+    return {(r.metric, r.key): r.value for r in db.query(ReportCounter)}
+
+
+def build_summary(counts: dict[tuple[str, str], int]) -> dict:
+    def group(metric):
+        values = {key: counts.get((metric, key), 0) for key in _KEYS[metric]}
+        return {key.replace("-", "_"): n for key, n in values.items()}
+
+    return {
+        "users_total": sum(n for (metric, _), n in counts.items() if metric == "users_by_role"),
+        "users_by_role": group("users_by_role"),
+        "doctor_status": group("doctor_status"),
+        "appointments": group("appointments"),
+        "slots_total": counts.get(("slots_total", ""), 0),
+        "schedules_total": counts.get(("schedules_total", ""), 0),
+    }
+
+
+def rebuild(db):
+    """Replace the materialized counters with freshly aggregated ones."""
+    counts = aggregate_counts(db)
+    for metric, keys in _KEYS.items():
+        for key in keys:
+            counts.setdefault((metric, key), 0)
+    db.execute(delete(ReportCounter))
+    db.execute(insert(ReportCounter), [{"metric": m, "key": k, "value": n} for (m, k), n in counts.items()])
+    db.commit()
+    summary_cache.clear()
+    return counts
+
+
+def _deltas(session) -> dict[tuple[str, str], int]:
+    deltas = Counter()
+    for obj in session.new:
+        tracked = _BY_MODEL.get(type(obj))
+        if tracked:
+            metric, attr = tracked
+            deltas[(metric, (getattr(obj, attr) or "") if attr else "")] += 1
+    for obj in session.deleted:
+        tracked = _BY_MODEL.get(type(obj))
+        if tracked:
+            metric, attr = tracked
+            deltas[(metric, (getattr(obj, attr) or "") if attr else "")] -= 1
+    for obj in session.dirty:
+        tracked = _BY_MODEL.get(type(obj))
+        if not tracked or not tracked[1]:
+            continue
+        metric, attr = tracked
+        history = inspect(obj).attrs[attr].history
+        if not history.has_changes():
+            continue
+        for old in history.deleted:
+            deltas[(metric, old or "")] -= 1
+        for new in history.added:
+            deltas[(metric, new or "")] += 1
+    return {k: v for k, v in deltas.items() if v}
+
+
+_PENDING = "report_counter_deltas"
+
+
+def _pending(session) -> Counter:
+    return session.info.setdefault(_PENDING, Counter())
+
+
+def _collect_deltas(session, _flush_context):
+    deltas = _deltas(session)
+    if deltas:
+        _pending(session).update(deltas)
+
+
+def _apply_deltas(session):
+    deltas = {k: v for k, v in session.info.pop(_PENDING, {}).items() if v}
+    if not deltas:
+        return
+    try:
+        # a fresh connection from the session's engine; inside AsyncSession.commit this stays non-blocking
+        with session.get_bind().begin() as conn:
+            _bump(conn, deltas)
+    except Exception as exc:
+        logger.warning("Report counter update failed, counters drift until the next rebuild: %s", exc)
+
+
+def _drop_deltas(session):
+    session.info.pop(_PENDING, None)
+
+
+def add(db, deltas: dict[tuple[str, str], int]):
+    """Count rows written with Core ``insert()``/``delete()``, which the flush hook cannot see."""
+    if REPORT_COUNTERS_ENABLED:
+        _pending(db).update(deltas)
+
+
+def _bump(conn, deltas: dict[tuple[str, str], int]):
+    for (metric, key), delta in deltas.items():
+        updated = conn.execute(
+            update(ReportCounter)
+            .where(ReportCounter.metric == metric, ReportCounter.key == key)
+            .values(value=ReportCounter.value + delta)
+        ).rowcount
+        if not updated:
+            conn.execute(insert(ReportCounter).values(metric=metric, key=key, value=delta))
+
+
+class SummaryCache:
+    """Tiny TTL cache so dashboard polling between writes costs nothing."""
+
+    def __init__(self, ttl: float = REPORT_CACHE_TTL):
+        self.ttl = ttl
+        self._value = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, compute):
+        now = time.monotonic()
+        with self._lock:
+            if self._value is not None and now < self._expires:
+                self.hits += 1
+                return self._value
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._value, self._expires = value, time.monotonic() + self.ttl
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._value = None
+
+
+summary_cache = SummaryCache()
+
+
+def reports_summary(db, refresh: bool = False) -> dict:
+    if refresh:
+        if REPORT_COUNTERS_ENABLED:
+            rebuild(db)
+        summary_cache.clear()
+    if REPORT_COUNTERS_ENABLED:
+        return summary_cache.get_or_compute(lambda: build_summary(_stored_counts(db)))
+    return summary_cache.get_or_compute(lambda: build_summary(aggregate_counts(db)))
+
+
+def install():
+    """Start maintaining counters on every ORM flush and seed them from the tables."""
+    if not REPORT_COUNTERS_ENABLED:
+        return
+    for name, listener in (
+        ("after_flush", _collect_deltas),
+        ("after_commit", _apply_deltas),
+        ("after_rollback", _drop_deltas),
+    ):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
+    with db_session() as db:
+        rebuild(db)
+    logger.info("Report counters rebuilt")
@@ -0,0 +1,132 @@
+"""Recurring slot generation and batch schedule assignment.
+
+Slot candidates are checked against ``slot_index`` and each other, schedule
+candidates against an ``IntervalTree`` of the doctor's scheduled slots; then
+everything is inserted with one executemany per table in the caller's transaction. Core
+inserts skip the ORM flush hooks, so report counters are bumped explicitly.
+"""
+import os
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import insert, select
+
+from app.models.doctor_schedule import DoctorSchedule
+from app.models.time_slot import TimeSlot
+from app.models.user import User
+from app.services import report_counters
+from app.services.slot_index import slot_index
+from app.utils.intervals import IntervalTree
+
+BULK_SLOTS_MAX = int(os.getenv("BULK_SLOTS_MAX", "20000"))
+BULK_SCHEDULES_MAX = int(os.getenv("BULK_SCHEDULES_MAX", "200000"))
+
+
+def expand(start_date: date, end_date: date, weekdays: list[int], day_start: time, day_end: time,
+           every_minutes: int, duration: int | None = None) -> list[tuple[datetime, datetime]]:
+    """Slot intervals for each selected weekday (Monday=0) in ``[start_date, end_date]``,
+    every ``every_minutes`` from ``day_start``, each ending no later than ``day_end``."""
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+    if day_end <= day_start:
+        raise ValueError("day_end must be after day_start")
+    step = timedelta(minutes=every_minutes)
+    length = timedelta(minutes=duration or every_minutes)
+    days = set(weekdays)
+    intervals = []
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in days:
+            at, stop = datetime.combine(day, day_start), datetime.combine(day, day_end)
+            while at + length <= stop:
+                intervals.append((at, at + length))
+                if len(intervals) > BULK_SLOTS_MAX:
+                    raise ValueError(f"Recurrence yields more than {BULK_SLOTS_MAX} slots")
+                at += step
+        day += timedelta(days=1)
+    return intervals
+
+
+def missing_doctors(db, doctor_ids: list[str]) -> list[str]:
+    found = set(db.scalars(select(User.id).where(User.id.in_(doctor_ids), User.role == "doctor")))
+    return [doctor_id for doctor_id in doctor_ids if doctor_id not in found]
+
+
+def conflict_detail(message: str, conflicts: list[tuple], limit: int = 20) -> dict:
+    return {"message": message, "conflicts": len(conflicts), "examples": [[str(v) for v in c] for c in conflicts[:limit]]}
+
+
+def plan_slots(intervals: list[tuple[datetime, datetime]]):
+    """Split candidates into (free, conflicts); a conflict is ``(start, end, clashing slot id)``.
+    Candidates that overlap an earlier candidate count as conflicts too. Call with
+    ``slot_index.guard`` held until the accepted slots are committed and indexed."""
+    tree = IntervalTree()
+    free, conflicts = [], []
+    for start, end in intervals:
+        hit = slot_index.first_conflict(start, end) or tree.first_overlap(start, end)
+        if hit:
+            conflicts.append((start, end, hit[2]))
+        else:
+            tree.add(start, end, "new slot")
+            free.append((start, end))
+    return free, conflicts
+
+
+def insert_slots(db, intervals, slot_type: str, created_by: str | None) -> list[dict]:
+    now = datetime.utcnow()
+    rows = [
+        {"id": str(uuid.uuid4()), "start_time": start, "end_time": end,
+         "duration": int((end - start).total_seconds() // 60), "slot_type": slot_type,
+         "created_by": created_by, "is_active": True, "created_at": now}
+        for start, end in intervals
+    ]
+    if rows:
+        db.execute(insert(TimeSlot), rows)
+        report_counters.add(db, {("slots_total", ""): len(rows)})
+    return rows
+
+
+def plan_schedules(db, doctor_ids: list[str], slots: list[tuple[datetime, datetime, str]]):
+    """Per doctor, the slots to attach. Returns (pairs, already scheduled count, conflicts);
+    a conflict is ``(doctor_id, slot_id, clashing slot id)``."""
+    if not slots or not doctor_ids:
+        return [], 0, []
+    start, end = min(s[0] for s in slots), max(s[1] for s in slots)
+    existing: dict[str, IntervalTree] = {doctor_id: IntervalTree() for doctor_id in doctor_ids}
+    for doctor_id, slot_start, slot_end, slot_id in db.execute(
+        select(DoctorSchedule.doctor_id, TimeSlot.start_time, TimeSlot.end_time, TimeSlot.id)
+        .join(TimeSlot, DoctorSchedule.slot_id == TimeSlot.id)
+        .where(
+            DoctorSchedule.doctor_id.in_(doctor_ids),
+            TimeSlot.is_active == True,
+            TimeSlot.start_time < end,
+            TimeSlot.end_time > start,
+        )
+    ):
+        existing[doctor_id].add(slot_start, slot_end, slot_id)
+    pairs, already, conflicts = [], 0, []
+    for doctor_id in doctor_ids:
+        tree = existing[doctor_id]
+        for slot_start, slot_end, slot_id in sorted(slots):
+            hits = tree.overlapping(slot_start, slot_end)
+            if not hits:
+                tree.add(slot_start, slot_end, slot_id)
+                pairs.append((doctor_id, slot_id))
+            elif any(hit[2] == slot_id for hit in hits):
+                already += 1
+            else:
+                conflicts.append((doctor_id, slot_id, hits[0][2]))
+    if len(pairs) > BULK_SCHEDULES_MAX:
+        raise ValueError(f"Request would create more than {BULK_SCHEDULES_MAX} schedules")
+    return pairs, already, conflicts
+
+
+def insert_schedules(db, pairs: list[tuple[str, str]], status: str) -> int:
+    now = datetime.utcnow()
+    if pairs:
+        db.execute(insert(DoctorSchedule), [
+            {"id": str(uuid.uuid4()), "doctor_id": doctor_id, "slot_id": slot_id, "status": status, "created_at": now}
+            for doctor_id, slot_id in pairs
+        ])
+        report_counters.add(db, {("schedules_total", ""): len(pairs)})
+    return len(pairs)
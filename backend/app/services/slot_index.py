@@ -0,0 +1,109 @@
+"""In-memory interval index of active time slots.
+
+Built from the table at startup and patched by the slot write paths, so overlap
+checks and free-window queries never scan ``time_slots``. Writers hold
+``slot_index.guard`` from the overlap check until the index is updated, which
+serializes slot writes within a process. Each worker keeps its own index;
+``SlotIndexRefresher`` rebuilds it every ``SLOT_INDEX_REFRESH_SECONDS`` to pick
+up slots written by other workers.
+"""
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.db import db_session
+from app.models.time_slot import TimeSlot
+from app.utils.intervals import IntervalTree
+
+SLOT_INDEX_REFRESH_SECONDS = float(os.getenv("SLOT_INDEX_REFRESH_SECONDS", "300"))
+
+logger = logging.getLogger("backend.slot_index")
+
+
+class SlotIndex:
+    def __init__(self):
+        self._tree = IntervalTree()
+        self._spans: dict[str, tuple[datetime, datetime]] = {}
+        self.guard = threading.RLock()
+        self.loaded_at: datetime | None = None
+
+    def rebuild(self, db=None) -> int:
+        with self.guard:
+            if db is None:
+                with db_session() as session:
+                    return self.rebuild(session)
+            rows = db.execute(
+                select(TimeSlot.start_time, TimeSlot.end_time, TimeSlot.id)
+                .where(TimeSlot.is_active == True)
+                .order_by(TimeSlot.start_time, TimeSlot.end_time, TimeSlot.id)
+            ).all()
+            items = [tuple(row) for row in rows]
+            self._tree = IntervalTree.from_sorted(items)
+            self._spans = {slot_id: (start, end) for start, end, slot_id in items}
+            self.loaded_at = datetime.utcnow()
+            return len(items)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def add(self, slot_id: str, start: datetime, end: datetime):
+        with self.guard:
+            self.discard(slot_id)
+            self._tree.add(start, end, slot_id)
+            self._spans[slot_id] = (start, end)
+
+    def discard(self, slot_id: str):
+        with self.guard:
+            span = self._spans.pop(slot_id, None)
+            if span:
+                self._tree.remove(span[0], span[1], slot_id)
+
+    def sync(self, slot: TimeSlot):
+        """Mirror a committed slot row: indexed while active, dropped otherwise."""
+        if slot.is_active:
+            self.add(slot.id, slot.start_time, slot.end_time)
+        else:
+            self.discard(slot.id)
+
+    def conflicts(self, start: datetime, end: datetime, ignore: str | None = None) -> list[tuple]:
+        """Active slots overlapping ``[start, end)`` as ``(start, end, slot_id)``."""
+        with self.guard:
+            return [hit for hit in self._tree.overlapping(start, end) if hit[2] != ignore]
+
+    def first_conflict(self, start: datetime, end: datetime) -> tuple | None:
+        with self.guard:
+            return self._tree.first_overlap(start, end)
+
+    def free_windows(self, start: datetime, end: datetime, min_length=None) -> list[tuple[datetime, datetime]]:
+        with self.guard:
+            windows = self._tree.gaps(start, end)
+        if min_length:
+            windows = [(s, e) for s, e in windows if e - s >= min_length]
+        return windows
+
+
+slot_index = SlotIndex()
+
+
+class SlotIndexRefresher:
+    def __init__(self, interval: float = SLOT_INDEX_REFRESH_SECONDS):
+        self.interval = interval
+        self.last_error: str | None = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                count = await asyncio.to_thread(slot_index.rebuild)
+                self.last_error = None
+                logger.debug("Slot index rebuilt with %d slots", count)
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.error("Slot index rebuild failed: %s", exc)
+
+
+refresher = SlotIndexRefresher()
@@ -0,0 +1,159 @@
+"""Interval tree over half-open ``[start, end)`` intervals.
+
+A treap ordered by ``(start, end, key)`` where each node also stores the
+largest ``end`` in its subtree, so overlap queries skip whole subtrees that end
+before the query starts. Inserts, removals and "does anything overlap" checks
+are O(log n) expected; listing overlaps costs O(log n + matches).
+"""
+import random
+
+
+class _Node:
+    __slots__ = ("item", "priority", "max_end", "left", "right")
+
+    def __init__(self, item: tuple):
+        self.item = item
+        self.priority = random.random()
+        self.max_end = item[1]
+        self.left = None
+        self.right = None
+
+
+def _update(node: _Node) -> _Node:
+    node.max_end = node.item[1]
+    if node.left is not None and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right is not None and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+    return node
+
+
+def _split(node: _Node | None, item: tuple, inclusive: bool):
+    """(items < item, items >= item), or (<=, >) when ``inclusive``."""
+    if node is None:
+        return None, None
+    goes_left = node.item <= item if inclusive else node.item < item
+    if goes_left:
+        left, right = _split(node.right, item, inclusive)
+        node.right = left
+        return _update(node), right
+    left, right = _split(node.left, item, inclusive)
+    node.left = right
+    return left, _update(node)
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _update(left)
+    right.left = _merge(left, right.left)
+    return _update(right)
+
+
+def _build(items: list[tuple], lo: int, hi: int, depth: int) -> _Node | None:
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    node = _Node(items[mid])
+    # heap order by depth; later inserts (priority < 1) settle below the built nodes
+    node.priority = 1000.0 - depth + random.random() * 0.5
+    node.left = _build(items, lo, mid, depth + 1)
+    node.right = _build(items, mid + 1, hi, depth + 1)
+    return _update(node)
+
+
+class IntervalTree:
+    def __init__(self, intervals=()):
+        self._root = None
+        self._size = 0
+        for start, end, key in intervals:
+            self.add(start, end, key)
+
+    @classmethod
+    def from_sorted(cls, intervals: list[tuple]) -> "IntervalTree":
+        """Balanced tree in O(n) from ``(start, end, key)`` tuples already in sorted order."""
+        tree = cls()
+        tree._root = _build(intervals, 0, len(intervals), 0)
+        tree._size = len(intervals)
+        return tree
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.item
+            node = node.right
+
+    def add(self, start, end, key=None):
+        item = (start, end, key)
+        left, right = _split(self._root, item, False)
+        self._root = _merge(_merge(left, _Node(item)), right)
+        self._size += 1
+
+    def remove(self, start, end, key=None) -> bool:
+        item = (start, end, key)
+        left, rest = _split(self._root, item, False)
+        match, right = _split(rest, item, True)
+        found = match is not None
+        if found:
+            # drop one copy, keep any duplicates
+            match = _merge(match.left, match.right)
+            self._size -= 1
+        self._root = _merge(_merge(left, match), right)
+        return found
+
+    def overlapping(self, start, end) -> list[tuple]:
+        """Every interval with ``s < end and e > start``, ordered by start."""
+        found = []
+        stack = [(self._root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            if visited:
+                if node.item[1] > start:
+                    found.append(node.item)
+                continue
+            # in order: left subtree, the node, then right (only if it can still start before ``end``)
+            if node.item[0] < end:
+                stack.append((node.right, False))
+                stack.append((node, True))
+            stack.append((node.left, False))
+        return found
+
+    def first_overlap(self, start, end) -> tuple | None:
+        node = self._root
+        while node is not None:
+            if node.left is not None and node.left.max_end > start:
+                node = node.left
+            elif node.item[0] < end and node.item[1] > start:
+                return node.item
+            elif node.item[0] < end:
+                node = node.right
+            else:
+                return None
+            if node is not None and node.max_end <= start:
+                return None
+        return None
+
+    def gaps(self, start, end) -> list[tuple]:
+        """Stretches of ``[start, end)`` not covered by any interval, as ``(start, end)`` pairs."""
+        free, cursor = [], start
+        for s, e, _ in self.overlapping(start, end):
+            if s > cursor:
+                free.append((cursor, s))
+            if e > cursor:
+                cursor = e
+        if cursor < end:
+            free.append((cursor, end))
+        return free
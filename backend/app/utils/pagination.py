@@ -0,0 +1,128 @@
+import base64
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Literal
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Date, DateTime, and_, func, or_, select
+
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "500"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, size: int) -> list:
+    try:
+        padding = "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(token + padding))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def parse_datetime(value: str | None) -> datetime | None:
+    """ISO 8601 as naive UTC, matching the stored columns; offsets such as JS's ``Z`` are converted."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid datetime format, use ISO")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def keyset_after(columns: list, values: list, descending: bool):
+    """Rows strictly after ``values`` in (columns...) order, spelled out as
+    ``c1 < v1 OR (c1 = v1 AND c2 < v2) ...`` so every backend can use the index."""
+    clauses = []
+    for i, column in enumerate(columns):
+        bound = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[columns[j] == values[j] for j in range(i)], bound))
+    return or_(*clauses)
+
+
+@dataclass
+class PageParams:
+    limit: int
+    cursor: str | None
+    sort: str | None
+    order: str | None
+    include_total: bool
+
+
+def page_params(
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: str | None = None,
+    order: Literal["asc", "desc"] | None = None,
+    include_total: bool = False,
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, sort=sort, order=order, include_total=include_total)
+
+
+def apply_filters(query, filters: dict):
+    """``filters`` maps column -> value; ``None`` values are skipped."""
+    for column, value in filters.items():
+        if value is not None:
+            query = query.filter(column == value)
+    return query
+
+
+def _cursor_value(column, value):
+    if value is None:
+        return None
+    try:
+        if isinstance(column.type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column.type, Date):
+            return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def paginate(query, response: Response, params: PageParams, sort_keys: dict, id_column, default_sort: str, default_order: str = "asc") -> list:
+    """One page of ``query`` ordered by (sort key, id).
+
+    The next page's cursor goes in ``X-Next-Cursor``; it records the sort it was
+    issued for, so it cannot be replayed against a different ordering. With
+    ``include_total`` the filtered row count is returned in ``X-Total-Count``.
+    """
+    sort = params.sort or default_sort
+    if sort not in sort_keys:
+        raise HTTPException(status_code=400, detail=f"Invalid sort, expected one of {sorted(sort_keys)}")
+    order = params.order or default_order
+    descending = order == "desc"
+    column = sort_keys[sort]
+
+    if params.include_total:
+        # counted before ordering/limits; wrapped in a subquery because with_entities(count())
+        # on an unfiltered query loses its FROM clause and always returns 1
+        total = query.session.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+    if params.cursor:
+        cursor_sort, value, last_id = decode_cursor(params.cursor, 3)
+        if cursor_sort != f"{sort}:{order}":
+            raise HTTPException(status_code=400, detail="Cursor does not match sort")
+        query = query.filter(keyset_after([column, id_column], [_cursor_value(column, value), last_id], descending))
+    ordering = [column.desc(), id_column.desc()] if descending else [column.asc(), id_column.asc()]
+    rows = query.order_by(*ordering).limit(params.limit + 1).all()
+    if len(rows) > params.limit:
+        last = rows[params.limit - 1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [f"{sort}:{order}", getattr(last, column.key), getattr(last, id_column.key)]
+        )
+    return rows[: params.limit]
@@ -3,16 +3,53 @@ import os
 import binascii
 import hmac
 
+# parameters for new hashes; stored hashes record their own, see needs_rehash
+PASSWORD_HASH_DIGEST = os.getenv("PASSWORD_HASH_DIGEST", "sha256")
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "100000"))
+
+# hashes written before parameters were stored: "<salt hex>:<hash hex>"
+LEGACY_DIGEST = "sha256"
+LEGACY_ITERATIONS = 100_000
+
 
 def hash_password(password: str, salt: bytes | None = None) -> str:
+    """``pbkdf2_<digest>$<iterations>$<salt hex>$<hash hex>`` with the configured parameters."""
     salt = salt or os.urandom(16)
-    hashed = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, 100_000)
-    return f"{binascii.hexlify(salt).decode()}:{binascii.hexlify(hashed).decode()}"
+    hashed = hashlib.pbkdf2_hmac(PASSWORD_HASH_DIGEST, password.encode(), salt, PASSWORD_HASH_ITERATIONS)
+    return (
+        f"pbkdf2_{PASSWORD_HASH_DIGEST}${PASSWORD_HASH_ITERATIONS}$"
+        f"{binascii.hexlify(salt).decode()}${binascii.hexlify(hashed).decode()}"
+    )
+
+
+def _parse(stored: str) -> tuple[str, int, bytes, bytes] | None:
+    try:
+        if "$" in stored:
+            scheme, iterations, salt_hex, hash_hex = stored.split("$")
+            if not scheme.startswith("pbkdf2_"):
+                return None
+            digest, rounds = scheme[len("pbkdf2_"):], int(iterations)
+        else:
+            salt_hex, hash_hex = stored.split(":")
+            digest, rounds = LEGACY_DIGEST, LEGACY_ITERATIONS
+        return digest, rounds, binascii.unhexlify(salt_hex.encode()), binascii.unhexlify(hash_hex.encode())
+    except (ValueError, binascii.Error):
+        return None
 
 
 def verify_password(password: str, stored: str) -> bool:
-    salt_hex, hash_hex = stored.split(":")
-    salt = binascii.unhexlify(salt_hex.encode())
-    expected = binascii.unhexlify(hash_hex.encode())
-    test = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, 100_000)
+    parsed = _parse(stored or "")
+    if parsed is None:
+        return False
+    digest, rounds, salt, expected = parsed
+    try:
+        test = hashlib.pbkdf2_hmac(digest, password.encode(), salt, rounds)
+    except ValueError:  # digest this build does not know
+        return False
     return hmac.compare_digest(expected, test)
+
+
+def needs_rehash(stored: str) -> bool:
+    """True for legacy hashes and ones not made with the current digest and iteration count."""
+    parsed = _parse(stored or "")
+    return parsed is None or "$" not in stored or parsed[:2] != (PASSWORD_HASH_DIGEST, PASSWORD_HASH_ITERATIONS)
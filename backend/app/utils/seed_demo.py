@@ -1,7 +1,8 @@
 import os
 from app.db import SessionLocal
 from app.models.user import User
-from app.utils.password import hash_password
+from app.services.password_hasher import hasher
+from app.utils.password import hash_password, needs_rehash, verify_password
 
 
 def seed_demo_users():
@@ -40,14 +41,26 @@ def seed_demo_users():
 
     db = SessionLocal()
     try:
+        existing = {u.email: u for u in db.query(User).filter(User.email.in_([u["email"] for u in users]))}
+        # only rehash demo passwords that changed or use old parameters, all on the hashing pool at once
+        checks = {
+            u["email"]: hasher.submit(verify_password, u["password"], existing[u["email"]].password_hash)
+            for u in users
+            if reset_passwords and u["email"] in existing and not needs_rehash(existing[u["email"]].password_hash)
+        }
+        stale = {
+            u["email"] for u in users
+            if u["email"] not in existing or (reset_passwords and not (u["email"] in checks and checks[u["email"]].result()))
+        }
+        hashes = {u["email"]: hasher.submit(hash_password, u["password"]) for u in users if u["email"] in stale}
         for u in users:
-            existing = db.query(User).filter(User.email == u["email"]).first()
-            if existing:
-                if reset_passwords:
-                    existing.password_hash = hash_password(u["password"])
-                existing.full_name = u["full_name"]
-                existing.role = u["role"]
-                existing.status = u["status"]
+            user = existing.get(u["email"])
+            if user:
+                if u["email"] in hashes:
+                    user.password_hash = hashes[u["email"]].result()
+                user.full_name = u["full_name"]
+                user.role = u["role"]
+                user.status = u["status"]
             else:
                 db.add(
                     User(
@@ -55,7 +68,7 @@ def seed_demo_users():
                         full_name=u["full_name"],
                         role=u["role"],
                         status=u["status"],
-                        password_hash=hash_password(u["password"]),
+                        password_hash=hashes[u["email"]].result(),
                     )
                 )
         db.commit()
@@ -0,0 +1,39 @@
+"""Fast path for list responses.
+
+Routes return ORM objects or column-projected rows and let ``response_model``
+(``ORMModel`` with ``from_attributes``) validate them once, instead of building
+``XOut(**row.__dict__)`` per row and having FastAPI validate the result again.
+
+Newer FastAPI releases serialize ``response_model`` output straight to JSON
+bytes with pydantic-core, but only while the app keeps its default response
+class; older ones go through ``jsonable_encoder`` + ``json.dumps``, where
+orjson is the faster encoder.
+"""
+import inspect
+
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+
+try:
+    import orjson  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+NATIVE_JSON = "dump_json" in inspect.signature(serialize_response).parameters
+
+# pass as FastAPI(default_response_class=...); Default() keeps the native fast path enabled
+DefaultResponse = ORJSONResponse if orjson is not None and not NATIVE_JSON else Default(JSONResponse)
+
+
+def columns_for(model, schema, *extra) -> list:
+    """The model's mapped columns that ``schema`` exposes (plus ``extra``, e.g. sort
+    keys), for projections that skip ORM identity-map bookkeeping."""
+    table_columns = model.__table__.columns
+    columns = [getattr(model, name) for name in schema.model_fields if name in table_columns]
+    return columns + [c for c in extra if c.key not in {col.key for col in columns}]
+
+
+def row_dict(obj) -> dict:
+    """Column values of an ORM object, without SQLAlchemy's ``_sa_instance_state``."""
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
@@ -0,0 +1,155 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+
+INGEST_WATCH_MODE = os.getenv("INGEST_WATCH_MODE", "auto")
+
+logger = logging.getLogger("backend.fs_watcher")
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+    | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Recursive inotify watch driven by the event loop; no thread, no polling.
+
+    ``callback(path)`` gets the changed file path, or ``None`` when a directory
+    appeared/vanished or the kernel queue overflowed and a full rescan is needed.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = -1
+        self._wds: dict[int, str] = {}
+        self._loop = None
+        self._callback = None
+
+    def start(self, loop, callback):
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        self._loop = loop
+        self._callback = callback
+        self._add_tree(self.root)
+        loop.add_reader(fd, self._read)
+
+    def close(self):
+        if self._fd >= 0:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = -1
+            self._wds.clear()
+
+    def _add_tree(self, top: str):
+        for dirpath, _, _ in os.walk(top):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _WATCH_MASK)
+            if wd < 0:
+                logger.warning("Cannot watch %s: %s", dirpath, os.strerror(ctypes.get_errno()))
+                continue
+            self._wds[wd] = dirpath
+
+    def _read(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].split(b"\0", 1)[0]
+            offset += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                self._callback(None)
+                continue
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+            base = self._wds.get(wd)
+            if base is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                continue
+            path = os.path.join(base, os.fsdecode(name)) if name else base
+            if mask & IN_ISDIR:
+                # files written before the new watch existed are picked up by the rescan
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path)
+                self._callback(None)
+                continue
+            self._callback(path)
+
+
+class WatchdogWatcher:
+    """Same contract as InotifyWatcher on top of the optional ``watchdog`` package."""
+
+    def __init__(self, root: str):
+        from watchdog.observers import Observer
+
+        self.root = root
+        self._observer = Observer()
+
+    def start(self, loop, callback):
+        from watchdog.events import FileSystemEventHandler
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    # directory "modified" fires for every file change inside it
+                    if event.event_type != "modified":
+                        loop.call_soon_threadsafe(callback, None)
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    if path:
+                        loop.call_soon_threadsafe(callback, os.fsdecode(path))
+
+        self._observer.schedule(Handler(), self.root, recursive=True)
+        self._observer.start()
+
+    def close(self):
+        self._observer.stop()
+        self._observer.join()
+
+
+def create_watcher(root: str, mode: str = INGEST_WATCH_MODE):
+    """Return a watcher for ``root``, or None when the caller should poll."""
+    if mode == "poll":
+        return None
+    if mode in ("auto", "inotify") and sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(root)
+            if hasattr(watcher._libc, "inotify_init1"):
+                return watcher
+        except OSError as exc:
+            logger.warning("inotify unavailable: %s", exc)
+    if mode in ("auto", "watchdog"):
+        try:
+            return WatchdogWatcher(root)
+        except ImportError:
+            if mode == "watchdog":
+                logger.warning("INGEST_WATCH_MODE=watchdog but watchdog is not installed")
+    if mode != "auto":
+        logger.warning("Watch mode %s unavailable, falling back to polling", mode)
+    return None
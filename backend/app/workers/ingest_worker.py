@@ -1,33 +1,276 @@
 import asyncio
+import hashlib
+import json
+import logging
 import os
+import re
+import zlib
+
+from app.workers.fs_watcher import INGEST_WATCH_MODE, create_watcher
+
+INGEST_CHUNK_MIN_CHARS = int(os.getenv("INGEST_CHUNK_MIN_CHARS", "1500"))
+INGEST_CHUNK_MAX_CHARS = int(os.getenv("INGEST_CHUNK_MAX_CHARS", "6000"))
+INGEST_CHUNK_BOUNDARY = int(os.getenv("INGEST_CHUNK_BOUNDARY", "8"))
+INGEST_DEBOUNCE_MS = int(os.getenv("INGEST_DEBOUNCE_MS", "300"))
+INGEST_SOURCE_DIR = os.getenv("INGEST_SOURCE_DIR", "")
+INGEST_STATE_PATH = os.getenv(
+    "INGEST_STATE_PATH", os.path.join(os.getenv("RAG_WORKDIR", "./rag_storage"), "ingest_state.json")
+)
+
+logger = logging.getLogger("backend.ingest_worker")
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def _units(text: str, max_chars: int) -> list[str]:
+    units: list[str] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            units.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            line = line.strip()
+            for start in range(0, len(line), max_chars):
+                units.append(line[start:start + max_chars])
+    return units
+
+
+def split_chunks(
+    text: str,
+    min_chars: int = INGEST_CHUNK_MIN_CHARS,
+    max_chars: int = INGEST_CHUNK_MAX_CHARS,
+    boundary: int = INGEST_CHUNK_BOUNDARY,
+) -> list[str]:
+    """Content-defined chunking: a chunk ends after a paragraph whose checksum hits
+    the boundary, so an edit only changes the chunks around it instead of shifting
+    every boundary after it."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for unit in _units(text, max_chars):
+        if current and size + len(unit) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(unit)
+        size += len(unit)
+        if size >= min_chars and zlib.crc32(unit.encode("utf-8")) % boundary == 0:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def chunk_id(source: str, chunk: str) -> str:
+    return "src-" + hashlib.sha256(f"{source}\n{chunk}".encode("utf-8")).hexdigest()[:32]
+
+
+class IngestState:
+    """Per-file mtime/size and chunk ids, saved as JSON so restarts only diff."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: dict[str, dict] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.files = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            logger.warning("Ingest state %s is unreadable, starting fresh", path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.files, f)
+        os.replace(tmp_path, self.path)
+
+
+async def _rag_ingest(texts: list[str], ids: list[str], file_paths: list[str]):
+    from app.services.ingest_queue import PRIORITY_BULK
+    from app.services.rag_service import rag_service
+
+    job_id = await rag_service.enqueue_ingest(texts, ids=ids, file_paths=file_paths, priority=PRIORITY_BULK)
+    job = await rag_service.ingest_queue.wait(job_id)
+    if job["status"] != "done":
+        raise RuntimeError(f"RAG insert failed: {job['last_error']}")
+
+
+async def _rag_delete(ids: list[str]):
+    from app.services.ingest_queue import PRIORITY_BULK
+    from app.services.rag_service import rag_service
+
+    job_id = await rag_service.enqueue_delete(ids, priority=PRIORITY_BULK)
+    job = await rag_service.ingest_queue.wait(job_id)
+    if job["status"] != "done":
+        raise RuntimeError(f"RAG delete failed: {job['last_error']}")
 
 
 class IngestWorker:
-    def __init__(self, source_dir: str, interval: int = 8):
+    def __init__(
+        self,
+        source_dir: str,
+        interval: int = 8,
+        state_path: str | None = None,
+        ingest=None,
+        delete=None,
+        watch_mode: str = INGEST_WATCH_MODE,
+        debounce: float = INGEST_DEBOUNCE_MS / 1000,
+    ):
         self.source_dir = source_dir
         self.interval = interval
-        self.file_state: dict[str, float] = {}
+        self.watch_mode = watch_mode
+        self.debounce = debounce
+        self.state = IngestState(state_path or INGEST_STATE_PATH)
+        self.ingest = ingest or _rag_ingest
+        self.delete = delete or _rag_delete
+        self.chunks_added = 0
+        self.chunks_removed = 0
+        self._dirty: set[str] = set()
+        self._retry: set[str] = set()  # failed paths, moved into _dirty every interval
+        self._retry_timer: asyncio.TimerHandle | None = None
+        self._rescan = False
+        self._wake = asyncio.Event()
 
-    async def run(self):
-        while True:
-            if not os.path.isdir(self.source_dir):
-                await asyncio.sleep(self.interval)
-                continue
+    def _source(self, path: str) -> str:
+        return os.path.relpath(path, self.source_dir)
+
+    async def sync_file(self, path: str, stat: os.stat_result | None):
+        source = self._source(path)
+        entry = self.state.files.get(source)
+        previous = entry["chunks"] if entry else []
+
+        if stat is None:
+            current: dict[str, str] = {}
+        else:
+            with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+                content = handle.read()
+            current = {chunk_id(source, chunk): chunk for chunk in split_chunks(content)}
+
+        known = set(previous)
+        added = [doc_id for doc_id in current if doc_id not in known]
+        removed = [doc_id for doc_id in previous if doc_id not in current]
+        if added:
+            await self.ingest([current[doc_id] for doc_id in added], added, [source] * len(added))
+        if removed:
+            await self.delete(removed)
+        self.chunks_added += len(added)
+        self.chunks_removed += len(removed)
+
+        if stat is None:
+            self.state.files.pop(source, None)
+        else:
+            self.state.files[source] = {"mtime": stat.st_mtime, "size": stat.st_size, "chunks": list(current)}
+        self.state.save()
+        if added or removed:
+            logger.info("Ingested %s: %d chunks added, %d removed", source, len(added), len(removed))
+
+    def _wanted(self, path: str) -> bool:
+        return path.lower().endswith(".txt") and not self._source(path).startswith("..")
 
-            for filename in os.listdir(self.source_dir):
-                if not filename.lower().endswith(".txt"):
-                    continue
+    async def _sync_if_changed(self, path: str) -> bool:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        entry = self.state.files.get(self._source(path))
+        if stat is None and entry is None:
+            return True
+        if stat is not None and entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return True
+        try:
+            await self.sync_file(path, stat)
+            return True
+        except Exception as exc:
+            # state is left untouched so the file is retried later
+            logger.error("Failed to sync %s: %s", path, exc)
+            return False
 
-                path = os.path.join(self.source_dir, filename)
-                try:
-                    stat = os.stat(path)
-                except FileNotFoundError:
-                    continue
+    async def scan(self) -> list[str]:
+        """Full recursive pass; returns the paths that failed."""
+        paths = [
+            os.path.join(dirpath, filename)
+            for dirpath, _, filenames in os.walk(self.source_dir)
+            for filename in filenames
+            if filename.lower().endswith(".txt")
+        ]
+        seen = {self._source(path) for path in paths}
+        paths += [os.path.join(self.source_dir, s) for s in self.state.files if s not in seen]
+        return [path for path in paths if not await self._sync_if_changed(path)]
 
-                last_mtime = self.file_state.get(path)
-                if last_mtime and stat.st_mtime <= last_mtime:
-                    continue
+    def _ready(self) -> bool:
+        if self.ingest is not _rag_ingest:
+            return True
+        # the default ingest/delete go through the RAG queue, which exists once init() is done
+        from app.services.rag_service import rag_service
 
-                self.file_state[path] = stat.st_mtime
+        return rag_service.ready
 
+    def _on_change(self, path: str | None):
+        if path is None:
+            self._rescan = True
+        elif self._wanted(path):
+            self._dirty.add(path)
+        else:
+            return
+        self._wake.set()
+
+    def _schedule_retry(self, failed: list[str]):
+        self._retry.update(failed)
+        if self._retry and self._retry_timer is None:
+            self._retry_timer = asyncio.get_running_loop().call_later(self.interval, self._retry_due)
+
+    def _retry_due(self):
+        self._retry_timer = None
+        self._dirty |= self._retry
+        self._retry.clear()
+        self._wake.set()
+
+    async def _watch(self, watcher):
+        loop = asyncio.get_running_loop()
+        watcher.start(loop, self._on_change)
+        try:
+            # catch up on changes made while the worker was down
+            self._schedule_retry(await self.scan())
+            while True:
+                if not self._dirty:
+                    await self._wake.wait()
+                # debounce: wait for a quiet period so a file being written is synced once
+                while True:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), self.debounce)
+                    except asyncio.TimeoutError:
+                        break
+                dirty, self._dirty = self._dirty, set()
+                if self._rescan:
+                    self._rescan = False
+                    failed = await self.scan()
+                else:
+                    failed = [path for path in sorted(dirty) if not await self._sync_if_changed(path)]
+                self._schedule_retry(failed)
+        finally:
+            if self._retry_timer is not None:
+                self._retry_timer.cancel()
+                self._retry_timer = None
+            watcher.close()
+
+    async def run(self):
+        while not (os.path.isdir(self.source_dir) and self._ready()):
+            await asyncio.sleep(self.interval)
+
+        watcher = create_watcher(self.source_dir, self.watch_mode)
+        if watcher is not None:
+            try:
+                await self._watch(watcher)
+            except OSError as exc:
+                logger.warning("File watcher failed (%s), falling back to polling", exc)
+
+        while True:
+            if os.path.isdir(self.source_dir):
+                await self.scan()
             await asyncio.sleep(self.interval)
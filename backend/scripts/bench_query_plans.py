@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Compare query plans and latency of the hot filters before and after the
+composite indexes from migration 2.
+
+Usage:
+  python scripts/bench_query_plans.py
+
+Env vars:
+  BENCH_ROWS (default: 50000) rows per table
+  BENCH_REPEAT (default: 200) executions per query
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.migrations import MIGRATIONS  # noqa: E402
+
+ROWS = int(os.getenv("BENCH_ROWS", "50000"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "200"))
+
+QUERIES = [
+    ("schedule lookup", "SELECT * FROM doctor_schedules WHERE doctor_id = :doctor AND slot_id = :slot"),
+    ("active booking lock", "SELECT * FROM booking_locks WHERE slot_id = :slot AND expires_at > :now"),
+    ("user notifications", "SELECT * FROM notifications WHERE user_id = :user ORDER BY created_at DESC LIMIT 50"),
+    ("user activity", "SELECT * FROM activities WHERE user_id = :user ORDER BY created_at DESC LIMIT 50"),
+    ("chat history", "SELECT * FROM chat_messages WHERE child_id = :child ORDER BY created_at ASC"),
+    ("appointments by status", "SELECT COUNT(*) FROM appointments WHERE status = :status"),
+]
+
+INDEXES = [
+    "ix_doctor_schedules_doctor_slot",
+    "ix_booking_locks_slot_expires",
+    "ix_notifications_user_created",
+    "ix_activities_user_created",
+    "ix_chat_messages_child_created",
+    "ix_appointments_status",
+]
+
+
+def _ids(prefix: str, n: int) -> list[str]:
+    return [f"{prefix}-{i}" for i in range(n)]
+
+
+def seed(conn):
+    rng = random.Random(0)
+    users = _ids("user", 500)
+    doctors = _ids("doctor", 50)
+    children = _ids("child", 1000)
+    slots = _ids("slot", 2000)
+    now = datetime.utcnow()
+
+    def when():
+        return now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+
+    conn.execute(text("INSERT INTO users (id, email, full_name, password_hash, role, status) VALUES (:id, :email, 'u', 'x', 'user', 'active')"),
+                 [{"id": u, "email": f"{u}@example.com"} for u in users + doctors])
+    conn.execute(text("INSERT INTO children (id, user_id, full_name) VALUES (:id, :user, 'child')"),
+                 [{"id": c, "user": rng.choice(users)} for c in children])
+    conn.execute(text("INSERT INTO time_slots (id, start_time, end_time, is_active) VALUES (:id, :t, :t, 1)"),
+                 [{"id": s, "t": now} for s in slots])
+    conn.execute(text("INSERT INTO doctor_schedules (id, doctor_id, slot_id, status, created_at) VALUES (:id, :d, :s, 'available', :t)"),
+                 [{"id": str(uuid.uuid4()), "d": rng.choice(doctors), "s": rng.choice(slots), "t": when()} for _ in range(ROWS)])
+    conn.execute(text("INSERT INTO booking_locks (id, slot_id, locked_by_user, expires_at, created_at) VALUES (:id, :s, :u, :e, :t)"),
+                 [{"id": str(uuid.uuid4()), "s": rng.choice(slots), "u": rng.choice(users), "e": when(), "t": when()} for _ in range(ROWS)])
+    conn.execute(text("INSERT INTO notifications (id, user_id, title, created_at) VALUES (:id, :u, 'n', :t)"),
+                 [{"id": str(uuid.uuid4()), "u": rng.choice(users), "t": when()} for _ in range(ROWS)])
+    conn.execute(text("INSERT INTO activities (id, user_id, action, created_at) VALUES (:id, :u, 'a', :t)"),
+                 [{"id": str(uuid.uuid4()), "u": rng.choice(users), "t": when()} for _ in range(ROWS)])
+    conn.execute(text("INSERT INTO chat_messages (id, child_id, role, content, created_at) VALUES (:id, :c, 'user', 'hi', :t)"),
+                 [{"id": str(uuid.uuid4()), "c": rng.choice(children), "t": when()} for _ in range(ROWS)])
+    conn.execute(text("INSERT INTO appointments (id, patient_id, doctor_id, scheduled_at, status, created_at) VALUES (:id, :u, :d, :t, :st, :t)"),
+                 [{"id": str(uuid.uuid4()), "u": rng.choice(users), "d": rng.choice(doctors), "t": when(),
+                   "st": rng.choice(["pending", "confirmed", "completed", "cancelled", "no-show"])} for _ in range(ROWS)])
+    return {"doctor": doctors[0], "slot": slots[0], "user": users[0], "child": children[0], "status": "pending", "now": now}
+
+
+def measure(conn, params) -> dict[str, tuple[str, float]]:
+    results = {}
+    for name, sql in QUERIES:
+        plan = " | ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params))
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            conn.execute(text(sql), params).fetchall()
+        results[name] = (plan, (time.perf_counter() - started) / REPEAT * 1000)
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        _load_models()
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            params = seed(conn)
+            conn.execute(text("ANALYZE"))
+            before = measure(conn, params)
+
+        migrate = dict((number, fn) for number, _, fn in MIGRATIONS)[2]
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(text("ANALYZE"))
+            after = measure(conn, params)
+
+    print(f"{ROWS} rows per table, {REPEAT} runs per query\n")
+    for name, _ in QUERIES:
+        plan_before, ms_before = before[name]
+        plan_after, ms_after = after[name]
+        print(f"{name}: {ms_before:.3f} ms -> {ms_after:.3f} ms ({ms_before / ms_after:.1f}x)")
+        print(f"  before: {plan_before}")
+        print(f"  after:  {plan_after}")
+
+
+def _load_models():
+    from app.models import (  # noqa: F401
+        activities, appointment, booking_lock, chat_message, child, doctor_schedule, notifications, time_slot, user,
+    )
+
+
+if __name__ == "__main__":
+    main()
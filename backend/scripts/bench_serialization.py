@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Per-row cost of serializing a large list response (GET /slots) the old way,
+``[TimeSlotOut(**r.__dict__) for r in rows]`` re-validated by FastAPI, against
+the fast path in app.utils.serialization.
+
+Usage:
+  python scripts/bench_serialization.py
+
+Env vars:
+  BENCH_ROWS (default: 10000) rows in the list
+  BENCH_REPEAT (default: 5) runs per variant, best one reported
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.models.time_slot import TimeSlot  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.slot import TimeSlotOut  # noqa: E402
+from app.utils.serialization import columns_for, orjson  # noqa: E402
+
+ROWS = int(os.getenv("BENCH_ROWS", "10000"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "5"))
+
+adapter = TypeAdapter(list[TimeSlotOut])
+
+
+def legacy(db) -> bytes:
+    rows = db.query(TimeSlot).all()
+    out = [TimeSlotOut(**r.__dict__) for r in rows]
+    # FastAPI dumps the returned models and validates them against response_model again
+    validated = adapter.validate_python([o.model_dump() for o in out])
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def orm_once(db) -> bytes:
+    rows = db.query(TimeSlot).all()
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def projected(db) -> bytes:
+    rows = db.query(*columns_for(TimeSlot, TimeSlotOut)).all()
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def projected_orjson(db) -> bytes:
+    rows = db.query(*columns_for(TimeSlot, TimeSlotOut)).all()
+    return orjson.dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True)))
+
+
+VARIANTS = [
+    ("legacy XOut(**__dict__) + revalidate + json", legacy),
+    ("ORM objects, validated once", orm_once),
+    ("column projection, validated once", projected),
+]
+if orjson is not None:
+    VARIANTS.append(("column projection + orjson", projected_orjson))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine, tables=[User.__table__, TimeSlot.__table__])
+        start = datetime(2025, 1, 1)
+        with engine.begin() as conn:
+            conn.execute(insert(TimeSlot), [
+                {"id": f"slot-{i}", "start_time": start + timedelta(minutes=30 * i),
+                 "end_time": start + timedelta(minutes=30 * i + 30), "duration": 30,
+                 "slot_type": "working", "is_active": True, "created_at": start}
+                for i in range(ROWS)
+            ])
+        Session = sessionmaker(bind=engine)
+
+        print(f"{ROWS} rows, best of {REPEAT}\n")
+        baseline = None
+        for name, fn in VARIANTS:
+            best = float("inf")
+            for _ in range(REPEAT):
+                with Session() as db:
+                    started = time.perf_counter()
+                    body = fn(db)
+                    best = min(best, time.perf_counter() - started)
+            baseline = baseline or best
+            per_row = best / ROWS * 1e6
+            print(f"{name}: {best * 1000:.1f} ms, {per_row:.2f} us/row ({baseline / best:.1f}x), {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    main()
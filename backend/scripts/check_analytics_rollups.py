@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Check that the incremental analytics refresh matches a full rebuild after the
+status of an appointment older than ``ANALYTICS_LOOKBACK_HOURS`` changes, and
+that the series endpoint accepts the UTC ``Z`` timestamps JS ``toISOString()``
+produces. Exits non-zero on any mismatch.
+
+Usage:
+  python scripts/check_analytics_rollups.py
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DB_URL", f"sqlite:///{os.path.join(_tmp.name, 'check.db')}")
+os.environ.setdefault("RAG_WORKDIR", os.path.join(_tmp.name, "rag"))
+os.environ.setdefault("ANALYTICS_REFRESH_SECONDS", "0")
+os.environ.setdefault("SEED_DEMO_USERS", "1")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.db import db_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.appointment import Appointment  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import analytics  # noqa: E402
+
+
+def totals(db, start: datetime, end: datetime) -> dict:
+    counts: dict[str, int] = {}
+    for point in analytics.series(db, "appointments", "day", start, end):
+        for key, value in point["values"].items():
+            counts[key] = counts.get(key, 0) + value
+    return counts
+
+
+def check_status_change() -> bool:
+    now = datetime.utcnow()
+    start, end = now - timedelta(days=10), now + timedelta(hours=1)
+    with db_session() as db:
+        patient = db.scalar(select(User.id).where(User.role == "user").limit(1))
+        doctor = db.scalar(select(User.id).where(User.role == "doctor").limit(1))
+        old = now - timedelta(days=5)
+        appts = [
+            Appointment(patient_id=patient, doctor_id=doctor, scheduled_at=old + timedelta(days=1),
+                        status="pending", created_at=old + timedelta(minutes=i), updated_at=old)
+            for i in range(2)
+        ]
+        # a recent row keeps the newest bucket current, so the old ones fall outside the window
+        recent = Appointment(patient_id=patient, doctor_id=doctor, scheduled_at=now + timedelta(days=1), status="pending")
+        db.add_all(appts + [recent])
+        db.commit()
+        analytics.refresh(db, full=True)
+
+        appts[0].status = "completed"
+        db.commit()
+        analytics.refresh(db)
+        incremental = totals(db, start, end)
+        analytics.refresh(db, full=True)
+        full = totals(db, start, end)
+    ok = incremental == full
+    print(f"{'ok  ' if ok else 'FAIL'} status change on old appointment: incremental={incremental}, full={full}")
+    return ok
+
+
+def check_utc_bounds(client: TestClient) -> bool:
+    token = client.post("/auth/login", json={
+        "email": os.getenv("DEMO_ADMIN_EMAIL", "admin@example.com"),
+        "password": os.getenv("DEMO_ADMIN_PASSWORD", "Admin@12345"),
+    }).json()["access_token"]
+    date_from = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    response = client.get(
+        "/admin/analytics/appointments", params={"date_from": date_from},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    ok = response.status_code == 200
+    print(f"{'ok  ' if ok else 'FAIL'} date_from={date_from}: HTTP {response.status_code}")
+    return ok
+
+
+def main() -> int:
+    client = TestClient(app)
+    results = [check_status_change(), check_utc_bounds(client)]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
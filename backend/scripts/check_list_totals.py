@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Check that ``X-Total-Count`` on the paginated list endpoints matches the rows
+they actually return, by walking every page with ``X-Next-Cursor``. Exits
+non-zero on any mismatch.
+
+Usage:
+  python scripts/check_list_totals.py
+
+Env vars:
+  CHECK_PAGE_SIZE (default: 2) page size, small so the cursor path is exercised
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DB_URL", f"sqlite:///{os.path.join(_tmp.name, 'check.db')}")
+os.environ.setdefault("RAG_WORKDIR", os.path.join(_tmp.name, "rag"))
+os.environ.setdefault("ANALYTICS_REFRESH_SECONDS", "0")
+os.environ.setdefault("SEED_DEMO_USERS", "1")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+PAGE_SIZE = int(os.getenv("CHECK_PAGE_SIZE", "2"))
+
+ENDPOINTS = [
+    ("/admin/users", {}),
+    ("/admin/users", {"role": "doctor"}),
+    ("/admin/doctors", {}),
+    ("/admin/assignments", {}),
+    ("/schedules", {}),
+    ("/credentials", {}),
+    ("/ranks", {}),
+    ("/slots", {}),
+]
+
+
+def login(client, email: str, password: str) -> dict:
+    token = client.post("/auth/login", json={"email": email, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed(client, admin: dict, doctor: dict):
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    for i in range(5):
+        slot = client.post("/slots", headers=admin, json={
+            "start_time": (start + timedelta(hours=i)).isoformat(),
+            "end_time": (start + timedelta(hours=i, minutes=30)).isoformat(),
+        }).json()
+        client.post("/schedules", headers=doctor, json={"slot_id": slot["id"]})
+
+
+def walk(client, path: str, params: dict, headers: dict) -> tuple[int | None, int]:
+    total, rows, cursor = None, 0, None
+    while True:
+        query = {**params, "limit": PAGE_SIZE, "include_total": "true"}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(path, params=query, headers=headers)
+        response.raise_for_status()
+        if total is None:
+            total = int(response.headers["X-Total-Count"])
+        rows += len(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return total, rows
+
+
+def main() -> int:
+    client = TestClient(app)
+    admin = login(client, os.getenv("DEMO_ADMIN_EMAIL", "admin@example.com"), os.getenv("DEMO_ADMIN_PASSWORD", "Admin@12345"))
+    doctor = login(client, os.getenv("DEMO_DOCTOR_EMAIL", "doctor@example.com"), os.getenv("DEMO_DOCTOR_PASSWORD", "Doctor@12345"))
+    seed(client, admin, doctor)
+    failed = 0
+    for path, params in ENDPOINTS:
+        total, rows = walk(client, path, params, admin)
+        ok = total == rows
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {path} {params or ''}: X-Total-Count={total}, rows={rows}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import sys
 import asyncio
 import numpy as np
 
@@ -10,10 +11,18 @@ from lightrag import LightRAG, QueryParam
 from lightrag.utils import wrap_embedding_func_with_attrs, setup_logger
 from lightrag.llm.gemini import gemini_model_complete, gemini_embed
 
+# Share the backend's embedding batcher and on-disk cache so both pipelines skip unchanged chunks.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+from app.services.embedding_batcher import EmbeddingBatcher  # noqa: E402
+from app.services.embedding_store import EmbeddingStore  # noqa: E402
+from app.workers.ingest_worker import IngestWorker  # noqa: E402
+
 WORKING_DIR = "./rag_storage"
 SOURCE_DIR = "./folder_txt"
 GEMINI_MODEL = "gemini-2.5-flash"
 EMBED_MODEL = "models/text-embedding-004"
+EMBED_DIM = 768
+EMBED_STORE_DIR = os.getenv("EMBED_STORE_DIR", os.path.join(WORKING_DIR, "embedding_cache"))
 
 setup_logger("lightrag", level="INFO")
 
@@ -41,19 +50,31 @@ async def llm_model_func(
     )
 
 
-@wrap_embedding_func_with_attrs(
-    embedding_dim=768,
-    max_token_size=2048,
-    model_name=EMBED_MODEL,
-)
-async def embedding_func(texts: list[str]) -> np.ndarray:
+async def provider_embed(texts: list[str], **kwargs) -> np.ndarray:
     return await gemini_embed.func(
         texts,
         api_key=os.getenv("GEMINI_API_KEY"),
         model=EMBED_MODEL,
+        **kwargs,
     )
 
 
+embedder = EmbeddingBatcher(
+    provider_embed,
+    embedding_dim=EMBED_DIM,
+    store=EmbeddingStore(EMBED_STORE_DIR, EMBED_DIM, EMBED_MODEL),
+)
+
+
+@wrap_embedding_func_with_attrs(
+    embedding_dim=EMBED_DIM,
+    max_token_size=2048,
+    model_name=EMBED_MODEL,
+)
+async def embedding_func(texts: list[str]) -> np.ndarray:
+    return await embedder.embed(texts)
+
+
 async def initialize_rag() -> LightRAG:
     rag = LightRAG(
         working_dir=WORKING_DIR,
@@ -67,7 +88,6 @@ async def initialize_rag() -> LightRAG:
 
 rag_instance: LightRAG | None = None
 ingest_task: asyncio.Task | None = None
-file_state: dict[str, float] = {}
 
 
 class ChatRequest(BaseModel):
@@ -90,62 +110,25 @@ def build_prompt(message: str, history: list[dict] | None) -> str:
     return "\n".join(lines)
 
 
-async def try_ingest_text(text: str) -> bool:
-    if not rag_instance:
-        return False
+async def ingest_chunks(texts: list[str], ids: list[str], file_paths: list[str]):
+    await rag_instance.ainsert(texts, ids=ids, file_paths=file_paths)
 
-    for method_name in ("ainsert", "insert", "add", "ingest", "insert_text"):
-        method = getattr(rag_instance, method_name, None)
-        if not method:
-            continue
-        try:
-            if asyncio.iscoroutinefunction(method):
-                try:
-                    await method([text])
-                except Exception:
-                    await method(text)
-            else:
-                try:
-                    method([text])
-                except Exception:
-                    method(text)
-            return True
-        except Exception:
-            continue
-    return False
+
+async def delete_chunks(ids: list[str]):
+    for doc_id in ids:
+        await rag_instance.adelete_by_doc_id(doc_id)
 
 
 async def ingest_folder_loop(interval_seconds: int = 8):
-    while True:
-        try:
-            if not os.path.isdir(SOURCE_DIR):
-                await asyncio.sleep(interval_seconds)
-                continue
-
-            for filename in os.listdir(SOURCE_DIR):
-                if not filename.lower().endswith(".txt"):
-                    continue
-                path = os.path.join(SOURCE_DIR, filename)
-                try:
-                    stat = os.stat(path)
-                except FileNotFoundError:
-                    continue
-
-                last_mtime = file_state.get(path)
-                if last_mtime and stat.st_mtime <= last_mtime:
-                    continue
-
-                with open(path, "r", encoding="utf-8", errors="ignore") as handle:
-                    content = handle.read().strip()
-
-                if content:
-                    await try_ingest_text(content)
-                    file_state[path] = stat.st_mtime
-        except Exception:
-            # Keep loop alive even if one file fails
-            pass
-
-        await asyncio.sleep(interval_seconds)
+    # only new or edited chunks are inserted; state survives restarts in WORKING_DIR
+    worker = IngestWorker(
+        SOURCE_DIR,
+        interval=interval_seconds,
+        state_path=os.path.join(WORKING_DIR, "ingest_state.json"),
+        ingest=ingest_chunks,
+        delete=delete_chunks,
+    )
+    await worker.run()
 
 
 @app.on_event("startup")